@@ -0,0 +1,62 @@
+"""
+Micro-benchmark for the generated form, table and filter classes.
+
+Simulates many CRUDs asking for the same generated classes, with and without
+the cache of generated classes in vega_admin.utils.
+
+Usage:
+
+    python benchmarks/generated_classes.py [cruds]
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "tests.settings")
+
+import django  # noqa: E402 pylint: disable=wrong-import-position
+
+django.setup()
+
+from vega_admin.utils import (  # noqa: E402
+    clear_generated_classes,
+    get_filterclass,
+    get_listview_form,
+    get_modelform,
+    get_table,
+)
+
+from tests.artist_app.models import Artist, Song  # noqa: E402
+
+
+def build(cruds, cached):
+    """Build the classes that a number of CRUDs would need."""
+    for _ in range(cruds):
+        if not cached:
+            clear_generated_classes()
+        for model, fields in ((Artist, ["name"]), (Song, ["name", "artist"])):
+            get_modelform(model=model, fields=fields)
+            get_listview_form(model=model, fields=fields)
+            get_table(model=model, fields=fields, actions=[("view", "x-view")])
+            get_filterclass(model=model, fields=fields)
+
+
+def main():
+    """Run the benchmark."""
+    cruds = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    print(f"{cruds} CRUDs")
+    for name, cached in (("uncached", False), ("cached", True)):
+        clear_generated_classes()
+        tracemalloc.start()
+        start = time.perf_counter()
+        build(cruds, cached)
+        seconds = time.perf_counter() - start
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        print(f"{name:>9}: {seconds * 1000:8.1f} ms {memory / 1024:8.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
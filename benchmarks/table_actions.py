@@ -0,0 +1,79 @@
+"""
+Micro-benchmark for rendering the actions column of generated tables.
+
+Compares reversing every action url for every row with the precompiled url
+templates used by vega_admin.utils.get_table.
+
+Usage:
+
+    python benchmarks/table_actions.py [rows]
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "tests.settings")
+
+import django  # noqa: E402 pylint: disable=wrong-import-position
+
+django.setup()
+
+from django.test.utils import override_settings  # noqa: E402
+from django.urls import NoReverseMatch, reverse  # noqa: E402
+
+from vega_admin.utils import get_action_urls, get_table  # noqa: E402
+
+from tests.artist_app.models import Artist  # noqa: E402
+
+ACTIONS = [
+    ("create", "artist_app.artist-create"),
+    ("view", "artist_app.artist-view"),
+    ("update", "artist_app.artist-update"),
+    ("delete", "artist_app.artist-delete"),
+]
+
+
+def reverse_per_row(records):
+    """Reverse every action url for every row, the way it used to be done."""
+    for record in records:
+        for _, url_name in ACTIONS:
+            try:
+                reverse(url_name)
+            except NoReverseMatch:
+                reverse(url_name, args=[record.pk])
+
+
+def precompiled(table_class, records):
+    """Use the precompiled url templates."""
+    for record in records:
+        get_action_urls(table_class, record.pk)
+
+
+def main():
+    """Run the benchmark."""
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    repeat = 20
+    records = [Artist(pk=pk, name=f"Artist {pk}") for pk in range(1, rows + 1)]
+    table_class = get_table(model=Artist, fields=["name"], actions=ACTIONS)
+
+    with override_settings(ROOT_URLCONF="tests.artist_app.urls"):
+        results = {
+            "reverse per row": min(
+                timeit.repeat(lambda: reverse_per_row(records), number=1, repeat=repeat)
+            ),
+            "precompiled": min(
+                timeit.repeat(
+                    lambda: precompiled(table_class, records), number=1, repeat=repeat
+                )
+            ),
+        }
+
+    print(f"{rows} rows x {len(ACTIONS)} actions")
+    for name, seconds in results.items():
+        per_row = seconds / rows * 1e6
+        print(f"{name:>16}: {seconds * 1000:8.3f} ms/page {per_row:8.2f} us/row")
+
+
+if __name__ == "__main__":
+    main()
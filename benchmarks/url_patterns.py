@@ -0,0 +1,65 @@
+"""
+Micro-benchmark for building the url patterns of CRUD views.
+
+Compares the time and memory it takes to build the url patterns of many CRUD
+views eagerly and lazily (VegaCRUDView.lazy_views).
+
+Usage:
+
+    python benchmarks/url_patterns.py [cruds]
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "tests.settings")
+
+import django  # noqa: E402 pylint: disable=wrong-import-position
+
+django.setup()
+
+from vega_admin.utils import clear_generated_classes  # noqa: E402
+from vega_admin.views import VegaCRUDView  # noqa: E402
+
+from tests.artist_app.models import Artist, Song  # noqa: E402
+
+
+def build(cruds, lazy):
+    """Build the url patterns of a number of CRUD views."""
+    patterns = []
+    for index in range(cruds):
+        model = Song if index % 2 else Artist
+        crud_class = type(
+            f"CRUD{index}",
+            (VegaCRUDView,),
+            {
+                "model": model,
+                "crud_path": f"crud-{index}",
+                # two sets of fields so that some generated classes are shared
+                "list_fields": ["name", "pk"][: 1 + index % 2],
+                "lazy_views": lazy,
+            },
+        )
+        patterns += crud_class().url_patterns()
+    return patterns
+
+
+def main():
+    """Run the benchmark."""
+    cruds = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    print(f"{cruds} CRUDs")
+    for name, lazy in (("eager", False), ("lazy", True)):
+        clear_generated_classes()
+        tracemalloc.start()
+        start = time.perf_counter()
+        build(cruds, lazy)
+        seconds = time.perf_counter() - start
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        print(f"{name:>6}: {seconds * 1000:8.1f} ms {memory / 1024:8.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Micro-benchmark for resolving the urls of many CRUD views.
+
+Compares resolving a url of the last registered CRUD view when every action
+has its own url pattern and when the url patterns of each CRUD view are
+grouped under its crud_path (VegaCRUDView.include_url_patterns).
+
+Usage:
+
+    python benchmarks/url_resolver.py [requests]
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "tests.settings")
+
+import django  # noqa: E402 pylint: disable=wrong-import-position
+
+django.setup()
+
+from django.urls.resolvers import RegexPattern, URLResolver  # noqa: E402
+
+from vega_admin.views import VegaCRUDView  # noqa: E402
+
+from tests.artist_app.models import Artist  # noqa: E402
+
+
+def get_resolver(cruds, include_url_patterns):
+    """Get a resolver for the url patterns of a number of CRUD views."""
+    patterns = []
+    for index in range(cruds):
+        crud_class = type(
+            f"CRUD{index}",
+            (VegaCRUDView,),
+            {
+                "model": Artist,
+                "crud_path": f"crud-{index}",
+                "lazy_views": True,
+                "include_url_patterns": include_url_patterns,
+            },
+        )
+        patterns += crud_class().url_patterns()
+    return URLResolver(RegexPattern(r"^/"), patterns)
+
+
+def main():
+    """Run the benchmark."""
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    print(f"microseconds per resolve, {requests} requests")
+    print(f"{'cruds':>6} {'flat':>8} {'include':>8}")
+    for cruds in (10, 50, 200, 500):
+        path = f"/crud-{cruds - 1}/view/1/"
+        timings = []
+        for include_url_patterns in (False, True):
+            resolver = get_resolver(cruds, include_url_patterns)
+            resolver.resolve(path)
+            seconds = timeit.timeit(lambda: resolver.resolve(path), number=requests)
+            timings.append(seconds / requests * 1000000)
+        print(f"{cruds:>6} {timings[0]:8.1f} {timings[1]:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,4 +5,5 @@ from . import views
 
 
 urlpatterns = views.FilterSongCRUD().url_patterns() +\
-              views.Filter2SongCRUD().url_patterns()
+              views.Filter2SongCRUD().url_patterns() +\
+              views.AutocompleteArtistCRUD().url_patterns()
@@ -109,3 +109,19 @@ class SongForm(forms.ModelForm):
 
 class CustomSearchForm(ListViewSearchForm):
     """Custom search form"""
+
+
+class QueryingSongForm(forms.ModelForm):
+    """
+    Song ModelForm class that queries the database when instantiated
+    """
+
+    class Meta:
+        model = Song
+        fields = ["name", "artist"]
+
+    def __init__(self, *args, **kwargs):
+        self.request = kwargs.pop("request", None)
+        self.vega_extra_kwargs = kwargs.pop("vega_extra_kwargs", dict())
+        super().__init__(*args, **kwargs)
+        self.fields["artist"].initial = Artist.objects.first()
@@ -65,3 +65,63 @@ class Band(models.Model):
     def __str__(self):
         """Unicode representation of Band."""
         return self.name
+
+
+class Member(models.Model):
+    """Band Member Model class."""
+
+    band = models.ForeignKey(Band, on_delete=models.CASCADE)
+    name = models.CharField(max_length=100)
+
+    class Meta:
+        """Meta class def."""
+
+        ordering = ["name"]
+        verbose_name = "member"
+        verbose_name_plural = "members"
+
+    def __str__(self):
+        """Unicode representation of Member."""
+        return self.name
+
+
+class Genre(models.Model):
+    """Genre Model class, genres can have sub-genres."""
+
+    parent = models.ForeignKey(
+        "self",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="children",
+    )
+    name = models.CharField(max_length=100)
+
+    class Meta:
+        """Meta class def."""
+
+        ordering = ["name"]
+        verbose_name = "genre"
+        verbose_name_plural = "genres"
+
+    def __str__(self):
+        """Unicode representation of Genre."""
+        return self.name
+
+
+class Album(models.Model):
+    """Album Model class."""
+
+    genre = models.ForeignKey(Genre, on_delete=models.PROTECT)
+    name = models.CharField(max_length=100)
+
+    class Meta:
+        """Meta class def."""
+
+        ordering = ["name"]
+        verbose_name = "album"
+        verbose_name_plural = "albums"
+
+    def __str__(self):
+        """Unicode representation of Album."""
+        return self.name
@@ -13,6 +13,21 @@ custom_default_patterns = views.CustomDefaultActions().url_patterns()
 patterns_42 = views.Artist42CRUD().url_patterns()
 plainform_patterns = views.PlainFormCRUD().url_patterns()
 create_artist_only_patterns = views.CreateOnlyCRUD().url_patterns()
+keyset_artist_patterns = views.KeysetArtistCRUD().url_patterns()
+capped_artist_patterns = views.CappedArtistCRUD().url_patterns()
+export_song_patterns = views.ExportSongCRUD().url_patterns()
+protected_export_song_patterns = views.ProtectedExportSongCRUD().url_patterns()
+lazy_artist_patterns = views.LazyArtistCRUD().url_patterns()
+included_song_patterns = views.IncludedSongCRUD().url_patterns()
+search_song_patterns = views.SearchSongCRUD().url_patterns()
+trigram_song_patterns = views.TrigramSongCRUD().url_patterns()
+token_song_patterns = views.TokenSongCRUD().url_patterns()
+autocomplete_song_patterns = views.AutocompleteSongCRUD().url_patterns()
+autocomplete_artist_patterns = views.AutocompleteArtistCRUD().url_patterns()
+bulk_artist_patterns = views.BulkArtistCRUD().url_patterns()
+bulk_song_patterns = views.BulkSongCRUD().url_patterns()
+genre_patterns = views.GenreCRUD().url_patterns()
+album_patterns = views.AlbumCRUD().url_patterns()
 
 
 urlpatterns = (
@@ -32,4 +47,19 @@ urlpatterns = (
     + patterns_42
     + plainform_patterns
     + create_artist_only_patterns
+    + keyset_artist_patterns
+    + capped_artist_patterns
+    + export_song_patterns
+    + protected_export_song_patterns
+    + lazy_artist_patterns
+    + included_song_patterns
+    + search_song_patterns
+    + trigram_song_patterns
+    + token_song_patterns
+    + autocomplete_song_patterns
+    + autocomplete_artist_patterns
+    + bulk_artist_patterns
+    + bulk_song_patterns
+    + genre_patterns
+    + album_patterns
 )
@@ -23,7 +23,7 @@ from .forms import (
     SongForm,
     UpdateArtistForm,
 )
-from .models import Artist, Band, Song
+from .models import Album, Artist, Band, Genre, Song
 from .tables import ArtistTable
 
 
@@ -260,3 +260,163 @@ class CreateOnlyCRUD(VegaCRUDView):
     permissions_actions: Union[None, List[str]] = None
     actions = ["create"]
     crud_path = "create-artist-only"
+
+
+class KeysetArtistCRUD(VegaCRUDView):
+    """CRUD view for artists that uses keyset pagination."""
+
+    model = Artist
+    protected_actions: Union[None, List[str]] = None
+    permissions_actions: Union[None, List[str]] = None
+    actions = ["list"]
+    crud_path = "keyset-artists"
+    pagination_mode = "keyset"
+    paginate_by = 2
+
+
+class CappedArtistCRUD(VegaCRUDView):
+    """CRUD view for artists that caps the row count."""
+
+    model = Artist
+    protected_actions: Union[None, List[str]] = None
+    permissions_actions: Union[None, List[str]] = None
+    actions = ["list"]
+    crud_path = "capped-artists"
+    count_strategy = "capped"
+    paginate_by = 2
+
+
+class LazyArtistCRUD(VegaCRUDView):
+    """CRUD view for artists that builds its views when they are requested."""
+
+    model = Artist
+    protected_actions: Union[None, List[str]] = None
+    permissions_actions: Union[None, List[str]] = None
+    crud_path = "lazy-artists"
+    lazy_views = True
+
+
+class IncludedSongCRUD(CustomSongCRUD):
+    """CRUD view for songs that groups its url patterns under its crud_path."""
+
+    crud_path = "included-songs"
+    include_url_patterns = True
+
+
+class SearchSongCRUD(VegaCRUDView):
+    """CRUD view for songs that uses full text search."""
+
+    model = Song
+    protected_actions: Union[None, List[str]] = None
+    permissions_actions: Union[None, List[str]] = None
+    actions = ["list"]
+    crud_path = "search-songs"
+    search_fields = ["name", "song_type"]
+    search_backend = "vega_admin.search.PostgresSearchBackend"
+
+
+class TrigramSongCRUD(SearchSongCRUD):
+    """CRUD view for songs that uses trigram search."""
+
+    crud_path = "trigram-songs"
+    search_fields = ["name", "artist__name", "^song_type"]
+    search_backend = "vega_admin.search.TrigramSearchBackend"
+
+
+class TokenSongCRUD(SearchSongCRUD):
+    """CRUD view for songs that uses the search index."""
+
+    crud_path = "token-songs"
+    search_fields = ["name", "artist__name", "id"]
+    search_backend = "vega_admin.contrib.search.backends.TokenSearchBackend"
+
+
+class ExportSongCRUD(VegaCRUDView):
+    """CRUD view for songs that can be exported in the background."""
+
+    model = Song
+    protected_actions: Union[None, List[str]] = ["export"]
+    permissions_actions: Union[None, List[str]] = None
+    actions = ["list", "export"]
+    crud_path = "export-songs"
+    list_fields = ["name", "artist"]
+    search_fields = ["name"]
+
+
+class ProtectedExportSongCRUD(VegaCRUDView):
+    """CRUD view for songs whose exports are protected like its list."""
+
+    model = Song
+    actions = ["list", "export"]
+    crud_path = "protected-export-songs"
+    list_fields = ["name"]
+
+
+class AutocompleteSongCRUD(VegaCRUDView):
+    """CRUD view for songs that suggests matches while searching."""
+
+    model = Song
+    protected_actions: Union[None, List[str]] = None
+    permissions_actions: Union[None, List[str]] = None
+    actions = ["list", "autocomplete"]
+    crud_path = "autocomplete-songs"
+    search_fields = ["name", "artist__name"]
+    autocomplete_limit = 2
+    autocomplete_fields = ["name"]
+
+
+class AutocompleteArtistCRUD(VegaCRUDView):
+    """CRUD view for artists that other forms search for artists with."""
+
+    model = Artist
+    actions = ["list", "autocomplete"]
+    crud_path = "autocomplete-artists"
+    search_fields = ["name"]
+
+
+class BulkArtistCRUD(VegaCRUDView):
+    """CRUD view for artists that deletes many artists at once."""
+
+    model = Artist
+    actions = ["list", "delete", "bulk_delete"]
+    crud_path = "bulk-artists"
+    list_fields = ["name"]
+    search_fields = ["name"]
+    filter_fields = ["name"]
+    bulk_batch_size = 2
+
+
+class BulkSongCRUD(VegaCRUDView):
+    """CRUD view for songs that sets the type of many songs at once."""
+
+    model = Song
+    protected_actions: Union[None, List[str]] = None
+    permissions_actions: Union[None, List[str]] = None
+    actions = ["list", "update", "bulk_update"]
+    crud_path = "bulk-songs"
+    list_fields = ["name"]
+    search_fields = ["name"]
+    bulk_update_fields = ["song_type"]
+    bulk_batch_size = 2
+
+
+class GenreCRUD(VegaCRUDView):
+    """CRUD view for genres, which delete their sub-genres too."""
+
+    model = Genre
+    protected_actions: Union[None, List[str]] = None
+    permissions_actions: Union[None, List[str]] = None
+    actions = ["list", "delete"]
+    crud_path = "genres"
+
+
+class AlbumCRUD(VegaCRUDView):
+    """CRUD view for albums, which join the genre and its parent genre."""
+
+    model = Album
+    protected_actions: Union[None, List[str]] = None
+    permissions_actions: Union[None, List[str]] = None
+    actions = ["list"]
+    list_fields = ["name", "genre"]
+    list_select_related = ["genre__parent"]
+    crud_path = "albums"
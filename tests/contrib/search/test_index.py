@@ -0,0 +1,208 @@
+"""Test vega_admin.contrib.search"""
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from model_mommy import mommy
+
+from vega_admin.bulk import update_in_batches
+from vega_admin.contrib.search.backends import TokenSearchBackend, get_prefix_end
+from vega_admin.contrib.search.index import get_indexed_fields, normalize, tokenize
+from vega_admin.contrib.search.models import SearchToken
+
+from tests.artist_app.models import Artist, Song
+
+
+class TestTokens(TestCase):
+    """
+    Test class for tokens
+    """
+
+    def test_tokenize(self):
+        """
+        Test tokenize
+        """
+        self.assertEqual("creme brulee", normalize("Crème Brûlée"))
+        self.assertEqual(
+            ["creme", "brulee", "mosh_1"], tokenize("Crème, Brûlée! crème MOSH_1")
+        )
+        self.assertEqual([], tokenize(None))
+        self.assertEqual(["12"], tokenize(12))
+
+
+@override_settings(ROOT_URLCONF="tests.artist_app.urls", VEGA_TEMPLATE="basic")
+class TestSearchIndex(TransactionTestCase):
+    """
+    Test class for the search index
+    """
+
+    def test_indexed_fields(self):
+        """
+        Test that the fields in VEGA_SEARCH_INDEX are indexed
+        """
+        self.assertEqual({Song: ("name",)}, get_indexed_fields())
+        # the receivers are only connected for indexed models
+        self.assertTrue(post_save.has_listeners(Song))
+        self.assertTrue(post_delete.has_listeners(Song))
+        self.assertFalse(post_save.has_listeners(Artist))
+        self.assertFalse(post_delete.has_listeners(Artist))
+
+        for fields in (["artist"], ["release_date"], ["artist__name"], ["nope"]):
+            with override_settings(VEGA_SEARCH_INDEX={"artist_app.Song": fields}):
+                with self.assertRaises(ImproperlyConfigured):
+                    get_indexed_fields()
+
+    def test_signals(self):
+        """
+        Test that the index is kept up to date
+        """
+        artist = mommy.make("artist_app.Artist", name="Mosh")
+        with self.assertNumQueries(1):
+            # artists are not indexed
+            artist.save()
+
+        with transaction.atomic():
+            song = mommy.make("artist_app.Song", artist=artist, name="Running Up")
+            other = mommy.make("artist_app.Song", artist=artist, name="Walk")
+            self.assertFalse(SearchToken.objects.exists())
+        self.assertEqual(
+            ["running", "up", "walk"],
+            sorted(SearchToken.objects.values_list("token", flat=True)),
+        )
+
+        song.name = "Running Down"
+        song.save()
+        self.assertEqual(
+            ["down", "running"],
+            sorted(
+                SearchToken.objects.filter(object_id=song.pk).values_list(
+                    "token", flat=True
+                )
+            ),
+        )
+
+        with transaction.atomic():
+            song.name = "Nope"
+            song.save()
+            transaction.set_rollback(True)
+        other.delete()
+        self.assertEqual(
+            ["down", "running"],
+            sorted(SearchToken.objects.values_list("token", flat=True)),
+        )
+
+    def test_savepoints(self):
+        """
+        Test that changes in rolled back savepoints and transactions are not
+        indexed, and do not stop later changes from being indexed
+        """
+        song = mommy.make("artist_app.Song", name="Mosh")
+        other = mommy.make("artist_app.Song", name="Walk")
+
+        with transaction.atomic():
+            song.name = "Eddie"
+            song.save()
+            try:
+                with transaction.atomic():
+                    other.name = "Run"
+                    other.save()
+                    raise ValueError
+            except ValueError:
+                pass
+        self.assertEqual(
+            ["eddie", "walk"],
+            sorted(SearchToken.objects.values_list("token", flat=True)),
+        )
+
+        with transaction.atomic():
+            song.name = "Nope"
+            song.save()
+            transaction.set_rollback(True)
+        with transaction.atomic():
+            other.name = "Jump"
+            other.save()
+        self.assertEqual(
+            ["eddie", "jump"],
+            sorted(SearchToken.objects.values_list("token", flat=True)),
+        )
+
+    def test_bulk_update(self):
+        """
+        Test that bulk updates without signals keep the index up to date
+        """
+        songs = mommy.make("artist_app.Song", name="Mosh", _quantity=3)
+        queryset = Song.objects.filter(pk__in=[songs[0].pk, songs[1].pk])
+        update_in_batches(queryset, {"name": "Eddie"}, 1)
+        self.assertEqual(
+            ["eddie", "eddie", "mosh"],
+            sorted(SearchToken.objects.values_list("token", flat=True)),
+        )
+
+    def test_get_prefix_end(self):
+        """
+        Test the end of the ranges of tokens that start with a prefix
+        """
+        self.assertEqual("mosi", get_prefix_end("mosh"))
+        self.assertEqual("b", get_prefix_end("a\U0010ffff"))
+        self.assertEqual("\ue000", get_prefix_end("\ud7ff"))
+        self.assertIsNone(get_prefix_end("\U0010ffff"))
+
+        # tokens that go on with characters outside the basic multilingual plane
+        mommy.make("artist_app.Song", name="Mosh\U00020000")
+        self.assertEqual(
+            ["Mosh\U00020000"],
+            [
+                _.name
+                for _ in TokenSearchBackend().search(
+                    Song.objects.all(), ["name"], "mosh"
+                )
+            ],
+        )
+
+    def test_search(self):
+        """
+        Test TokenSearchBackend
+        """
+        mosh = mommy.make("artist_app.Artist", name="Mosh")
+        eddie = mommy.make("artist_app.Artist", name="Eddie")
+        song = mommy.make("artist_app.Song", artist=mosh, name="Crème Brûlée")
+        mommy.make("artist_app.Song", artist=eddie, name="Creme Soda")
+        backend = TokenSearchBackend()
+        fields = ["name", "artist__name", "id"]
+
+        def search(query):
+            return sorted(
+                _.name for _ in backend.search(Song.objects.all(), fields, query)
+            )
+
+        self.assertEqual(["Creme Soda", "Crème Brûlée"], search("CREME"))
+        self.assertEqual(["Crème Brûlée"], search("crem brul"))
+        self.assertEqual(["Crème Brûlée"], search("creme mosh"))
+        self.assertEqual(["Crème Brûlée"], search(str(song.pk)))
+        self.assertEqual([], search("brulee soda"))
+
+        res = self.client.get(reverse("token-songs-list"), {"q": "soda"})
+        self.assertEqual(["Creme Soda"], [_.name for _ in res.context["object_list"]])
+
+    def test_rebuild_search_index(self):
+        """
+        Test the rebuild_search_index command
+        """
+        artist = mommy.make("artist_app.Artist")
+        mommy.make("artist_app.Song", artist=artist, name="One Two", _quantity=3)
+        SearchToken.objects.all().delete()
+
+        out = StringIO()
+        call_command("rebuild_search_index", "--chunk-size", "2", stdout=out)
+        self.assertIn("Indexed 3 Songs.", out.getvalue())
+        self.assertEqual(6, SearchToken.objects.count())
+        self.assertEqual(3, SearchToken.objects.filter(token="two").count())
+        # rebuilding again replaces the tokens
+        call_command("rebuild_search_index", stdout=out)
+        self.assertEqual(6, SearchToken.objects.count())
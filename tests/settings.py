@@ -26,6 +26,7 @@ INSTALLED_APPS = [
     # custom
     'vega_admin',
     'vega_admin.contrib.users',
+    'vega_admin.contrib.search',
     # tests
     'tests.artist_app'
 ]
@@ -103,6 +104,9 @@ MEDIA_ROOT = '/tmp/'
 
 SITE_ID = 1
 
+# the models that vega_admin.contrib.search keeps the search tokens of
+VEGA_SEARCH_INDEX = {'artist_app.Song': ['name']}
+
 # try and load local_settings if present
 try:
     # pylint: disable=wildcard-import
@@ -0,0 +1,316 @@
+"""Test module for bulk actions."""
+from django.conf import settings
+from django.contrib.auth.models import Permission, User
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models.signals import post_save, pre_save
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from model_mommy import mommy
+
+from vega_admin.bulk import (
+    PartialDeleteError,
+    delete_in_batches,
+    get_selected_pks,
+    iter_pk_batches,
+    update_in_batches,
+)
+from vega_admin.deletion import get_delete_summary, has_protected_objects
+
+from .artist_app.models import Album, Artist, Band, Genre, Member, Song
+from .artist_app.views import BulkArtistCRUD, BulkSongCRUD
+
+
+@override_settings(
+    VEGA_ACTION_COLUMN_NAME="Actions",
+    ROOT_URLCONF="tests.artist_app.urls",
+    VEGA_TEMPLATE="basic",
+)
+class TestBulk(TestCase):
+    """Test class for bulk actions."""
+
+    def setUp(self):
+        """Set up."""
+        self.user = User.objects.create_superuser(
+            username="mosh", email="mosh@example.com", password="hunter2"
+        )
+        self.client.login(username="mosh", password="hunter2")
+        self.url = reverse("bulk-artists-bulk_delete")
+
+    def test_helpers(self):
+        """Test the batching and protection helpers."""
+        artists = mommy.make("artist_app.Artist", _quantity=5)
+        pks = sorted(_.pk for _ in artists)
+        self.assertEqual(
+            [pks[:2], pks[2:4], pks[4:]],
+            list(iter_pk_batches(Artist.objects.order_by("-name"), 2)),
+        )
+        self.assertEqual([pks[0]], get_selected_pks(Artist, [pks[0], "x", pks[0]]))
+
+        mommy.make("artist_app.Song", artist=artists[0])
+        self.assertTrue(has_protected_objects(Artist.objects.all()))
+        self.assertFalse(has_protected_objects(Artist.objects.exclude(pk=pks[0])))
+
+        self.assertEqual(3, delete_in_batches(Artist.objects.filter(pk__gt=pks[1]), 2))
+        self.assertEqual(2, Artist.objects.count())
+
+        # updates can send signals for every object
+        songs = mommy.make("artist_app.Song", song_type=Song.SINGLE, _quantity=3)
+        received = []
+
+        def receiver(signal, instance, update_fields, **kwargs):
+            received.append((signal, instance.pk, instance.song_type, update_fields))
+
+        pre_save.connect(receiver, sender=Song)
+        post_save.connect(receiver, sender=Song)
+        try:
+            queryset = Song.objects.filter(pk__in=[songs[0].pk, songs[1].pk])
+            self.assertEqual(
+                2, update_in_batches(queryset, {"song_type": Song.SKIT}, 1, True)
+            )
+            self.assertEqual(
+                1,
+                update_in_batches(
+                    queryset.filter(pk=songs[0].pk), {"song_type": Song.SKIT}, 1
+                ),
+            )
+        finally:
+            pre_save.disconnect(receiver, sender=Song)
+            post_save.disconnect(receiver, sender=Song)
+        fields = frozenset(["song_type"])
+        self.assertEqual(
+            [
+                (pre_save, songs[0].pk, Song.SKIT, fields),
+                (post_save, songs[0].pk, Song.SKIT, fields),
+                (pre_save, songs[1].pk, Song.SKIT, fields),
+                (post_save, songs[1].pk, Song.SKIT, fields),
+            ],
+            received,
+        )
+        self.assertEqual(
+            [Song.SKIT, Song.SKIT, Song.SINGLE],
+            [
+                _.song_type
+                for _ in Song.objects.filter(pk__in=[_.pk for _ in songs]).order_by(
+                    "pk"
+                )
+            ],
+        )
+
+    def test_protected_trees(self):
+        """Test finding protected objects anywhere below self-referencing objects."""
+        root = mommy.make("artist_app.Genre", name="Rock")
+        child = mommy.make("artist_app.Genre", name="Metal", parent=root)
+        grandchild = mommy.make("artist_app.Genre", name="Doom", parent=child)
+        jazz = mommy.make("artist_app.Genre", name="Jazz")
+        roots = Genre.objects.filter(parent=None)
+        self.assertFalse(has_protected_objects(roots))
+
+        album = mommy.make("artist_app.Album", genre=grandchild)
+        self.assertTrue(has_protected_objects(roots))
+        self.assertTrue(has_protected_objects(Genre.objects.filter(pk=root.pk)))
+        self.assertFalse(has_protected_objects(Genre.objects.filter(pk=jazz.pk)))
+
+        # deleting stops at the protected batch, the earlier ones stay deleted
+        album.genre = jazz
+        album.save()
+        with self.assertRaises(PartialDeleteError) as context:
+            delete_in_batches(roots, 1)
+        # the sub-genres of the first batch count too
+        self.assertEqual(3, context.exception.deleted)
+        self.assertEqual([jazz], list(Genre.objects.all()))
+
+    def test_delete_summary(self):
+        """Test counting what deleting objects affects."""
+        bands = mommy.make("artist_app.Band", _quantity=2)
+        mommy.make("artist_app.Member", band=bands[0], _quantity=2)
+        mommy.make("artist_app.Member", band=bands[1])
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                ([(Member, 2)], []),
+                get_delete_summary(Band.objects.filter(pk=bands[0].pk)),
+            )
+        self.assertEqual(([(Member, 3)], []), get_delete_summary(Band.objects.all()))
+
+        artists = mommy.make("artist_app.Artist", _quantity=2)
+        mommy.make("artist_app.Song", artist=artists[0], _quantity=3)
+        self.assertEqual(([], [(Song, 3)]), get_delete_summary(Artist.objects.all()))
+        self.assertEqual(
+            ([], []), get_delete_summary(Artist.objects.filter(pk=artists[1].pk))
+        )
+
+    def test_nested_delete_summary(self):
+        """Test counting what deleting trees of self-referencing objects affects."""
+        root = mommy.make("artist_app.Genre", name="Rock")
+        child = mommy.make("artist_app.Genre", name="Metal", parent=root)
+        grandchild = mommy.make("artist_app.Genre", name="Doom", parent=child)
+        mommy.make("artist_app.Genre", name="Punk", parent=root)
+        roots = Genre.objects.filter(pk=root.pk)
+        self.assertEqual(([(Genre, 3)], []), get_delete_summary(roots))
+        self.assertEqual(
+            ([(Genre, 1)], []), get_delete_summary(Genre.objects.filter(pk=child.pk))
+        )
+
+        url = reverse("genres-delete", kwargs={"pk": root.pk})
+        res = self.client.get(url)
+        self.assertEqual([("genres", 3)], res.context["vega_delete_cascades"])
+        self.assertContains(res, "<li>3 genres</li>", html=True)
+        self.assertContains(res, 'value="Confirm"')
+
+        mommy.make("artist_app.Album", genre=grandchild)
+        self.assertEqual(([(Genre, 3)], [(Album, 1)]), get_delete_summary(roots))
+        res = self.client.get(url)
+        self.assertEqual([("album", 1)], res.context["vega_delete_protected"])
+        self.assertNotContains(res, 'value="Confirm"')
+        self.client.post(url)
+        self.assertEqual(4, Genre.objects.count())
+
+    def test_bulk_delete(self):
+        """Test deleting the selected objects."""
+        artists = mommy.make("artist_app.Artist", _quantity=3)
+        res = self.client.get(reverse("bulk-artists-list"))
+        self.assertContains(res, 'class="vega-select-all"')
+        self.assertContains(res, f'name="selection" value="{artists[0].pk}"')
+        self.assertContains(res, f'formaction="{self.url}?"', count=2)
+
+        # the selection has to be confirmed
+        data = {"selection": [artists[0].pk, artists[1].pk]}
+        res = self.client.post(self.url, data)
+        self.assertEqual(200, res.status_code)
+        self.assertEqual(2, res.context["vega_bulk_count"])
+        self.assertContains(res, "delete 2 professional artists?")
+        self.assertContains(res, f'name="selection" value="{artists[1].pk}"')
+        self.assertEqual(3, Artist.objects.count())
+
+        data["confirm"] = "1"
+        res = self.client.post(self.url, data, follow=True)
+        self.assertRedirects(res, reverse("bulk-artists-list"))
+        self.assertEqual(
+            ["2 deleted successfully!"], [str(_) for _ in res.context["messages"]]
+        )
+        self.assertEqual([artists[2]], list(Artist.objects.all()))
+
+        # nothing selected
+        res = self.client.post(self.url, {"confirm": "1"}, follow=True)
+        self.assertIn(
+            settings.VEGA_BULK_NOTHING_SELECTED_TXT,
+            [str(_) for _ in res.context["messages"]],
+        )
+        self.assertEqual(1, Artist.objects.count())
+
+    def test_bulk_delete_all(self):
+        """Test deleting every object that matches the search and filters."""
+        for name in ["Keep", "Drop 1", "Drop 2", "Drop 3", "Drop 4", "Drop 5"]:
+            mommy.make("artist_app.Artist", name=name)
+        res = self.client.post(
+            f"{self.url}?q=Drop", {"all": "1", "confirm": "1"}, follow=True
+        )
+        self.assertRedirects(res, f"{reverse('bulk-artists-list')}?q=Drop")
+        self.assertEqual(
+            ["5 deleted successfully!"], [str(_) for _ in res.context["messages"]]
+        )
+        self.assertEqual(["Keep"], [_.name for _ in Artist.objects.all()])
+
+    def test_bulk_delete_protected(self):
+        """Test that protected objects stop the whole bulk delete."""
+        artists = mommy.make("artist_app.Artist", _quantity=3)
+        mommy.make("artist_app.Song", artist=artists[2])
+        res = self.client.post(self.url, {"all": "1", "confirm": "1"}, follow=True)
+        self.assertEqual(
+            [settings.VEGA_DELETE_PROTECTED_ERROR_TXT],
+            [str(_) for _ in res.context["messages"]],
+        )
+        self.assertEqual(3, Artist.objects.count())
+
+    def test_bulk_delete_permissions(self):
+        """Test that the bulk delete action needs the delete permission."""
+        crud = BulkArtistCRUD()
+        self.assertIn("bulk_delete", crud.get_permissions_actions())
+        self.assertIn("bulk_delete", crud.get_protected_actions())
+        self.assertEqual(
+            "artist_app.delete_artist", crud.get_permission_for_action("bulk_delete")
+        )
+
+        artist = mommy.make("artist_app.Artist")
+        user = mommy.make("auth.User", username="bob")
+        user.set_password("hunter2")
+        user.save()
+        permission, _ = Permission.objects.get_or_create(
+            codename="list_artist",
+            content_type=ContentType.objects.get_for_model(Artist),
+            defaults=dict(name="Can List Artist"),
+        )
+        user.user_permissions.add(permission)
+        self.client.login(username="bob", password="hunter2")
+
+        res = self.client.get(reverse("bulk-artists-list"))
+        self.assertEqual(200, res.status_code)
+        self.assertFalse(res.context["vega_can_bulk_delete"])
+        self.assertNotContains(res, "vega-bulk-form")
+        self.assertNotContains(res, "vega-select")
+
+        data = {"selection": [artist.pk], "confirm": "1"}
+        res = self.client.post(self.url, data)
+        self.assertEqual(302, res.status_code)
+        self.assertEqual(1, Artist.objects.count())
+
+    def test_bulk_update(self):
+        """Test setting a field on the selected objects."""
+        url = reverse("bulk-songs-bulk_update")
+        songs = mommy.make("artist_app.Song", song_type=Song.SINGLE, _quantity=3)
+        res = self.client.get(reverse("bulk-songs-list"))
+        self.assertContains(res, f'formaction="{url}?"', count=2)
+        self.assertNotContains(res, "vega-bulk-delete")
+
+        # the selection has to be confirmed
+        data = {"selection": [songs[0].pk, songs[1].pk]}
+        res = self.client.post(url, data)
+        self.assertEqual(200, res.status_code)
+        self.assertEqual(2, res.context["vega_bulk_count"])
+        self.assertEqual(["song_type"], list(res.context["form"].fields))
+        self.assertFalse(res.context["form"].is_bound)
+        self.assertContains(res, 'name="song_type"')
+
+        # the values are validated
+        data["confirm"] = "1"
+        data["song_type"] = "9"
+        res = self.client.post(url, data)
+        self.assertEqual(200, res.status_code)
+        self.assertTrue(res.context["form"].errors)
+        self.assertFalse(Song.objects.exclude(song_type=Song.SINGLE).exists())
+
+        data["song_type"] = Song.SKIT
+        res = self.client.post(url, data, follow=True)
+        self.assertRedirects(res, reverse("bulk-songs-list"))
+        self.assertIn(
+            "2 updated successfully!", [str(_) for _ in res.context["messages"]]
+        )
+        self.assertEqual(
+            [Song.SKIT, Song.SKIT, Song.SINGLE],
+            [_.song_type for _ in Song.objects.order_by("pk")],
+        )
+
+    def test_bulk_update_fields(self):
+        """Test that the bulk update fields are explicit and safe to set."""
+        self.assertEqual(["song_type"], BulkSongCRUD().get_bulk_update_fields())
+        for fields in [None, [], ["id"], ["name", "member"]]:
+            crud = BulkSongCRUD(model=Band)
+            crud.bulk_update_fields = fields
+            with self.assertRaises(ImproperlyConfigured):
+                crud.get_bulk_updateform_class()
+
+    def test_bulk_update_all(self):
+        """Test setting a field on every object that matches the search."""
+        url = reverse("bulk-songs-bulk_update")
+        for name in ["Keep", "Skit 1", "Skit 2", "Skit 3"]:
+            mommy.make("artist_app.Song", name=name, song_type=Song.SINGLE)
+        data = {"all": "1", "confirm": "1", "song_type": Song.SKIT}
+        res = self.client.post(f"{url}?q=Skit", data, follow=True)
+        self.assertRedirects(res, f"{reverse('bulk-songs-list')}?q=Skit")
+        self.assertIn(
+            "3 updated successfully!", [str(_) for _ in res.context["messages"]]
+        )
+        self.assertEqual(
+            ["Keep"], [_.name for _ in Song.objects.filter(song_type=Song.SINGLE)]
+        )
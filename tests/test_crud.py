@@ -1,21 +1,38 @@
 """vega-admin module to test views."""
+from typing import List
+
 from django.conf import settings
 from django.contrib.auth.models import User
 from django.core.exceptions import ImproperlyConfigured
-from django.test import override_settings
-from django.urls import reverse
+from django.test import RequestFactory, override_settings
+from django.urls import Resolver404, resolve, reverse
 
 from model_mommy import mommy
 
+from vega_admin.contrib.users.views import GroupCRUD, UserCRUD
+from vega_admin.testing import (
+    DatabaseAccessError,
+    get_url_patterns_without_queries,
+    no_database_access,
+)
+from vega_admin.views import VegaCRUDView
+
+from .artist_app import views
 from .artist_app.forms import (
     ArtistForm,
     CustomSearchForm,
     PlainArtistForm,
+    QueryingSongForm,
     UpdateArtistForm,
 )
-from .artist_app.models import Artist
+from .artist_app.models import Artist, Song
 from .artist_app.tables import ArtistTable
-from .artist_app.views import CustomDefaultActions, CustomSongCRUD
+from .artist_app.views import (
+    AlbumCRUD,
+    AutocompleteSongCRUD,
+    CustomDefaultActions,
+    CustomSongCRUD,
+)
 from .test_views import TestViewsBase
 
 
@@ -52,6 +69,119 @@ class TestCRUD(TestViewsBase):
         self.assertEqual("/private-songs/artists/", reverse("private-songs-artists"))
         self.assertEqual("/private-songs/template/", reverse("private-songs-template"))
 
+    def test_url_patterns_without_queries(self):
+        """Test that loading url patterns does not use the database."""
+        for crud_class in [
+            views.ArtistCRUD,
+            views.CustomArtistCRUD,
+            views.SongCRUD,
+            views.CustomSongCRUD,
+            views.PermsSongCRUD,
+            views.CustomDefaultActions,
+            views.Artist42CRUD,
+            views.PlainFormCRUD,
+            views.CreateOnlyCRUD,
+            views.ExportSongCRUD,
+            UserCRUD,
+            GroupCRUD,
+        ]:
+            get_url_patterns_without_queries(crud_class())
+
+        class QueryingFormCRUD(VegaCRUDView):
+            model = Song
+            form_class = QueryingSongForm
+            crud_path = "querying-songs"
+
+        patterns = get_url_patterns_without_queries(QueryingFormCRUD())
+        self.assertEqual(5, len(patterns))
+
+        with self.assertRaises(DatabaseAccessError):
+            with no_database_access():
+                QueryingSongForm()
+
+    def test_lazy_views(self):
+        """Test that lazy CRUD views build their views on the first request."""
+        built = []
+
+        class LazyCRUD(views.LazyArtistCRUD):
+            def get_view_class_for_action(self, action):
+                built.append(action)
+                return super().get_view_class_for_action(action)
+
+        class EagerCRUD(views.LazyArtistCRUD):
+            lazy_views = False
+
+        patterns = LazyCRUD().url_patterns()
+        self.assertEqual([], built)
+        self.assertEqual(
+            [str(_.pattern) for _ in EagerCRUD().url_patterns()],
+            [str(_.pattern) for _ in patterns],
+        )
+
+        mommy.make("artist_app.Artist", name="Mosh")
+        list_view = [_ for _ in patterns if _.name == "lazy-artists-list"][0]
+        for _ in range(2):
+            res = list_view.callback(RequestFactory().get("/lazy-artists/list/"))
+            self.assertEqual(
+                ["Mosh"], [_.name for _ in res.context_data["object_list"]]
+            )
+        self.assertEqual(["list"], built)
+
+        # lazy views work like any other view
+        artist = mommy.make("artist_app.Artist", name="Eddie")
+        res = self.client.get(reverse("lazy-artists-view", kwargs={"pk": artist.pk}))
+        self.assertEqual(200, res.status_code)
+        self.assertContains(res, "Eddie")
+        res = self.client.post(reverse("lazy-artists-create"), {"name": "Tranx"})
+        self.assertRedirects(res, reverse("lazy-artists-list"))
+        self.assertTrue(Artist.objects.filter(name="Tranx").exists())
+
+        class InvalidLazyCRUD(views.LazyArtistCRUD):
+            actions = ["nope"]
+
+        with self.assertRaises(Exception) as context:
+            InvalidLazyCRUD().url_patterns()
+        self.assertEqual(settings.VEGA_INVALID_ACTION, str(context.exception))
+
+    def test_included_url_patterns(self):
+        """Test CRUD url patterns grouped under their crud_path."""
+        patterns = views.IncludedSongCRUD().url_patterns()
+        self.assertEqual(1, len(patterns))
+        self.assertEqual("included-songs/", str(patterns[0].pattern))
+
+        song = mommy.make("artist_app.Song", name="Abc")
+        for action in views.IncludedSongCRUD().get_actions():
+            kwargs = {"pk": song.pk} if action in ["view", "update", "delete"] else {}
+            url = reverse(f"included-songs-{action}", kwargs=kwargs)
+            self.assertEqual(
+                reverse(f"private-songs-{action}", kwargs=kwargs).replace(
+                    "/private-songs/", "/included-songs/"
+                ),
+                url,
+            )
+            self.assertEqual(f"included-songs-{action}", resolve(url).url_name)
+
+        res = self.client.get(reverse("included-songs-list"))
+        self.assertEqual(200, res.status_code)
+        self.assertContains(res, "Abc")
+        with self.assertRaises(Resolver404):
+            resolve("/included-songs/nope/")
+
+        # patterns that are not under the crud_path are left alone
+        class ElsewhereView(views.ArtistListView):
+            @classmethod
+            def derive_url_pattern(cls, crud_path, action):
+                return "elsewhere/"
+
+        class ElsewhereCRUD(views.IncludedSongCRUD):
+            actions = ["list"]
+            view_classes = {"elsewhere": ElsewhereView}
+
+        patterns = ElsewhereCRUD().url_patterns()
+        self.assertEqual(
+            ["elsewhere/", "included-songs/"], [str(_.pattern) for _ in patterns]
+        )
+
     def test_create(self):
         """Test CRUD create."""
         url = reverse("artist_app.artist-create")
@@ -171,8 +301,10 @@ class TestCRUD(TestViewsBase):
             f"/artist_app.artist/delete/{artist2.pk}/",
             res.context_data["vega_delete_url"],
         )
+        self.assertEqual([], res.context_data["vega_delete_cascades"])
+        self.assertEqual([("Song", 1)], res.context_data["vega_delete_protected"])
         csrf_token = str(res.context["csrf_token"])
-        html = f"""<!doctype html> <html lang="en"> <head> <meta charset="utf-8"> <title> Delete professional artist </title> </head> <body> <form action="" method="post"> <input type="hidden" name="csrfmiddlewaretoken" value="{csrf_token}"> <p>Are you sure you want to delete "Coco"?</p> <input type="submit" value="Confirm" /> </form> </body> </html>"""  # noqa
+        html = f"""<!doctype html> <html lang="en"> <head> <meta charset="utf-8"> <title> Delete professional artist </title> </head> <body> <form action="" method="post"> <input type="hidden" name="csrfmiddlewaretoken" value="{csrf_token}"> <p>You cannot delete "Coco", it is referenced by:</p> <ul class="vega-delete-protected"><li>1 Song</li></ul> </form> </body> </html>"""  # noqa
         self.assertHTMLEqual(html, res.content.decode("utf-8"))
 
     def test_list(self):
@@ -255,6 +387,88 @@ class TestCRUD(TestViewsBase):
         html = f"""<!doctype html><html lang="en"><head><meta charset="utf-8"><title> Songs</title></head><body><div class="table-container"><table class="song-table"><thead ><tr><th class="orderable"> <a href="?sort=name">Name</a></th><th class="orderable"> <a href="?sort=artist">Artist</a></th><th > Actions</th></tr></thead><tbody ><tr class="even"><td >Song 1</td><td >Mosh</td><td ><a href='/artist_app.song/create/' class='vega-action'>create</a> | <a href='/artist_app.song/update/31/' class='vega-action'>update</a> | <a href='/artist_app.song/delete/31/' class='vega-action'>delete</a></td></tr><tr class="odd"><td >Song 2</td><td >Mosh</td><td ><a href='/artist_app.song/create/' class='vega-action'>create</a> | <a href='/artist_app.song/update/32/' class='vega-action'>update</a> | <a href='/artist_app.song/delete/32/' class='vega-action'>delete</a></td></tr><tr class="even"><td >Song 3</td><td >Mosh</td><td ><a href='/artist_app.song/create/' class='vega-action'>create</a> | <a href='/artist_app.song/update/33/' class='vega-action'>update</a> | <a href='/artist_app.song/delete/33/' class='vega-action'>delete</a></td></tr></tbody></table></div></body></html>"""  # noqa
         self.assertHTMLEqual(html, res.content.decode("utf-8"))
 
+    def test_list_relation_loading(self):
+        """Test that the CRUD list loads related objects without N+1 queries."""
+        for name in ["Song 1", "Song 2", "Song 3"]:
+            mommy.make("artist_app.Song", name=name)
+
+        view_class = CustomSongCRUD().get_view_class_for_action("list")
+        self.assertEqual(["artist"], view_class.select_related)
+        self.assertEqual([], view_class.prefetch_related)
+
+        url = reverse("artist_app.song-list")
+        with self.assertNumQueries(2):
+            # one count query and one query for the songs and their artists
+            res = self.client.get(url)
+        self.assertEqual(res.status_code, 200)
+        self.assertContains(res, "Song 3")
+
+        # the CRUD can override the plan
+        class NoJoinSongCRUD(CustomSongCRUD):
+            list_select_related: List[str] = []
+
+        view_class = NoJoinSongCRUD().get_view_class_for_action("list")
+        self.assertEqual([], view_class.select_related)
+
+    def test_list_only_fields(self):
+        """Test that the CRUD list only loads the fields that it needs."""
+        mommy.make("artist_app.Song", name="Song 1", artist__name="Mosh")
+
+        view_class = CustomSongCRUD().get_view_class_for_action("list")
+        self.assertEqual(
+            ["name", "artist", "artist__id", "artist__name"], view_class.only_fields
+        )
+
+        res = self.client.get(reverse("artist_app.song-list"))
+        self.assertEqual(res.status_code, 200)
+        song = res.context["object_list"][0]
+        self.assertEqual(
+            {"release_date", "release_time", "recording_time", "song_type"},
+            song.get_deferred_fields(),
+        )
+        self.assertContains(res, "Mosh")
+
+        # extra fields can be loaded on request
+        class ExtraSongCRUD(CustomSongCRUD):
+            list_extra_fields = ["release_date"]
+
+        view_class = ExtraSongCRUD().get_view_class_for_action("list")
+        self.assertEqual(
+            ["name", "artist", "release_date", "artist__id", "artist__name"],
+            view_class.only_fields,
+        )
+
+        # custom tables load every field
+        class TableSongCRUD(CustomSongCRUD):
+            table_class = ArtistTable
+
+        view_class = TableSongCRUD().get_view_class_for_action("list")
+        self.assertIsNone(view_class.only_fields)
+
+    def test_list_only_fields_nested(self):
+        """Test that related objects joined through others are loaded in full."""
+        for index in range(3):
+            mommy.make(
+                "artist_app.Album",
+                name=f"Album {index}",
+                genre__name=f"Genre {index}",
+                genre__parent__name=f"Parent {index}",
+            )
+
+        view_class = AlbumCRUD().get_view_class_for_action("list")
+        self.assertEqual(["genre__parent"], view_class.select_related)
+        self.assertIn("genre__parent__name", view_class.only_fields)
+
+        url = reverse("albums-list")
+        with self.assertNumQueries(2):
+            # one count query and one query for the albums and their genres
+            res = self.client.get(url)
+        self.assertEqual(res.status_code, 200)
+        self.assertContains(res, "Genre 2")
+        genre = res.context["object_list"][0].genre
+        self.assertEqual(set(), genre.get_deferred_fields())
+        self.assertEqual(set(), genre.parent.get_deferred_fields())
+
     def test_create_options(self):
         """Test CRUD create with options."""
         url = reverse("artist_app.song-create")
@@ -271,7 +485,9 @@ class TestCRUD(TestViewsBase):
         song = mommy.make("artist_app.Song", name="Song 1", artist=artist)
         url = reverse("artist_app.song-view", kwargs={"pk": song.id})
         # test content
-        res = self.client.get(url)
+        with self.assertNumQueries(1):
+            # the artist is fetched together with the song
+            res = self.client.get(url)
         self.assertEqual(["name", "artist"], res.context_data["vega_read_fields"])
         self.assertDictEqual(
             {"name": song.name, "artist": str(artist)},
@@ -324,6 +540,10 @@ class TestCRUD(TestViewsBase):
         expected = [f"artist_app.{action}_song" for action in actions]
 
         self.assertEqual(set(expected), set(CustomSongCRUD().get_permissions()))
+        # suggestions need the permission of the list
+        self.assertEqual(
+            ["artist_app.list_song"], AutocompleteSongCRUD().get_permissions()
+        )
 
     @override_settings(LOGIN_URL="/list/artists/")
     def test_login_protection(self):
@@ -0,0 +1,287 @@
+"""vega-admin module to test exports."""
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import Permission, User
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.http import StreamingHttpResponse
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from model_mommy import mommy
+
+from vega_admin.exports import (
+    JOB_DONE,
+    JOB_FAILED,
+    JOB_RUNNING,
+    get_export_job,
+    get_export_job_path,
+    iter_records,
+    replace_storage_file,
+    save_export_job,
+    save_unfinished_export_jobs,
+)
+
+from tests.artist_app.models import Artist, Song
+from tests.artist_app.views import ProtectedExportSongCRUD
+
+
+@override_settings(ROOT_URLCONF="tests.artist_app.urls", VEGA_TEMPLATE="basic")
+class TestExports(TestCase):
+    """Test class for table exports."""
+
+    def setUp(self):
+        """Set up."""
+        self.mosh = mommy.make("artist_app.Artist", name="Mosh")
+        mommy.make("artist_app.Song", name="B Song", artist=self.mosh)
+        mommy.make("artist_app.Song", name="A Song", artist=self.mosh)
+        mommy.make("artist_app.Song", name="C Song", artist__name="Eddie")
+
+    def test_csv_export(self):
+        """Test streaming CSV exports."""
+        url = reverse("artist_app.song-list")
+        with CaptureQueriesContext(connection) as context:
+            res = self.client.get(url, {"_export": "csv", "sort": "-name"})
+            content = b"".join(res.streaming_content).decode("utf-8")
+        self.assertEqual(200, res.status_code)
+        self.assertIsInstance(res, StreamingHttpResponse)
+        self.assertEqual("text/csv; charset=utf-8", res["Content-Type"])
+        self.assertEqual('attachment; filename="table.csv"', res["Content-Disposition"])
+        # the actions column is not exported
+        self.assertEqual(
+            "Name,Artist\r\nC Song,Eddie\r\nB Song,Mosh\r\nA Song,Mosh\r\n", content
+        )
+        # no counting and no N+1 queries
+        self.assertEqual(1, len(context.captured_queries))
+
+    def test_json_export(self):
+        """Test streaming JSON exports."""
+        url = reverse("artist_app.song-list")
+        res = self.client.get(url, {"_export": "json"})
+        self.assertIsInstance(res, StreamingHttpResponse)
+        self.assertEqual(
+            '[{"Name": "A Song", "Artist": "Mosh"}, '
+            '{"Name": "B Song", "Artist": "Mosh"}, '
+            '{"Name": "C Song", "Artist": "Eddie"}]',
+            b"".join(res.streaming_content).decode("utf-8"),
+        )
+
+    def test_other_exports(self):
+        """Test that other export formats are built in memory as before."""
+        url = reverse("artist_app.song-list")
+        res = self.client.get(url, {"_export": "tsv"})
+        self.assertNotIsInstance(res, StreamingHttpResponse)
+        self.assertEqual(
+            "Name\tArtist\r\nA Song\tMosh\r\nB Song\tMosh\r\nC Song\tEddie\r\n",
+            res.content.decode("utf-8"),
+        )
+
+    def test_iter_records(self):
+        """Test that records are fetched and prefetched in chunks."""
+        mommy.make("artist_app.Artist", _quantity=3)
+        queryset = Artist.objects.prefetch_related("song_set")
+        with self.assertNumQueries(3):
+            # one query for the artists and one prefetch query per chunk
+            records = list(iter_records(queryset, chunk_size=3))
+        self.assertEqual(list(Artist.objects.all()), records)
+        with self.assertNumQueries(0):
+            mosh = [_ for _ in records if _ == self.mosh][0]
+            self.assertEqual(2, len(mosh.song_set.all()))
+
+
+class ExportJobTestMixin:
+    """Mixin for export job tests."""
+
+    def setUp(self):
+        """Set up."""
+        super().setUp()
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        self.user = User.objects.create_user(username="bob", password="hunter2")
+        self.client.force_login(self.user)
+        mommy.make("artist_app.Song", name="Moshpit", artist__name="Mosh")
+        mommy.make("artist_app.Song", name="Freestyle", artist__name="Eddie")
+
+    def tearDown(self):
+        """Tear down."""
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root)
+        super().tearDown()
+
+
+@override_settings(
+    ROOT_URLCONF="tests.artist_app.urls",
+    VEGA_TEMPLATE="basic",
+    VEGA_EXPORT_JOB_WORKERS=0,
+)
+class TestExportJobs(ExportJobTestMixin, TestCase):
+    """Test class for background export jobs."""
+
+    def test_export_job(self):
+        """Test starting an export job, checking on it and downloading it."""
+        url = reverse("export-songs-export")
+
+        res = self.client.get(reverse("export-songs-list"))
+        self.assertEqual(url, res.context["vega_export_url"])
+        self.assertContains(res, "vega-export-form")
+
+        res = self.client.post(f"{url}?q=Mosh", {"_export": "csv"})
+        self.assertEqual(202, res.status_code)
+        data = res.json()
+        self.assertEqual(JOB_DONE, data["status"])
+        self.assertEqual(1, data["rows"])
+        self.assertEqual(1, data["total"])
+        self.assertEqual(100, data["progress"])
+        self.assertEqual(f"{url}?job={data['id']}", data["status_url"])
+
+        res = self.client.get(data["status_url"])
+        self.assertEqual(data, res.json())
+
+        res = self.client.get(data["download_url"])
+        self.assertEqual('attachment; filename="table.csv"', res["Content-Disposition"])
+        self.assertEqual(
+            b"Name,Artist\r\nMoshpit,Mosh\r\n", b"".join(res.streaming_content)
+        )
+
+    def test_export_job_page(self):
+        """Test that the export form leads to a page that shows the job."""
+        url = reverse("export-songs-export")
+        res = self.client.post(
+            f"{url}?q=Mosh", {"_export": "csv"}, HTTP_ACCEPT="text/html"
+        )
+        self.assertEqual(302, res.status_code)
+        job_id = res.url.split("job=")[1]
+        self.assertEqual(f"{url}?job={job_id}", res.url)
+
+        res = self.client.get(res.url, HTTP_ACCEPT="text/html")
+        self.assertTemplateUsed(res, "vega_admin/basic/export_job.html")
+        self.assertEqual(JOB_DONE, res.context["vega_export_job"]["status"])
+        self.assertContains(res, f'href="{url}?job={job_id}&amp;download=1"')
+        self.assertNotContains(res, "setTimeout(poll")
+
+        # unfinished jobs are polled until their file is ready
+        job = get_export_job(job_id)
+        job["status"] = JOB_RUNNING
+        save_export_job(job)
+        res = self.client.get(f"{url}?job={job_id}", HTTP_ACCEPT="text/html")
+        self.assertContains(res, "setTimeout(poll")
+        self.assertIsNone(res.context["vega_export_job"]["download_url"])
+        job["status"] = JOB_DONE
+        save_export_job(job)
+
+    def test_export_button(self):
+        """Test that the export button is only shown to users who may export."""
+        res = self.client.get(reverse("export-songs-list"))
+        self.assertContains(res, "vega-export-form")
+        self.client.logout()
+        res = self.client.get(reverse("export-songs-list"))
+        self.assertEqual(200, res.status_code)
+        self.assertNotContains(res, "vega-export-form")
+
+    def test_tablib_export_job(self):
+        """Test export jobs for formats that are not streamed."""
+        url = reverse("export-songs-export")
+        data = self.client.post(url, {"_export": "tsv"}).json()
+        self.assertEqual(JOB_DONE, data["status"])
+        res = self.client.get(data["download_url"])
+        self.assertEqual(
+            b"Name\tArtist\r\nFreestyle\tEddie\r\nMoshpit\tMosh\r\n",
+            b"".join(res.streaming_content),
+        )
+
+    def test_export_job_errors(self):
+        """Test invalid export job requests."""
+        url = reverse("export-songs-export")
+        self.assertEqual(400, self.client.post(url, {"_export": "nope"}).status_code)
+        self.assertEqual(404, self.client.get(url).status_code)
+        self.assertEqual(404, self.client.get(url, {"job": "nope"}).status_code)
+
+        # jobs are private to their users
+        data = self.client.post(url, {"_export": "csv"}).json()
+        other = User.objects.create_user(username="eve", password="hunter2")
+        self.client.force_login(other)
+        self.assertEqual(404, self.client.get(data["status_url"]).status_code)
+        self.assertEqual(404, self.client.get(data["download_url"]).status_code)
+
+        # login is required
+        self.client.logout()
+        self.assertEqual(302, self.client.get(data["status_url"]).status_code)
+
+    def test_export_job_state(self):
+        """Test that job states are replaced in one step and that stale jobs fail."""
+        url = reverse("export-songs-export")
+        data = self.client.post(url, {"_export": "csv"}).json()
+        job = get_export_job(data["id"])
+        path = get_export_job_path(job["id"], "job.json")
+        directory = os.path.dirname(os.path.join(self.media_root, path))
+        self.assertEqual(["job.json", "table.csv"], sorted(os.listdir(directory)))
+
+        # the job of a process that stopped
+        job.update(status=JOB_RUNNING, updated=time.time() - 1000)
+        replace_storage_file(path, json.dumps(job).encode("utf-8"))
+        self.assertEqual(["job.json", "table.csv"], sorted(os.listdir(directory)))
+        data = self.client.get(data["status_url"]).json()
+        self.assertEqual(JOB_FAILED, data["status"])
+        self.assertEqual(settings.VEGA_EXPORT_JOB_STALE_TXT, data["error"])
+
+        # the unfinished jobs of this process are kept alive
+        save_export_job(job)
+        updated = get_export_job(job["id"])["updated"]
+        save_unfinished_export_jobs()
+        self.assertLessEqual(updated, get_export_job(job["id"])["updated"])
+        self.assertEqual(JOB_RUNNING, get_export_job(job["id"])["status"])
+        job["status"] = JOB_DONE
+        save_export_job(job)
+
+    def test_export_job_permissions(self):
+        """Test that exports are protected like the list by default."""
+        crud = ProtectedExportSongCRUD()
+        self.assertEqual(
+            (True, "artist_app.list_song"), crud.get_action_access()["export"]
+        )
+        self.assertIn("export", crud.get_protected_actions())
+        self.assertIn("export", crud.get_permissions_actions())
+
+        url = reverse("protected-export-songs-export")
+        data = {"_export": "csv"}
+        # no permission
+        self.assertEqual(302, self.client.post(url, data).status_code)
+        self.client.logout()
+        self.assertEqual(302, self.client.post(url, data).status_code)
+
+        permission, _ = Permission.objects.get_or_create(
+            codename="list_song",
+            content_type=ContentType.objects.get_for_model(Song),
+            defaults=dict(name="Can List Song"),
+        )
+        self.user.user_permissions.add(permission)
+        self.client.force_login(self.user)
+        self.assertEqual(202, self.client.post(url, data).status_code)
+
+
+@override_settings(
+    ROOT_URLCONF="tests.artist_app.urls",
+    VEGA_TEMPLATE="basic",
+    VEGA_EXPORT_JOB_WORKERS=1,
+)
+class TestExportJobThreads(ExportJobTestMixin, TransactionTestCase):
+    """Test class for export jobs that run in the thread pool."""
+
+    def test_export_job_thread(self):
+        """Test that export jobs run in the background."""
+        url = reverse("export-songs-export")
+        data = self.client.post(url, {"_export": "json"}).json()
+        for _ in range(100):
+            job = get_export_job(data["id"])
+            if job["status"] == JOB_DONE:
+                break
+            time.sleep(0.05)
+        self.assertEqual(JOB_DONE, job["status"])
+        self.assertEqual(2, job["rows"])
@@ -5,6 +5,10 @@ from django.urls import reverse
 
 from model_mommy import mommy
 
+from vega_admin.utils import get_filterclass
+from vega_admin.widgets import VegaRemoteSelect
+
+from .artist_app.models import Song
 from .test_views import TestViewsBase
 
 
@@ -80,3 +84,36 @@ class TestFilters(TestViewsBase):
             "q": None
         }, res.context["vega_listview_search_form"].initial)
         self.assertEqual(res.context["object_list"].count(), 1)
+
+    @override_settings(VEGA_REMOTE_CHOICES_THRESHOLD=1)
+    def test_remote_choice_filters(self):
+        """
+        Test that filters of large related tables only render the selection
+        """
+        artist1 = mommy.make("artist_app.Artist", name="Mosh")
+        artist2 = mommy.make("artist_app.Artist", name="Tranx")
+        mommy.make("artist_app.Song", name="1", artist=artist1)
+
+        bob_user = mommy.make("auth.User")
+        permissions = self._song_permissions()
+        bob_user.user_permissions.add(*permissions)
+        bob_user = User.objects.get(pk=bob_user.pk)
+        self.client.force_login(bob_user)
+
+        res = self.client.get(f"{reverse('filters-list')}?artist={artist2.pk}")
+        self.assertEqual(200, res.status_code)
+        self.assertEqual(res.context["object_list"].count(), 0)
+        form = res.context["vega_listview_search_form"]
+        self.assertIsInstance(form.fields["artist"].widget, VegaRemoteSelect)
+        with self.assertNumQueries(1):
+            html = str(form["artist"])
+        self.assertIn("Tranx", html)
+        self.assertNotIn("Mosh", html)
+        self.assertIn(reverse("autocomplete-artists-autocomplete"), html)
+
+        filter_class = get_filterclass(model=Song, fields=["artist"])
+        the_filter = filter_class({"artist": artist1.pk})
+        self.assertIsInstance(
+            the_filter.form.fields["artist"].widget, VegaRemoteSelect
+        )
+        self.assertEqual(1, the_filter.qs.count())
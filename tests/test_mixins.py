@@ -6,11 +6,17 @@ from django.test import RequestFactory, TestCase
 from django.views.generic import TemplateView
 from django.views.generic.list import ListView
 
+from django_filters import FilterSet
 from model_mommy import mommy
 
+from vega_admin.introspection import (get_lookup_field,
+                                      get_relation_loading_plan,
+                                      lookup_spans_multivalued_relation)
 from vega_admin.mixins import (ListViewSearchMixin, PageTitleMixin,
                                VerboseNameMixin)
 
+from tests.artist_app.models import Artist, Song
+
 
 class TestMixins(TestCase):
     """
@@ -111,3 +117,151 @@ class TestMixins(TestCase):
         self.assertEqual(1, response2.context_data['object_list'].count())
         self.assertEqual(
             mosh_user, response2.context_data['object_list'].first())
+
+    def get_view_queryset(self, view_class, url):
+        """
+        Get the queryset of a view for the provided url
+        """
+        request = self.factory.get(url)
+        request.session = {}
+        request.user = AnonymousUser
+        view = view_class()
+        view.setup(request)
+        return view.get_queryset()
+
+    def assert_no_distinct(self, queryset):
+        """
+        Assert that the query does not de-duplicate rows, and that the
+        results do not contain duplicates
+        """
+        self.assertNotIn("DISTINCT", str(queryset.query).upper())
+        pks = [_.pk for _ in queryset]
+        self.assertEqual(len(set(pks)), len(pks))
+        self.assertEqual(len(pks), queryset.count())
+
+    def test_lookup_spans_multivalued_relation(self):
+        """
+        Test lookup_spans_multivalued_relation
+        """
+        self.assertFalse(lookup_spans_multivalued_relation(Song, "name"))
+        self.assertFalse(
+            lookup_spans_multivalued_relation(Song, "name__icontains"))
+        self.assertFalse(lookup_spans_multivalued_relation(Song, "artist"))
+        self.assertFalse(
+            lookup_spans_multivalued_relation(Song, "artist__name__icontains"))
+        self.assertTrue(lookup_spans_multivalued_relation(Artist, "song"))
+        self.assertTrue(
+            lookup_spans_multivalued_relation(Artist, "song__name__icontains"))
+        self.assertTrue(lookup_spans_multivalued_relation(User, "groups__name"))
+
+    def test_get_lookup_field(self):
+        """
+        Test get_lookup_field
+        """
+        self.assertEqual(Song._meta.get_field("name"),
+                         get_lookup_field(Song, "name"))
+        self.assertEqual(Artist._meta.pk, get_lookup_field(Song, "artist"))
+        self.assertEqual(Artist._meta.get_field("name"),
+                         get_lookup_field(Song, "artist__name"))
+        self.assertEqual(Song._meta.pk, get_lookup_field(Song, "pk"))
+        self.assertIsNone(get_lookup_field(Song, "name__icontains"))
+
+    def test_get_relation_loading_plan(self):
+        """
+        Test get_relation_loading_plan
+        """
+        self.assertEqual(
+            (['artist'], []),
+            get_relation_loading_plan(
+                Song, ['name', 'artist', 'artist__name', 'artist.name', 'pk']))
+        self.assertEqual(
+            ([], ['song_set']),
+            get_relation_loading_plan(Artist, ['name', 'song_set', 'song']))
+        self.assertEqual(
+            ([], ['groups', 'user_permissions__content_type']),
+            get_relation_loading_plan(
+                User, ['groups', 'user_permissions__content_type__app_label']))
+
+    def test_listview_search_mixin_distinct(self):
+        """
+        Test that ListViewSearchMixin only de-duplicates when it has to
+        """
+        mosh = mommy.make('artist_app.Artist', name='mosh')
+        eddie = mommy.make('artist_app.Artist', name='eddie')
+        mommy.make('artist_app.Song', name='moshpit', artist=mosh)
+        mommy.make('artist_app.Song', name='moshing', artist=mosh)
+        mommy.make('artist_app.Song', name='mosh remix', artist=eddie)
+        mommy.make('artist_app.Song', name='other', artist=eddie)
+
+        class SongView(ListViewSearchMixin, ListView):
+            """
+            Song view that searches across a forward foreign key
+            """
+            model = Song
+            search_fields = ['name', 'artist__name']
+
+        class ArtistView(ListViewSearchMixin, ListView):
+            """
+            Artist view that searches across a reverse foreign key
+            """
+            model = Artist
+            search_fields = ['name', 'song__name']
+
+        # no search at all
+        queryset = self.get_view_queryset(SongView, '/')
+        self.assert_no_distinct(queryset)
+        self.assertEqual(4, queryset.count())
+
+        # plain search, and search across a foreign key
+        queryset = self.get_view_queryset(SongView, '/?q=mosh')
+        self.assert_no_distinct(queryset)
+        self.assertEqual(3, queryset.count())
+
+        # search across a reverse foreign key looks the songs up in a
+        # correlated subquery, mosh has two matching songs
+        queryset = self.get_view_queryset(ArtistView, '/?q=mosh')
+        self.assert_no_distinct(queryset)
+        sql = str(queryset.query).upper()
+        self.assertIn("EXISTS(SELECT", sql)
+        self.assertIn('FROM "ARTIST_APP_SONG"', sql)
+        self.assertNotIn('JOIN "ARTIST_APP_SONG"', sql)
+        self.assertEqual([eddie, mosh], list(queryset))
+
+        # every term can match a different song
+        queryset = self.get_view_queryset(ArtistView, '/?q=moshpit+moshing')
+        self.assert_no_distinct(queryset)
+        self.assertEqual([mosh], list(queryset))
+
+    def test_listview_filter_mixin_distinct(self):
+        """
+        Test that ListViewSearchMixin filters across reverse relations
+        without producing duplicates
+        """
+        mosh = mommy.make('artist_app.Artist', name='mosh')
+        mommy.make('artist_app.Artist', name='eddie')
+        mommy.make('artist_app.Song', name='hit', artist=mosh, _quantity=3)
+
+        class ArtistFilter(FilterSet):
+            """
+            Artist filter class
+            """
+            class Meta:
+                model = Artist
+                fields = ['name', 'song__name']
+
+        class ArtistView(ListViewSearchMixin, ListView):
+            """
+            Artist view with filters
+            """
+            model = Artist
+            filter_class = ArtistFilter
+
+        queryset = self.get_view_queryset(ArtistView, '/?name=mosh')
+        self.assert_no_distinct(queryset)
+        self.assertEqual([mosh], list(queryset))
+
+        # mosh has three matching songs
+        queryset = self.get_view_queryset(ArtistView, '/?song__name=hit')
+        self.assert_no_distinct(queryset)
+        self.assertIn("EXISTS(SELECT", str(queryset.query).upper())
+        self.assertEqual([mosh], list(queryset))
@@ -0,0 +1,240 @@
+"""vega-admin module to test pagination."""
+from unittest import skipUnless
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from model_mommy import mommy
+
+from vega_admin.pagination import (
+    KEYSET_NEXT,
+    CappedCountPaginator,
+    EstimatedCountPaginator,
+    ExactCountPaginator,
+    KeysetPaginator,
+    decode_cursor,
+    encode_cursor,
+    get_estimated_count,
+    get_keyset_ordering,
+)
+
+from tests.artist_app.models import Artist, Song
+
+
+class TestKeysetPaginator(TestCase):
+    """Test class for the keyset paginator."""
+
+    def test_get_keyset_ordering(self):
+        """Test get_keyset_ordering."""
+        self.assertEqual(["-pk"], get_keyset_ordering(Artist, ["-pk"]))
+        self.assertEqual(["name", "pk"], get_keyset_ordering(Artist, ["name"]))
+        self.assertEqual(["-id"], get_keyset_ordering(Artist, ["-id"]))
+        self.assertEqual(
+            ["artist_id", "-name", "pk"], get_keyset_ordering(Song, ["artist", "-name"])
+        )
+        self.assertEqual(
+            ["artist__name", "pk"], get_keyset_ordering(Song, ["artist__name"])
+        )
+        with self.assertRaises(ImproperlyConfigured):
+            get_keyset_ordering(Artist, ["?"])
+        with self.assertRaises(ImproperlyConfigured):
+            get_keyset_ordering(Artist, ["nope"])
+        with self.assertRaises(ImproperlyConfigured):
+            get_keyset_ordering(Artist, ["song__name"])
+
+    def test_cursors(self):
+        """Test that cursors survive a round trip and reject tampering."""
+        cursor = encode_cursor(["Bob", 4], KEYSET_NEXT)
+        self.assertEqual((KEYSET_NEXT, ["Bob", 4]), decode_cursor(cursor, size=2))
+        self.assertIsNone(decode_cursor(cursor, size=3))
+        self.assertIsNone(decode_cursor(f"x{cursor}", size=2))
+        self.assertIsNone(decode_cursor("garbage", size=2))
+
+    def test_pages(self):
+        """Test walking forwards and backwards through the pages."""
+        # names with duplicates so that the pk tie-breaker matters
+        for name in ["a", "b", "b", "b", "c", "d", "e"]:
+            mommy.make("artist_app.Artist", name=name)
+        expected = list(Artist.objects.order_by("name", "pk"))
+        paginator = KeysetPaginator(Artist.objects.all(), 3, ["name"])
+
+        page1 = paginator.page()
+        self.assertEqual(expected[:3], page1.object_list)
+        self.assertTrue(page1.has_next())
+        self.assertFalse(page1.has_previous())
+        self.assertIsNone(page1.previous_cursor)
+
+        page2 = paginator.page(page1.next_cursor)
+        self.assertEqual(expected[3:6], page2.object_list)
+        self.assertTrue(page2.has_next())
+        self.assertTrue(page2.has_previous())
+
+        page3 = paginator.page(page2.next_cursor)
+        self.assertEqual(expected[6:], page3.object_list)
+        self.assertFalse(page3.has_next())
+        self.assertIsNone(page3.next_cursor)
+
+        back = paginator.page(page3.previous_cursor)
+        self.assertEqual(expected[3:6], back.object_list)
+        self.assertTrue(back.has_previous())
+        self.assertTrue(back.has_next())
+
+        first = paginator.page(back.previous_cursor)
+        self.assertEqual(expected[:3], first.object_list)
+        self.assertFalse(first.has_previous())
+
+        # invalid cursors get you the first page
+        self.assertEqual(expected[:3], paginator.page("nope").object_list)
+
+    def test_pages_are_sliced_without_offset(self):
+        """Test that pages are fetched with a filter instead of OFFSET."""
+        mommy.make("artist_app.Artist", _quantity=5)
+        paginator = KeysetPaginator(Artist.objects.all(), 2, ["-pk"])
+        page1 = paginator.page()
+        with CaptureQueriesContext(connection) as context:
+            page2 = paginator.page(page1.next_cursor)
+        self.assertEqual(2, len(page2))
+        self.assertEqual(1, len(context.captured_queries))
+        self.assertNotIn("OFFSET", context.captured_queries[0]["sql"].upper())
+
+
+@override_settings(ROOT_URLCONF="tests.artist_app.urls", VEGA_TEMPLATE="basic")
+class TestKeysetPaginationView(TestCase):
+    """Test class for list views that use keyset pagination."""
+
+    def test_keyset_list(self):
+        """Test navigating a keyset paginated list view."""
+        mommy.make("artist_app.Artist", name="Eddie")
+        mommy.make("artist_app.Artist", name="Mosh")
+        mommy.make("artist_app.Artist", name="Tranx")
+        url = reverse("keyset-artists-list")
+
+        res = self.client.get(url)
+        self.assertEqual(200, res.status_code)
+        self.assertEqual(
+            ["Eddie", "Mosh"], [_.name for _ in res.context["object_list"]]
+        )
+        self.assertEqual(
+            ["Eddie", "Mosh"], [_.record.name for _ in res.context["table"].rows]
+        )
+        self.assertFalse(hasattr(res.context["table"], "page"))
+        self.assertFalse(res.context["table"].orderable)
+        page = res.context["vega_keyset_page"]
+        self.assertTrue(page.has_next())
+        self.assertContains(res, "vega-keyset-pager")
+
+        res = self.client.get(url, {"cursor": page.next_cursor})
+        self.assertEqual(["Tranx"], [_.name for _ in res.context["object_list"]])
+        page = res.context["vega_keyset_page"]
+        self.assertFalse(page.has_next())
+        self.assertTrue(page.has_previous())
+
+        res = self.client.get(url, {"cursor": page.previous_cursor})
+        self.assertEqual(
+            ["Eddie", "Mosh"], [_.name for _ in res.context["object_list"]]
+        )
+
+    def test_offset_list_has_no_keyset_page(self):
+        """Test that offset pagination remains the default."""
+        res = self.client.get(reverse("artist_app.artist-list"))
+        self.assertIsNone(res.context["vega_keyset_page"])
+        self.assertNotContains(res, "vega-keyset-pager")
+
+
+class TestCountPaginators(TestCase):
+    """Test class for the count strategy paginators."""
+
+    def test_exact_count(self):
+        """Test ExactCountPaginator."""
+        mommy.make("artist_app.Artist", _quantity=5)
+        paginator = ExactCountPaginator(Artist.objects.all(), 2)
+        self.assertEqual(5, paginator.count)
+        self.assertTrue(paginator.count_is_exact)
+        self.assertEqual(3, paginator.num_pages)
+        self.assertEqual("5", paginator.count_display)
+
+        # a count computed elsewhere is reused as is
+        with self.assertNumQueries(0):
+            paginator = ExactCountPaginator(Artist.objects.all(), 2, count=5)
+            self.assertEqual(5, paginator.count)
+
+    @override_settings(VEGA_COUNT_CAP=3)
+    def test_capped_count(self):
+        """Test CappedCountPaginator."""
+        mommy.make("artist_app.Artist", _quantity=5)
+        paginator = CappedCountPaginator(Artist.objects.all(), 2)
+        self.assertEqual(4, paginator.count)
+        self.assertFalse(paginator.count_is_exact)
+        self.assertEqual("3+", paginator.count_display)
+        self.assertEqual(2, len(paginator.page(2).object_list))
+
+        paginator = CappedCountPaginator(Artist.objects.all()[:3], 2)
+        self.assertEqual(3, paginator.count)
+        self.assertTrue(paginator.count_is_exact)
+        self.assertEqual("3", paginator.count_display)
+
+    @override_settings(VEGA_COUNT_CAP=10000)
+    def test_capped_count_display(self):
+        """Test that capped counts are displayed with grouping."""
+        paginator = CappedCountPaginator(
+            Artist.objects.all(), 2, count=10001, count_is_exact=False
+        )
+        self.assertEqual("10,000+", paginator.count_display)
+
+    def test_estimated_count(self):
+        """Test EstimatedCountPaginator."""
+        mommy.make("artist_app.Artist", _quantity=3)
+        if connection.vendor != "postgresql":
+            # other databases have no estimates, so we count
+            self.assertIsNone(get_estimated_count(Artist.objects.all()))
+        paginator = EstimatedCountPaginator(Artist.objects.all(), 2)
+        # the estimate is below VEGA_COUNT_ESTIMATE_THRESHOLD so we count
+        self.assertEqual(3, paginator.count)
+        self.assertTrue(paginator.count_is_exact)
+
+        mommy.make("artist_app.Artist")
+        paginator = EstimatedCountPaginator(
+            Artist.objects.all(), 2, count=3, count_is_exact=False
+        )
+        self.assertEqual("about 3", paginator.count_display)
+        # the estimate does not cut short the last page
+        self.assertEqual(2, len(paginator.page(2).object_list))
+
+    @skipUnless(connection.vendor == "postgresql", "estimates need PostgreSQL")
+    def test_estimated_count_postgresql(self):
+        """Test that filtered querysets get an estimate without counting."""
+        mommy.make("artist_app.Artist", name="Mosh", _quantity=3)
+        with CaptureQueriesContext(connection) as context:
+            estimate = get_estimated_count(Artist.objects.filter(name="Mosh"))
+        self.assertIsInstance(estimate, int)
+        self.assertGreater(estimate, 0)
+        self.assertEqual(1, len(context.captured_queries))
+        self.assertTrue(context.captured_queries[0]["sql"].startswith("EXPLAIN"))
+        self.assertNotIn("COUNT(", context.captured_queries[0]["sql"])
+
+
+@override_settings(ROOT_URLCONF="tests.artist_app.urls", VEGA_TEMPLATE="basic")
+class TestPaginationCountView(TestCase):
+    """Test class for list views and their count strategies."""
+
+    def test_single_count_query(self):
+        """Test that the list view and its table share one COUNT query."""
+        mommy.make("artist_app.Artist", _quantity=30)
+        with CaptureQueriesContext(connection) as context:
+            res = self.client.get(reverse("artist_app.artist-list"))
+        counts = [_ for _ in context.captured_queries if "COUNT(" in _["sql"]]
+        self.assertEqual(1, len(counts))
+        self.assertEqual(30, res.context["table"].paginator.count)
+        self.assertContains(res, "30 professional artists")
+
+    @override_settings(VEGA_COUNT_CAP=3)
+    def test_capped_list(self):
+        """Test a list view that uses the capped count strategy."""
+        mommy.make("artist_app.Artist", _quantity=6)
+        res = self.client.get(reverse("capped-artists-list"))
+        self.assertIsInstance(res.context["table"].paginator, CappedCountPaginator)
+        self.assertEqual(2, res.context["table"].paginator.num_pages)
+        self.assertContains(res, "3+ professional artists")
@@ -0,0 +1,153 @@
+"""Test module for permission snapshots."""
+from django.contrib.auth.models import Group, Permission, User
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import caches
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from model_mommy import mommy
+
+from vega_admin.permissions import CACHE_VERSION_KEY, get_permission_snapshot
+
+from .artist_app.models import Song
+
+CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "permissions": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "vega-permissions",
+    },
+}
+
+
+@override_settings(
+    ROOT_URLCONF="tests.artist_app.urls",
+    VEGA_TEMPLATE="basic",
+    CACHES=CACHES,
+    VEGA_PERMISSION_CACHE="permissions",
+)
+class TestPermissions(TestCase):
+    """Test class for permission snapshots."""
+
+    def setUp(self):
+        """Set up."""
+        content_type = ContentType.objects.get_for_model(Song)
+        self.create_permission, _ = Permission.objects.get_or_create(
+            codename="create_song",
+            content_type=content_type,
+            defaults=dict(name="Can Create Songs"),
+        )
+        self.update_permission, _ = Permission.objects.get_or_create(
+            codename="update_song",
+            content_type=content_type,
+            defaults=dict(name="Can Update Songs"),
+        )
+        self.user = User.objects.create_user(
+            username="mosh", email="mosh@example.com", password="hunter2"
+        )
+
+    def _get_snapshot(self):
+        """Get the permission snapshot of a new request."""
+        request = RequestFactory().get("/")
+        request.user = User.objects.get(pk=self.user.pk)
+        return get_permission_snapshot(request)
+
+    def test_snapshot(self):
+        """Test that the permissions are loaded in one query and cached."""
+        group = Group.objects.create(name="editors")
+        group.permissions.add(self.update_permission)
+        self.user.groups.add(group)
+        self.user.user_permissions.add(self.create_permission)
+
+        request = RequestFactory().get("/")
+        request.user = User.objects.get(pk=self.user.pk)
+        with self.assertNumQueries(1):
+            snapshot = get_permission_snapshot(request)
+            self.assertTrue(snapshot.has_perm("artist_app.create_song"))
+            self.assertTrue(snapshot.has_perm("artist_app.update_song"))
+            self.assertFalse(snapshot.has_perm("artist_app.delete_song"))
+            self.assertTrue(
+                snapshot.has_perms(["artist_app.create_song", "artist_app.update_song"])
+            )
+        # the snapshot is kept on the request
+        self.assertIs(snapshot, get_permission_snapshot(request))
+
+        # other requests use the cache
+        request = RequestFactory().get("/")
+        request.user = self.user
+        with self.assertNumQueries(0):
+            snapshot = get_permission_snapshot(request)
+            self.assertTrue(snapshot.has_perm("artist_app.update_song"))
+
+    def test_snapshot_invalidation(self):
+        """Test that changing permissions or groups clears the cache."""
+        self.assertFalse(self._get_snapshot().has_perm("artist_app.create_song"))
+        self.user.user_permissions.add(self.create_permission)
+        self.assertTrue(self._get_snapshot().has_perm("artist_app.create_song"))
+
+        group = Group.objects.create(name="editors")
+        self.user.groups.add(group)
+        self.assertFalse(self._get_snapshot().has_perm("artist_app.update_song"))
+        group.permissions.add(self.update_permission)
+        self.assertTrue(self._get_snapshot().has_perm("artist_app.update_song"))
+        self.user.groups.remove(group)
+        self.assertFalse(self._get_snapshot().has_perm("artist_app.update_song"))
+
+        self.user.is_superuser = True
+        self.user.save()
+        self.assertTrue(self._get_snapshot().has_perm("artist_app.delete_song"))
+
+    def test_snapshot_cache_version(self):
+        """Test that cached permissions are not trusted once the version is lost."""
+        self.assertFalse(self._get_snapshot().has_perm("artist_app.create_song"))
+        # bypass the signals, and lose the version like an evicting cache would
+        User.user_permissions.through.objects.create(
+            user=self.user, permission=self.create_permission
+        )
+        self.assertFalse(self._get_snapshot().has_perm("artist_app.create_song"))
+        caches["permissions"].delete(CACHE_VERSION_KEY)
+        self.assertTrue(self._get_snapshot().has_perm("artist_app.create_song"))
+
+        # without a cache the permissions are loaded for every request
+        with override_settings(VEGA_PERMISSION_CACHE=None):
+            self._get_snapshot()
+            # user and permissions
+            with self.assertNumQueries(2):
+                self._get_snapshot()
+
+    def test_action_permissions(self):
+        """Test the permission checks and flags of the CRUD views."""
+        url = reverse("hidden-songs-create")
+        self.client.login(username="mosh", password="hunter2")
+        res = self.client.get(url)
+        self.assertEqual(302, res.status_code)
+
+        self.user.user_permissions.add(self.create_permission)
+        res = self.client.get(url)
+        self.assertEqual(200, res.status_code)
+        self.assertTrue(res.context["vega_can_create"])
+        self.assertTrue(res.context["vega_can_list"])
+        self.assertFalse(res.context["vega_can_update"])
+        self.assertFalse(res.context["vega_can_delete"])
+        self.assertIn("create", res.context["vega_allowed_actions"])
+        self.assertNotIn("update", res.context["vega_allowed_actions"])
+
+    def test_action_column(self):
+        """Test that the action column only has the actions the user can perform."""
+        url = reverse("hidden-songs-list")
+        self.user.user_permissions.add(self.update_permission)
+        self.client.login(username="mosh", password="hunter2")
+        song = mommy.make("artist_app.Song", name="Song 1")
+        # session, user, count, permissions and songs
+        with self.assertNumQueries(5):
+            res = self.client.get(url)
+        self.assertEqual(200, res.status_code)
+        self.assertContains(res, f"/hidden-songs/update/{song.pk}/")
+        self.assertNotContains(res, "/hidden-songs/create/")
+        self.assertNotContains(res, f"/hidden-songs/delete/{song.pk}/")
+
+        # more rows do not check permissions again, and they are now cached
+        mommy.make("artist_app.Song", _quantity=3)
+        with self.assertNumQueries(4):
+            res = self.client.get(url)
+        self.assertContains(res, "/hidden-songs/update/", count=4)
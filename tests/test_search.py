@@ -0,0 +1,383 @@
+"""vega-admin module to test search backends."""
+import datetime
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Exists, OuterRef, Q
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+
+from model_mommy import mommy
+
+from vega_admin.registry import get_crud_views
+from vega_admin.search import (
+    ContainsSearchBackend,
+    PostgresSearchBackend,
+    TrigramSearchBackend,
+    filter_on_condition,
+    get_search_backend,
+    get_search_condition,
+    get_search_lookups,
+    get_search_terms,
+)
+
+from tests.artist_app.models import Artist, Song
+
+
+class TestSearchBackends(TestCase):
+    """Test class for search backends."""
+
+    def test_get_search_backend(self):
+        """Test get_search_backend."""
+        self.assertIsInstance(get_search_backend(), ContainsSearchBackend)
+        backend = get_search_backend("vega_admin.search.PostgresSearchBackend")
+        self.assertIsInstance(backend, PostgresSearchBackend)
+        self.assertIs(
+            backend, get_search_backend("vega_admin.search.PostgresSearchBackend")
+        )
+
+    def test_get_search_terms(self):
+        """Test get_search_terms."""
+        self.assertEqual(["bob", "marley"], get_search_terms(" bob  marley "))
+        self.assertEqual(
+            ["bob", "the builder", "it's"],
+            get_search_terms("bob \"the builder\" 'it\\'s'"),
+        )
+        self.assertEqual([], get_search_terms("  "))
+
+    def test_get_search_lookups(self):
+        """Test that lookups are picked using the field type."""
+        self.assertEqual(
+            {"name__icontains": "mosh"}, get_search_lookups(Song, "name", "mosh")
+        )
+        self.assertEqual(
+            {"name__istartswith": "mo"}, get_search_lookups(Song, "^name", "mo")
+        )
+        self.assertEqual(
+            {"name__iexact": "Abc"}, get_search_lookups(Song, "=name", "Abc")
+        )
+        self.assertEqual(
+            {"artist__name__icontains": "m"},
+            get_search_lookups(Song, "artist__name", "m"),
+        )
+        # numbers
+        self.assertEqual({"pk__exact": 12}, get_search_lookups(Song, "pk", "12"))
+        self.assertEqual({"artist__exact": 7}, get_search_lookups(Song, "artist", "7"))
+        self.assertIsNone(get_search_lookups(Song, "id", "mosh"))
+        self.assertIsNone(get_search_lookups(Song, "id", str(2**64)))
+        # dates and times
+        self.assertEqual(
+            {"release_date__exact": datetime.date(2020, 1, 31)},
+            get_search_lookups(Song, "release_date", "2020-01-31"),
+        )
+        # a range of the day in the current time zone, which can use an index
+        nairobi = datetime.timezone(datetime.timedelta(hours=3))
+        self.assertEqual(
+            {
+                "recording_time__gte": datetime.datetime(2020, 1, 31, tzinfo=nairobi),
+                "recording_time__lt": datetime.datetime(2020, 2, 1, tzinfo=nairobi),
+            },
+            get_search_lookups(Song, "recording_time", "2020-01-31"),
+        )
+        self.assertIsNone(get_search_lookups(Song, "recording_time", "9999-12-31"))
+        self.assertEqual(
+            {"release_time__exact": datetime.time(10, 30)},
+            get_search_lookups(Song, "release_time", "10:30"),
+        )
+        self.assertIsNone(get_search_lookups(Song, "release_date", "2020-02-31"))
+        self.assertIsNone(get_search_lookups(Song, "release_date", "mosh"))
+
+    def test_get_search_condition(self):
+        """Test that queries become an AND of ORs."""
+        condition = get_search_condition(Song, ["name", "id"], "abc 12")
+        self.assertEqual(
+            Q(name__icontains="abc") & (Q(name__icontains="12") | Q(id__exact=12)),
+            condition,
+        )
+        self.assertIsNone(get_search_condition(Song, ["id"], "abc"))
+
+    def test_filter_on_condition(self):
+        """Test that conditions with expressions filter on annotations."""
+        mosh = mommy.make("artist_app.Artist", name="Mosh")
+        mommy.make("artist_app.Song", artist=mosh, name="Abc")
+        mommy.make("artist_app.Artist", name="Eddie")
+        mommy.make("artist_app.Artist", name="Bob")
+        songs = Song.objects.filter(artist=OuterRef("pk"))
+        condition = Q(Exists(songs)) | Q(name="Eddie") | Q(Exists(songs), name="Bob")
+        queryset = filter_on_condition(Artist.objects.all(), condition)
+        self.assertEqual(["Eddie", "Mosh"], [_.name for _ in queryset])
+        self.assertEqual(
+            ["vega_search_condition_0_0", "vega_search_condition_0_1"],
+            list(queryset.query.annotations),
+        )
+        # the annotations of later filters do not clash
+        queryset = filter_on_condition(queryset, ~Q(Exists(songs)))
+        self.assertEqual(["Eddie"], [_.name for _ in queryset])
+        self.assertIn("vega_search_condition_2_0", queryset.query.annotations)
+
+    def test_contains_search(self):
+        """Test ContainsSearchBackend."""
+        mosh = mommy.make("artist_app.Artist", name="Mosh")
+        mommy.make("artist_app.Song", artist=mosh, name="Abc", _quantity=2)
+        mommy.make("artist_app.Artist", name="Eddie")
+        backend = ContainsSearchBackend()
+        self.assertEqual(
+            ["Mosh"],
+            [
+                _.name
+                for _ in backend.search(Artist.objects.all(), ["name", "pk"], "mo s")
+            ],
+        )
+        self.assertEqual(
+            ["Mosh"],
+            [
+                _.name
+                for _ in backend.search(
+                    Artist.objects.all(), ["name", "pk"], str(mosh.pk)
+                )
+            ],
+        )
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                [], list(backend.search(Artist.objects.all(), ["pk"], "mosh"))
+            )
+        self.assertEqual(
+            ["Mosh"],
+            [_.name for _ in backend.search(Artist.objects.all(), ["name"], "mos")],
+        )
+        # no duplicates from searching across a reverse relation
+        self.assertEqual(
+            ["Mosh"],
+            [
+                _.name
+                for _ in backend.search(Artist.objects.all(), ["song__name"], "abc")
+            ],
+        )
+
+    def test_datetime_search(self):
+        """Test that datetimes are found by the day in the current time zone."""
+        nairobi = datetime.timezone(datetime.timedelta(hours=3))
+        for hour, name in [(0, "Early"), (23, "Late")]:
+            mommy.make(
+                "artist_app.Song",
+                name=name,
+                recording_time=datetime.datetime(2020, 1, 31, hour, 30, tzinfo=nairobi),
+            )
+        mommy.make(
+            "artist_app.Song",
+            name="Next",
+            recording_time=datetime.datetime(2020, 2, 1, 0, 30, tzinfo=nairobi),
+        )
+        songs = ContainsSearchBackend().search(
+            Song.objects.all(), ["recording_time"], "2020-01-31"
+        )
+        self.assertEqual(["Early", "Late"], sorted(_.name for _ in songs))
+
+    def test_postgres_search(self):
+        """Test PostgresSearchBackend."""
+        artist = mommy.make("artist_app.Artist", name="Mosh")
+        mommy.make("artist_app.Song", artist=artist, name="Running songs")
+        mommy.make("artist_app.Song", artist=artist, name="Songs about runs")
+        mommy.make("artist_app.Song", artist=artist, name="Walk")
+        backend = PostgresSearchBackend()
+        results = backend.search(Song.objects.order_by("name"), ["name"], "running")
+        if connection.vendor == "postgresql":
+            # stemming matches both and ranks the first match first
+            self.assertEqual(
+                ["Running songs", "Songs about runs"], [_.name for _ in results]
+            )
+            self.assertIn("vega_search_rank", results.query.annotations)
+        else:
+            # other databases fall back to icontains
+            self.assertEqual(["Running songs"], [_.name for _ in results])
+
+    def test_trigram_search(self):
+        """Test TrigramSearchBackend."""
+        artist = mommy.make("artist_app.Artist", name="Mosh")
+        mommy.make("artist_app.Song", artist=artist, name="Running")
+        mommy.make("artist_app.Song", artist=artist, name="Runner")
+        mommy.make("artist_app.Song", artist=artist, name="Walk")
+        backend = TrigramSearchBackend()
+        results = backend.search(Song.objects.all(), ["name"], "Runing")
+        if connection.vendor == "postgresql":
+            self.assertEqual("Running", results[0].name)
+            self.assertNotIn("Walk", [_.name for _ in results])
+        else:
+            # other databases fall back to icontains
+            self.assertEqual([], list(results))
+        self.assertEqual(
+            ["Runner"],
+            [_.name for _ in backend.search(Song.objects.all(), ["name"], "unne")],
+        )
+        self.assertEqual([], backend.get_index_statements(Song, ["pk"]))
+
+    def test_trigram_threshold(self):
+        """Test that the trigram threshold is capped by the database setting."""
+        mommy.make("artist_app.Song", name="Running")
+        backend = TrigramSearchBackend()
+        backend.threshold = 0.1
+        # "Rux" is about 0.2 similar to "Running" and is not contained in it
+        results = backend.search(Song.objects.all(), ["name"], "Rux")
+        self.assertEqual([], list(results))
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("SET pg_trgm.similarity_threshold = 0.1")
+            try:
+                results = backend.search(Song.objects.all(), ["name"], "Rux")
+                self.assertEqual(["Running"], [_.name for _ in results])
+            finally:
+                with connection.cursor() as cursor:
+                    cursor.execute("RESET pg_trgm.similarity_threshold")
+
+    def test_index_sql(self):
+        """Test the SQL of the full text search index."""
+        backend = PostgresSearchBackend()
+        sql = backend.get_index_sql(Song, ["name", "song_type"])
+        self.assertTrue(sql.startswith("CREATE INDEX CONCURRENTLY IF NOT EXISTS"))
+        self.assertIn('ON "artist_app_song" USING gin ((to_tsvector(', sql)
+        self.assertIn("'english'::regconfig", sql)
+        self.assertIn('"artist_app_song"."song_type"', sql)
+        # the index name is stable
+        self.assertEqual(sql, backend.get_index_sql(Song, ["name", "song_type"]))
+        self.assertNotEqual(sql, backend.get_index_sql(Song, ["name"]))
+        # relations cannot be part of the index
+        self.assertIsNone(backend.get_index_sql(Song, ["artist__name"]))
+        self.assertIsNone(backend.get_index_sql(Song, ["nope"]))
+
+
+@override_settings(ROOT_URLCONF="tests.artist_app.urls", VEGA_TEMPLATE="basic")
+class TestSearchViews(TestCase):
+    """Test class for list views that use search backends."""
+
+    def test_search_list(self):
+        """Test a list view that uses full text search."""
+        artist = mommy.make("artist_app.Artist", name="Mosh")
+        mommy.make("artist_app.Song", artist=artist, name="Running songs")
+        mommy.make("artist_app.Song", artist=artist, name="Walk")
+        res = self.client.get(reverse("search-songs-list"), {"q": "running"})
+        self.assertEqual(200, res.status_code)
+        self.assertEqual(
+            ["Running songs"], [_.name for _ in res.context["object_list"]]
+        )
+
+    def test_registry(self):
+        """Test that CRUD views register themselves."""
+        crud_paths = [_.crud_path for _ in get_crud_views()]
+        self.assertIn("search-songs", crud_paths)
+        self.assertIn("artist_app.artist", crud_paths)
+
+    def test_trigram_search_list(self):
+        """Test a list view that uses trigram search."""
+        artist = mommy.make("artist_app.Artist", name="Mosh")
+        mommy.make("artist_app.Song", artist=artist, name="Running")
+        mommy.make("artist_app.Song", artist=artist, name="Walk")
+        res = self.client.get(reverse("trigram-songs-list"), {"q": "Runing"})
+        self.assertEqual(200, res.status_code)
+        names = [_.name for _ in res.context["object_list"]]
+        if connection.vendor == "postgresql":
+            # the typo is tolerated
+            self.assertEqual(["Running"], names)
+        else:
+            self.assertEqual([], names)
+        res = self.client.get(reverse("trigram-songs-list"), {"q": "mosh"})
+        self.assertEqual(
+            ["Running", "Walk"], sorted(_.name for _ in res.context["object_list"])
+        )
+
+    def test_autocomplete(self):
+        """Test suggesting matches without counting."""
+        artist = mommy.make("artist_app.Artist", name="Mosh")
+        songs = [
+            mommy.make("artist_app.Song", artist=artist, name=name)
+            for name in ["Abc", "Xyz", "Foo"]
+        ]
+        mommy.make("artist_app.Song", name="Other")
+        url = reverse("autocomplete-songs-autocomplete")
+        with CaptureQueriesContext(connection) as context:
+            res = self.client.get(url, {"q": "mosh"})
+        self.assertEqual(200, res.status_code)
+        # ordered by name and limited to autocomplete_limit
+        self.assertEqual(
+            {
+                "results": [
+                    {"id": songs[0].pk, "text": "Abc"},
+                    {"id": songs[2].pk, "text": "Foo"},
+                ],
+                "more": True,
+            },
+            res.json(),
+        )
+        self.assertEqual(1, len(context.captured_queries))
+        sql = context.captured_queries[0]["sql"].upper()
+        self.assertIn("LIMIT 3", sql)
+        self.assertNotIn("COUNT(", sql)
+        self.assertNotIn("DISTINCT", sql)
+        self.assertNotIn("RELEASE_DATE", sql)
+
+        res = self.client.get(url, {"q": "mosh", "page": 2})
+        self.assertEqual(
+            {"results": [{"id": songs[1].pk, "text": "Xyz"}], "more": False},
+            res.json(),
+        )
+
+        # short queries are not searched
+        with self.assertNumQueries(0):
+            res = self.client.get(url, {"q": "m"})
+        self.assertEqual({"results": [], "more": False}, res.json())
+
+        res = self.client.get(reverse("autocomplete-songs-list"))
+        self.assertEqual(url, res.context["vega_autocomplete_url"])
+        self.assertContains(res, "vega-autocomplete-list")
+        # the suggestions are for the search form that the list renders
+        self.assertContains(res, 'id="vega-search-form"')
+        self.assertContains(res, 'name="q"')
+        self.assertContains(res, "#vega\\u002Dsearch\\u002Dform input[name\\u003Dq]")
+        res = self.client.get(reverse("search-songs-list"))
+        self.assertIsNone(res.context["vega_autocomplete_url"])
+        self.assertNotContains(res, "vega-autocomplete-list")
+
+    def test_autocomplete_fields(self):
+        """Test that suggestions load every field unless told otherwise."""
+        mommy.make("artist_app.Artist", name="Mosh")
+        url = reverse("autocomplete-songs-autocomplete")
+        view_class = resolve(url).func.view_class
+        with patch.object(view_class, "autocomplete_fields", None):
+            with CaptureQueriesContext(connection) as context:
+                res = self.client.get(url, {"q": "mosh"})
+        self.assertEqual(200, res.status_code)
+        self.assertIn("RELEASE_DATE", context.captured_queries[0]["sql"].upper())
+
+    def test_create_search_indexes(self):
+        """Test the create_search_indexes command."""
+        out = StringIO()
+        err = StringIO()
+        call_command("create_search_indexes", "--dry-run", stdout=out, stderr=err)
+        statements = out.getvalue().strip().split("\n")
+        self.assertEqual(5, len(statements))
+        self.assertEqual(
+            f"{PostgresSearchBackend().get_index_sql(Song, ['name', 'song_type'])};",
+            statements[0],
+        )
+        self.assertEqual("CREATE EXTENSION IF NOT EXISTS pg_trgm;", statements[1])
+        for table, column in [
+            ("artist_app_song", "name"),
+            ("artist_app_artist", "name"),
+            ("artist_app_song", "song_type"),
+        ]:
+            self.assertTrue(
+                any(
+                    f'ON "{table}" USING gin ((UPPER("{column}"::text)) gin_trgm_ops);'
+                    in _
+                    for _ in statements
+                )
+            )
+
+        out = StringIO()
+        call_command("create_search_indexes", stdout=out, stderr=err)
+        if connection.vendor != "postgresql":
+            self.assertIn("need PostgreSQL", out.getvalue())
+        else:
+            self.assertIn("5 statements run.", out.getvalue())
@@ -5,7 +5,9 @@ from unittest.mock import patch
 
 from django.conf import settings
 from django.forms import CharField, ModelForm
-from django.test import TestCase, override_settings
+from django.contrib.auth.models import AnonymousUser
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import NoReverseMatch
 
 from crispy_forms.bootstrap import FormActions
 from django_filters import FilterSet
@@ -13,15 +15,24 @@ from django_tables2 import Table
 from model_mommy import mommy
 
 from vega_admin.utils import (
+    clear_generated_classes,
     customize_modelform,
+    form_accepts_kwarg,
+    get_action_urls,
     get_filterclass,
     get_listview_form,
     get_modelform,
     get_table,
+    get_table_allowed_actions,
 )
 from vega_admin.widgets import VegaDateTimeWidget, VegaDateWidget, VegaTimeWidget
 
-from tests.artist_app.forms import ArtistForm, PlainArtistForm, UpdateArtistForm
+from tests.artist_app.forms import (
+    ArtistForm,
+    PlainArtistForm,
+    QueryingSongForm,
+    UpdateArtistForm,
+)
 from tests.artist_app.models import Artist, Song
 
 
@@ -30,6 +41,11 @@ class TestUtils(TestCase):
     class for testing vega-admin utils
     """
 
+    def setUp(self):
+        """Set up."""
+        # some tests patch the internals of the class factories
+        clear_generated_classes()
+
     def test_customize_modelform(self):
         """Test customize_modelform."""
         self.assertEqual(ArtistForm, customize_modelform(ArtistForm))
@@ -58,6 +74,43 @@ class TestUtils(TestCase):
             self.assertEqual(form.helper.layout.fields[0], "name")
             self.assertTrue(isinstance(form.helper.layout.fields[1], FormActions))
 
+    def test_form_accepts_kwarg(self):
+        """Test form_accepts_kwarg."""
+        name = settings.VEGA_MODELFORM_KWARG
+        self.assertTrue(form_accepts_kwarg(ArtistForm, name))
+        self.assertTrue(form_accepts_kwarg(UpdateArtistForm, name))
+        self.assertTrue(form_accepts_kwarg(get_modelform(Artist), name))
+        self.assertTrue(form_accepts_kwarg(customize_modelform(PlainArtistForm), name))
+        self.assertTrue(form_accepts_kwarg(QueryingSongForm, name))
+        self.assertFalse(form_accepts_kwarg(PlainArtistForm, name))
+
+        class ExplicitForm(PlainArtistForm):
+            def __init__(self, vega_extra_kwargs=None, **kwargs):
+                super().__init__(**kwargs)
+
+        class SubclassForm(ArtistForm):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+
+        class StrictForm(ArtistForm):
+            def __init__(self, data=None):  # pylint: disable=W0231
+                pass
+
+        class InheritedForm(ExplicitForm):
+            pass
+
+        class ForwardingForm(PlainArtistForm):
+            def __init__(self, data=None, **kwargs):
+                super().__init__(data=data, **kwargs)
+
+        self.assertTrue(form_accepts_kwarg(ExplicitForm, name))
+        self.assertTrue(form_accepts_kwarg(SubclassForm, name))
+        self.assertTrue(form_accepts_kwarg(InheritedForm, name))
+        # **kwargs might handle it, so it is passed
+        self.assertTrue(form_accepts_kwarg(ForwardingForm, name))
+        self.assertFalse(form_accepts_kwarg(StrictForm, name))
+        self.assertFalse(form_accepts_kwarg(ModelForm, name))
+
     def test_get_modelform(self):
         """Test get_modelform"""
         # basic form
@@ -199,6 +252,111 @@ class TestUtils(TestCase):
         self.assertEqual({"class": "mytable"}, table2.Meta.attrs)
         self.assertEqual(("name", "..."), table2.Meta.sequence)
 
+    @override_settings(ROOT_URLCONF="tests.artist_app.urls")
+    def test_get_action_urls(self):
+        """Test get_action_urls."""
+        table = get_table(
+            model=Artist,
+            actions=[
+                ("create", "artist_app.artist-create"),
+                ("update", "artist_app.artist-update"),
+                ("delete", "artist_app.artist-delete"),
+            ],
+        )
+        expected = [
+            ("create", "/artist_app.artist/create/"),
+            ("update", "/artist_app.artist/update/7/"),
+            ("delete", "/artist_app.artist/delete/7/"),
+        ]
+        self.assertEqual(expected, get_action_urls(table, 7))
+
+        # urls are reversed once per table class, not once per row
+        with patch("vega_admin.utils.reverse") as mock:
+            self.assertEqual(expected, get_action_urls(table, 7))
+            self.assertEqual(
+                ("update", "/artist_app.artist/update/8/"),
+                get_action_urls(table, 8)[1],
+            )
+            mock.assert_not_called()
+
+        # pks that are not integers are reversed the old fashioned way
+        with self.assertRaises(NoReverseMatch):
+            get_action_urls(table, "a-slug")
+
+    @override_settings(ROOT_URLCONF="tests.artist_app.urls")
+    def test_table_allowed_actions(self):
+        """Test that table actions are filtered once per table."""
+        artists = mommy.make("artist_app.Artist", _quantity=3)
+        calls = []
+
+        def even_pks(request, records):
+            calls.append(records)
+            return [_.pk for _ in records if _.pk % 2 == 0]
+
+        table_class = get_table(
+            model=Artist,
+            fields=["name"],
+            actions=[
+                ("create", "artist_app.artist-create"),
+                ("update", "artist_app.artist-update"),
+                ("delete", "artist_app.artist-delete"),
+            ],
+            actions_access={
+                "create": (False, None),
+                "update": (True, None),
+                "delete": (False, None),
+            },
+            actions_predicates={"delete": even_pks},
+        )
+        request = RequestFactory().get("/")
+        request.user = AnonymousUser()
+        table = table_class(Artist.objects.order_by("pk"), request=request)
+        with self.assertNumQueries(1):
+            html = table.as_html(request)
+
+        # the predicate is called once with the objects of the whole table
+        self.assertEqual([artists], calls)
+        self.assertEqual(
+            {"create": None, "delete": {_.pk for _ in artists if _.pk % 2 == 0}},
+            get_table_allowed_actions(table),
+        )
+        self.assertNotIn("/update/", html)
+        self.assertEqual(3, html.count("/artist_app.artist/create/"))
+        for artist in artists:
+            self.assertEqual(
+                artist.pk % 2 == 0, f"/artist_app.artist/delete/{artist.pk}/" in html
+            )
+
+    def test_generated_classes_are_reused(self):
+        """Test that identical arguments get the same generated class."""
+        table = get_table(model=Artist, fields=["name"], attrs={"class": "t"})
+        self.assertIs(
+            table, get_table(model=Artist, fields=["name"], attrs={"class": "t"})
+        )
+        self.assertIsNot(table, get_table(model=Artist, fields=["id"]))
+        self.assertIs(
+            get_filterclass(Song, ["artist"]), get_filterclass(Song, ["artist"])
+        )
+        self.assertIs(
+            get_modelform(Song, fields=["name"]), get_modelform(Song, ["name"])
+        )
+        self.assertIs(
+            get_listview_form(Song, ["name"]), get_listview_form(Song, ["name"])
+        )
+
+        # field instances are not cached
+        extra_fields = [("q", CharField())]
+        self.assertIsNot(
+            get_modelform(Song, ["name"], extra_fields=extra_fields),
+            get_modelform(Song, ["name"], extra_fields=extra_fields),
+        )
+
+        # changing vega-admin settings clears the cache
+        with override_settings(VEGA_NOTHING_TO_SHOW="Nothing here"):
+            other_table = get_table(model=Artist, fields=["name"], attrs={"class": "t"})
+            self.assertEqual("Nothing here", other_table.Meta.empty_text)
+        self.assertIsNot(table, other_table)
+
     def test_get_filterclass(self):
         """Test get_filterclass"""
         filter_class = get_filterclass(model=Song, fields=["artist"])
@@ -0,0 +1,119 @@
+"""vega-admin module to test widgets."""
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from django.forms import Select
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from model_mommy import mommy
+
+from vega_admin.choices import (
+    get_autocomplete_url,
+    has_many_rows,
+    table_has_many_rows,
+)
+from vega_admin.registry import get_crud_views
+from vega_admin.utils import get_modelform
+from vega_admin.widgets import VegaRemoteSelect
+
+from tests.artist_app.models import Artist, Band, Song
+from tests.artist_app.views import AutocompleteArtistCRUD
+
+
+@override_settings(ROOT_URLCONF="tests.artist_app.urls", VEGA_TEMPLATE="basic")
+class TestRemoteChoices(TestCase):
+    """Test class for model choice fields that search for their choices."""
+
+    def setUp(self):
+        """Set up."""
+        get_crud_views()
+
+    def test_get_autocomplete_url(self):
+        """Test get_autocomplete_url."""
+        self.assertEqual(
+            reverse("autocomplete-artists-autocomplete"), get_autocomplete_url(Artist)
+        )
+        self.assertIsNone(get_autocomplete_url(Band))
+
+    def test_has_many_rows(self):
+        """Test has_many_rows."""
+        mommy.make("artist_app.Artist", _quantity=3)
+        self.assertTrue(has_many_rows(Artist.objects.all(), 2))
+        self.assertFalse(has_many_rows(Artist.objects.all(), 3))
+
+    @override_settings(VEGA_REMOTE_CHOICES_CACHE_TIMEOUT=300)
+    def test_table_has_many_rows(self):
+        """Test that the size of tables is only checked once in a while."""
+        self.assertFalse(table_has_many_rows(Artist, 2, "default"))
+        mommy.make("artist_app.Artist", _quantity=3)
+        with self.assertNumQueries(0):
+            self.assertFalse(table_has_many_rows(Artist, 2, "default"))
+        self.assertTrue(table_has_many_rows(Artist, 1, "default"))
+
+    @override_settings(VEGA_REMOTE_CHOICES_THRESHOLD=1)
+    def test_remote_choices(self):
+        """Test that only the selected choices are loaded."""
+        mosh = mommy.make("artist_app.Artist", name="Mosh")
+        mommy.make("artist_app.Artist", name="Tranx")
+        form_class = get_modelform(Song, fields=["name", "artist"])
+
+        form = form_class(initial={"artist": mosh.pk})
+        widget = form.fields["artist"].widget
+        self.assertIsInstance(widget, VegaRemoteSelect)
+        self.assertEqual(reverse("autocomplete-artists-autocomplete"), widget.url)
+        with self.assertNumQueries(1):
+            html = str(form["artist"])
+        self.assertIn("Mosh", html)
+        self.assertNotIn("Tranx", html)
+        self.assertIn(widget.url, html)
+
+        form = form_class()
+        with self.assertNumQueries(0):
+            html = str(form["artist"])
+        self.assertNotIn("Mosh", html)
+
+        # validation only looks up the submitted artist
+        form = form_class(data={"name": "Abc", "artist": mosh.pk})
+        with CaptureQueriesContext(connection) as context:
+            self.assertTrue(form.is_valid())
+        for query in context.captured_queries:
+            self.assertIn(f'"artist_app_artist"."id" = {mosh.pk}', query["sql"])
+        form = form_class(data={"name": "Abc", "artist": "nope"})
+        self.assertFalse(form.is_valid())
+        self.assertNotIn("Mosh", str(form["artist"]))
+
+    def test_small_tables_keep_their_choices(self):
+        """Test that related tables under the threshold render every choice."""
+        mommy.make("artist_app.Artist", name="Mosh")
+        form = get_modelform(Song, fields=["name", "artist"])()
+        self.assertIs(Select, type(form.fields["artist"].widget))
+        self.assertIn("Mosh", str(form["artist"]))
+
+    def test_autocomplete_permissions(self):
+        """Test that the autocomplete action needs the list permission."""
+        # the default protection of the list is shared with the suggestions
+        self.assertEqual(
+            (True, "artist_app.list_artist"),
+            AutocompleteArtistCRUD().get_action_access()["autocomplete"],
+        )
+        mommy.make("artist_app.Artist", name="Mosh")
+        url = reverse("autocomplete-artists-autocomplete")
+        self.assertEqual(302, self.client.get(url, {"q": "mosh"}).status_code)
+
+        user = mommy.make("auth.User")
+        self.client.force_login(user)
+        self.assertEqual(302, self.client.get(url, {"q": "mosh"}).status_code)
+
+        user.user_permissions.add(
+            mommy.make(
+                "auth.Permission",
+                codename="list_artist",
+                content_type=ContentType.objects.get_for_model(Artist),
+            )
+        )
+        self.client.force_login(User.objects.get(pk=user.pk))
+        res = self.client.get(url, {"q": "mosh"})
+        self.assertEqual(200, res.status_code)
+        self.assertEqual(["Mosh"], [_["text"] for _ in res.json()["results"]])
@@ -26,3 +26,11 @@ class VegaAdminConfig(AppConfig):
         for name in dir(defaults):
             if name.isupper() and not hasattr(settings, name):
                 setattr(settings, name, getattr(defaults, name))
+
+        # keep the cached permissions up to date
+        from django.apps import apps
+
+        if apps.is_installed("django.contrib.auth"):
+            from vega_admin.permissions import connect_permission_signals
+
+            connect_permission_signals()
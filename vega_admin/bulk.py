@@ -0,0 +1,133 @@
+"""vega-admin module for changing many objects at once."""
+from typing import Any, Dict, Iterable, Iterator, List
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Model, ProtectedError, QuerySet
+from django.db.models.signals import post_save, pre_save
+
+from vega_admin.signals import bulk_updated
+
+
+class PartialDeleteError(ProtectedError):
+    """ProtectedError raised after some of the batches were deleted."""
+
+    def __init__(self, error: ProtectedError, deleted: int):
+        super().__init__(error.args[0], error.protected_objects)
+        self.deleted = deleted
+
+
+def get_selected_pks(model: Model, values: Iterable[str]) -> List[Any]:
+    """
+    Get the primary keys of the selected objects.
+
+    :param model: the model class
+    :param values: the submitted primary keys
+    :return: the valid primary keys, invalid ones are left out
+    """
+    pks = []
+    for value in values:
+        try:
+            pk = model._meta.pk.to_python(value)
+        except ValidationError:
+            continue
+        if pk is not None and pk not in pks:
+            pks.append(pk)
+    return pks
+
+
+def iter_pk_batches(queryset: QuerySet, batch_size: int) -> Iterator[List[Any]]:
+    """
+    Get the primary keys of a queryset in batches.
+
+    The batches are fetched in primary key order, each one starting after
+    the last primary key of the previous one, so changing or deleting the
+    objects of a batch does not make the next one skip objects.
+
+    :param queryset: the queryset
+    :param batch_size: the maximum number of primary keys per batch
+    :return: iterator of lists of primary keys
+    """
+    pks = queryset.order_by("pk").values_list("pk", flat=True)
+    batch = list(pks[:batch_size])
+    while batch:
+        yield batch
+        if len(batch) < batch_size:
+            return
+        batch = list(pks.filter(pk__gt=batch[-1])[:batch_size])
+
+
+def delete_in_batches(queryset: QuerySet, batch_size: int) -> int:
+    """
+    Delete the objects of a queryset, one transaction per batch.
+
+    :param queryset: the queryset
+    :param batch_size: the number of objects deleted per transaction
+    :return: the number of objects of the queryset's model that were deleted
+    :raises PartialDeleteError: when a batch is protected, with the number of
+        objects of the earlier batches that stay deleted
+    """
+    model = queryset.model
+    manager = model._default_manager.db_manager(queryset.db)
+    deleted = 0
+    for pks in iter_pk_batches(queryset, batch_size):
+        try:
+            with transaction.atomic(using=queryset.db):
+                _, rows = manager.filter(pk__in=pks).delete()
+        except ProtectedError as error:
+            raise PartialDeleteError(error, deleted) from error
+        deleted += rows.get(model._meta.label, 0)
+    return deleted
+
+
+def update_in_batches(
+    queryset: QuerySet, values: Dict[str, Any], batch_size: int, send_signals=False
+) -> int:
+    """
+    Update the objects of a queryset, one transaction per batch.
+
+    QuerySet.update() does not send any signals.  If send_signals is True
+    the objects of each batch are loaded so that pre_save and post_save can
+    be sent for them, with update_fields set to the updated fields.
+    Otherwise vega_admin.signals.bulk_updated is sent for each batch.
+
+    :param queryset: the queryset
+    :param values: dict of field names and their new values
+    :param batch_size: the number of objects updated per transaction
+    :param send_signals: whether to send pre_save and post_save
+    :return: the number of objects that were updated
+    """
+    model = queryset.model
+    using = queryset.db
+    manager = model._default_manager.db_manager(using)
+    update_fields = frozenset(values)
+    updated = 0
+    for pks in iter_pk_batches(queryset, batch_size):
+        with transaction.atomic(using=using):
+            batch = manager.filter(pk__in=pks)
+            objects = list(batch) if send_signals else []
+            for obj in objects:
+                for name, value in values.items():
+                    setattr(obj, name, value)
+                pre_save.send(
+                    sender=model,
+                    instance=obj,
+                    raw=False,
+                    using=using,
+                    update_fields=update_fields,
+                )
+            updated += batch.update(**values)
+            if not send_signals:
+                bulk_updated.send(
+                    sender=model, pks=pks, update_fields=update_fields, using=using
+                )
+            for obj in objects:
+                post_save.send(
+                    sender=model,
+                    instance=obj,
+                    created=False,
+                    raw=False,
+                    using=using,
+                    update_fields=update_fields,
+                )
+    return updated
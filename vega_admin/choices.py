@@ -0,0 +1,131 @@
+"""vega-admin module for model choice fields that search for their choices."""
+import time
+from typing import Dict, Optional, Tuple
+
+from django import forms
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db.models import Model, QuerySet
+from django.dispatch import receiver
+from django.urls import NoReverseMatch, get_urlconf, reverse
+
+from vega_admin.pagination import get_estimated_count
+from vega_admin.registry import get_crud_views
+from vega_admin.widgets import VegaRemoteSelect, VegaRemoteSelectMultiple
+
+# the default widgets that are replaced, and what they are replaced with
+REMOTE_WIDGETS = {
+    forms.Select: VegaRemoteSelect,
+    forms.SelectMultiple: VegaRemoteSelectMultiple,
+}
+
+# the expiry time and the result of table_has_many_rows, keyed by its arguments
+_TABLE_ROW_CHECKS: Dict[Tuple, Tuple[float, bool]] = {}
+
+
+def get_autocomplete_url(model: Model) -> Optional[str]:
+    """
+    Get the url of the autocomplete action of a CRUD view of a model.
+
+    :param model: the model class
+    :return: the url or None if no CRUD view of the model can autocomplete
+    """
+    if get_urlconf() is None and not hasattr(settings, "ROOT_URLCONF"):
+        return None
+    for crud_view in get_crud_views(load_urls=False):
+        if (
+            crud_view.model is not model
+            or settings.VEGA_AUTOCOMPLETE_ACTION not in crud_view.get_actions()
+            or not crud_view.get_search_fields()
+        ):
+            continue
+        try:
+            return reverse(
+                crud_view.get_url_name_for_action(settings.VEGA_AUTOCOMPLETE_ACTION)
+            )
+        except NoReverseMatch:
+            # the CRUD view is not part of the current urlconf
+            continue
+    return None
+
+
+def has_many_rows(queryset: QuerySet, threshold: int) -> bool:
+    """
+    Check whether a queryset has more rows than a threshold.
+
+    PostgreSQL estimates are used when available, otherwise counting stops
+    after threshold + 1 rows.
+
+    :param queryset: the queryset
+    :param threshold: the number of rows
+    :return: True or False
+    """
+    estimate = get_estimated_count(queryset)
+    if estimate is not None:
+        return estimate > threshold
+    return queryset.order_by()[: threshold + 1].count() > threshold
+
+
+def table_has_many_rows(model: Model, threshold: int, using: str) -> bool:
+    """
+    Check whether a table has more rows than a threshold.
+
+    The result is remembered for VEGA_REMOTE_CHOICES_CACHE_TIMEOUT seconds so
+    that forms do not check the size of their related tables every time.
+
+    :param model: the model class
+    :param threshold: the number of rows
+    :param using: the database alias
+    :return: True or False
+    """
+    key = (using, model._meta.label_lower, threshold)
+    now = time.monotonic()
+    expires, result = _TABLE_ROW_CHECKS.get(key, (now, False))
+    if expires > now:
+        return result
+    result = has_many_rows(model._default_manager.using(using).all(), threshold)
+    _TABLE_ROW_CHECKS[key] = (now + settings.VEGA_REMOTE_CHOICES_CACHE_TIMEOUT, result)
+    return result
+
+
+@receiver(setting_changed)
+def clear_table_row_checks_handler(setting, **kwargs):  # pylint: disable=W0613
+    """Forget the table sizes when vega-admin settings change."""
+    if setting.startswith("VEGA_"):
+        _TABLE_ROW_CHECKS.clear()
+
+
+def use_remote_choices(form: forms.BaseForm):
+    """
+    Make the model choice fields of large tables search for their choices.
+
+    Fields that use the default widgets, and whose related model has a CRUD
+    view with the autocomplete action, switch to widgets that only render the
+    selected choices once the related table has more than
+    VEGA_REMOTE_CHOICES_THRESHOLD rows.  Fields that limit their choices are
+    left alone because the autocomplete action would suggest other objects.
+
+    :param form: the form instance
+    """
+    threshold = settings.VEGA_REMOTE_CHOICES_THRESHOLD
+    if threshold is None:
+        return
+    for field in form.fields.values():
+        if not isinstance(field, forms.ModelChoiceField):
+            continue
+        remote_widget_class = REMOTE_WIDGETS.get(type(field.widget))
+        queryset = field.queryset
+        if remote_widget_class is None or queryset is None or queryset.query.where:
+            continue
+        if field.to_field_name not in (None, queryset.model._meta.pk.name):
+            # the autocomplete action suggests primary keys
+            continue
+        url = get_autocomplete_url(queryset.model)
+        if url is None or not table_has_many_rows(
+            queryset.model, threshold, queryset.db
+        ):
+            continue
+        widget = remote_widget_class(url=url, attrs=field.widget.attrs)
+        widget.is_required = field.widget.is_required
+        widget.choices = field.choices
+        field.widget = widget
@@ -0,0 +1,5 @@
+"""
+init module for vega_admin.contrib.search
+"""
+# pylint: disable=invalid-name
+default_app_config = "vega_admin.contrib.search.apps.SearchConfig"  # noqa
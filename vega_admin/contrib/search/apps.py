@@ -0,0 +1,18 @@
+"""AppConfig module for Vega Admin search app"""
+from django.apps import AppConfig
+from django.utils.translation import ugettext_lazy as _
+
+
+class SearchConfig(AppConfig):
+    """App config class"""
+
+    name = "vega_admin.contrib.search"
+    label = "vega_search"
+    verbose_name = _("Vega Admin Search")
+
+    def ready(self):
+        """Keep the search index up to date."""
+        # pylint: disable=import-outside-toplevel
+        from .signals import connect_index_signals
+
+        connect_index_signals()
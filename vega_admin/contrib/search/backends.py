@@ -0,0 +1,101 @@
+"""Search backends module for vega_admin.contrib.search"""
+from typing import List, Optional
+
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Q, QuerySet
+
+from vega_admin.search import (
+    ContainsSearchBackend,
+    filter_on_condition,
+    get_search_condition,
+    get_search_terms,
+)
+
+from .index import get_indexed_fields, tokenize
+from .models import SearchToken
+
+MAX_CODE_POINT = 0x10FFFF
+SURROGATES = range(0xD800, 0xE000)
+
+
+def get_prefix_end(prefix: str) -> Optional[str]:
+    """
+    Get the first string after all the strings that start with a prefix.
+
+    This holds for code point order, which is also the order of UTF-8 bytes.
+
+    :param prefix: the prefix
+    :return: the string, or None if there is no such string
+    """
+    while prefix:
+        code = ord(prefix[-1]) + 1
+        if code in SURROGATES:
+            # surrogates cannot be encoded, so no string contains them
+            code = SURROGATES.stop
+        if code <= MAX_CODE_POINT:
+            return f"{prefix[:-1]}{chr(code)}"
+        prefix = prefix[:-1]
+    return None
+
+
+class TokenSearchBackend(ContainsSearchBackend):
+    """
+    Searches using the tokens kept in the SearchToken table.
+
+    This works on any database.  Search fields that are in VEGA_SEARCH_INDEX
+    are found through the indexed tokens, the other search fields are
+    searched like ContainsSearchBackend does.  Each search term has to match the start of
+    tokens so "mos" finds "Mosh".  Run the rebuild_search_index management
+    command to index the objects that existed before.
+    """
+
+    def search(  # pylint: disable=bad-continuation
+        self,
+        queryset: QuerySet,
+        search_fields: List[str],
+        query: str,
+        order_by_rank: bool = True,
+    ) -> QuerySet:
+        """
+        Search a queryset.
+
+        :param queryset: the queryset
+        :param search_fields: the fields to search
+        :param query: the search query
+        :param order_by_rank: not used, results are not ranked
+        :return: the filtered queryset
+        """
+        model = queryset.model
+        indexed_fields = get_indexed_fields().get(model, ())
+        token_fields = [_ for _ in search_fields if _ in indexed_fields]
+        if not token_fields:
+            return super().search(queryset, search_fields, query, order_by_rank)
+
+        tokens = SearchToken.objects.using(queryset.db).filter(
+            content_type=ContentType.objects.db_manager(queryset.db).get_for_model(
+                model, for_concrete_model=False
+            ),
+            field__in=token_fields,
+        )
+        other_fields = [_ for _ in search_fields if _ not in token_fields]
+        condition = Q()
+        for term in get_search_terms(query):
+            term_condition = Q()
+            for token in tokenize(term):
+                # a range instead of startswith so that any database can
+                # use the index
+                token_end = get_prefix_end(token)
+                if token_end is None:
+                    matches = tokens.filter(token__startswith=token)
+                else:
+                    matches = tokens.filter(token__gte=token, token__lt=token_end)
+                term_condition &= Q(pk__in=matches.values("object_id"))
+            other_condition = get_search_condition(model, other_fields, term)
+            if other_fields and other_condition is not None:
+                term_condition |= other_condition
+            if not term_condition:
+                # e.g. the term is just punctuation
+                continue
+            condition &= term_condition
+
+        return filter_on_condition(queryset, condition)
@@ -0,0 +1,295 @@
+"""Module that maintains the search index of vega_admin.contrib.search"""
+import re
+import unicodedata
+from functools import lru_cache
+from threading import local
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS, models, transaction
+from django.db.models.constants import LOOKUP_SEP
+
+from vega_admin.introspection import get_lookup_field
+from vega_admin.search import get_text_search_fields
+
+from .models import TOKEN_MAX_LENGTH, SearchToken
+
+WORD_RE = re.compile(r"\w+")
+
+# the objects to index once the transaction commits, per thread and database
+_INDEX_BATCHES = local()
+
+
+def normalize(text: str) -> str:
+    """
+    Normalize text so that tokens match regardless of case and accents.
+
+    :param text: the text
+    :return: the normalized text
+    """
+    text = unicodedata.normalize("NFKD", str(text).casefold())
+    return "".join(_ for _ in text if not unicodedata.combining(_))
+
+
+def tokenize(text) -> List[str]:
+    """
+    Split text into normalized tokens.
+
+    :param text: the text
+    :return: list of unique tokens in the order they were found
+    """
+    if text is None:
+        return []
+    tokens = []
+    for token in WORD_RE.findall(normalize(text)):
+        token = token[:TOKEN_MAX_LENGTH]
+        if token not in tokens:
+            tokens.append(token)
+    return tokens
+
+
+def is_indexable(model) -> bool:
+    """Check whether the objects of a model can be in the search index."""
+    return isinstance(
+        get_lookup_field(model, "pk"), (models.AutoField, models.IntegerField)
+    )
+
+
+def get_token_fields(model, search_fields: Iterable[str]) -> List[str]:
+    """
+    Get the search fields that are kept in the search index.
+
+    These are the text fields of the model itself without a prefix.
+
+    :param model: the model class
+    :param search_fields: the search fields
+    :return: list of field names
+    """
+    return [
+        _
+        for _ in get_text_search_fields(model, list(search_fields))
+        if LOOKUP_SEP not in _
+    ]
+
+
+@lru_cache(maxsize=None)
+def _get_indexed_fields(  # pylint: disable=bad-continuation
+    search_index: Tuple[Tuple[str, Tuple[str, ...]], ...]
+) -> Dict[type, Tuple[str, ...]]:
+    """Get the indexed fields of the items of VEGA_SEARCH_INDEX."""
+    result = {}
+    for label, fields in search_index:
+        model = apps.get_model(label)
+        if not is_indexable(model):
+            raise ImproperlyConfigured(
+                f"{label} cannot be in the search index, its primary key is "
+                "not an integer"
+            )
+        for field in fields:
+            if field not in get_token_fields(model, [field]):
+                raise ImproperlyConfigured(
+                    f"{label}.{field} cannot be in the search index, it is not "
+                    "a text field of the model"
+                )
+        result[model] = fields
+    return result
+
+
+def get_indexed_fields() -> Dict[type, Tuple[str, ...]]:
+    """
+    Get the fields that are kept in the search index for each model.
+
+    These are set in VEGA_SEARCH_INDEX, e.g. {"artist_app.Song": ["name"]}.
+
+    :return: dict of model class to field names
+    :raises ImproperlyConfigured: if a model or field cannot be indexed
+    """
+    return _get_indexed_fields(
+        tuple(
+            (label, tuple(fields))
+            for label, fields in settings.VEGA_SEARCH_INDEX.items()
+        )
+    )
+
+
+def get_tokens(obj, fields: Iterable[str]) -> Iterator[SearchToken]:
+    """
+    Get the search tokens of an object.
+
+    :param obj: the model instance
+    :param fields: the indexed fields
+    :return: iterator of unsaved SearchToken instances
+    """
+    content_type = ContentType.objects.get_for_model(obj, for_concrete_model=False)
+    for field in fields:
+        for token in tokenize(getattr(obj, field)):
+            yield SearchToken(
+                content_type=content_type, object_id=obj.pk, field=field, token=token
+            )
+
+
+def write_tokens(  # pylint: disable=bad-continuation
+    model, objects: Dict[int, Optional[models.Model]], using: str = DEFAULT_DB_ALIAS
+):
+    """
+    Replace the search tokens of some objects of a model in one batch.
+
+    :param model: the model class
+    :param objects: dict of pk to model instance, or None for deleted objects
+    :param using: the database alias
+    """
+    fields = get_indexed_fields().get(model)
+    if not fields or not objects:
+        return
+    content_type = ContentType.objects.db_manager(using).get_for_model(
+        model, for_concrete_model=False
+    )
+    with transaction.atomic(using=using):
+        SearchToken.objects.using(using).filter(
+            content_type=content_type, object_id__in=list(objects)
+        ).delete()
+        tokens = [
+            token
+            for obj in objects.values()
+            if obj is not None
+            for token in get_tokens(obj, fields)
+        ]
+        SearchToken.objects.using(using).bulk_create(
+            tokens, batch_size=settings.VEGA_SEARCH_INDEX_BATCH_SIZE
+        )
+
+
+def write_objects(model, pks: Iterable[int], using: str = DEFAULT_DB_ALIAS):
+    """
+    Replace the search tokens of some objects with those of their saved values.
+
+    Only the indexed fields are loaded.  Objects that no longer exist lose
+    their tokens.
+
+    :param model: the model class
+    :param pks: the primary keys of the objects
+    :param using: the database alias
+    """
+    fields = get_indexed_fields().get(model)
+    if not fields:
+        return
+    queryset = model._default_manager.using(using).only("pk", *fields)
+    pks = sorted(pks)
+    chunk_size = settings.VEGA_SEARCH_INDEX_CHUNK_SIZE
+    for start in range(0, len(pks), chunk_size):
+        end = start + chunk_size
+        chunk = pks[start:end]
+        objects: Dict[int, Optional[models.Model]] = {_: None for _ in chunk}
+        objects.update({_.pk: _ for _ in queryset.filter(pk__in=chunk)})
+        write_tokens(model, objects, using=using)
+
+
+class IndexBatch:
+    """The objects whose search tokens are written once a transaction commits."""
+
+    def __init__(self, using: str):
+        """Initialize!."""
+        self.using = using
+        self.pks: Dict[type, Set[int]] = {}
+
+    def add(self, model, pk: int):
+        """Add a saved or deleted object."""
+        self.pks.setdefault(model, set()).add(model._meta.pk.to_python(pk))
+
+    def flush(self):
+        """Write the search tokens of the objects as they are saved now."""
+        pks, self.pks = self.pks, {}
+        for model, model_pks in pks.items():
+            write_objects(model, model_pks, using=self.using)
+
+
+def get_index_batch(using: str) -> IndexBatch:
+    """Get the index batch of a database in the current thread."""
+    batch = getattr(_INDEX_BATCHES, using, None)
+    if batch is None:
+        batch = IndexBatch(using)
+        setattr(_INDEX_BATCHES, using, batch)
+    return batch
+
+
+def update_object(obj, using: str = DEFAULT_DB_ALIAS, deleted: bool = False):
+    """
+    Update the search tokens of an object once the transaction is committed.
+
+    All the objects changed in one transaction are written in one batch.
+
+    :param obj: the model instance
+    :param using: the database alias
+    :param deleted: whether the object was deleted
+    """
+    model = type(obj)
+    if obj.pk is None or model not in get_indexed_fields():
+        return
+    if transaction.get_autocommit(using=using):
+        # the change is committed already
+        write_tokens(model, {obj.pk: None if deleted else obj}, using=using)
+        return
+    batch = get_index_batch(using)
+    batch.add(model, obj.pk)
+    # the callbacks of rolled back transactions are dropped without notice,
+    # so every change registers one.  The first one to run writes the batch
+    # and the others find it empty.  Objects left over from rolled back
+    # transactions are written along, which is harmless because the tokens
+    # are read from the database.
+    transaction.on_commit(batch.flush, using=using)
+
+
+def update_objects(model, pks: List[int], using: str = DEFAULT_DB_ALIAS):
+    """
+    Update the search tokens of some objects once the transaction is committed.
+
+    This is for objects that were changed without sending post_save, e.g.
+    by QuerySet.update().
+
+    :param model: the model class
+    :param pks: the primary keys of the objects
+    :param using: the database alias
+    """
+    if not pks or model not in get_indexed_fields():
+        return
+    if transaction.get_autocommit(using=using):
+        write_objects(model, pks, using=using)
+        return
+    batch = get_index_batch(using)
+    for pk in pks:
+        batch.add(model, pk)
+    transaction.on_commit(batch.flush, using=using)
+
+
+def rebuild_model_index(  # pylint: disable=bad-continuation
+    model, chunk_size: int, using: str = DEFAULT_DB_ALIAS
+) -> int:
+    """
+    Rebuild the search tokens of every object of a model.
+
+    The objects are read in chunks of primary keys.
+
+    :param model: the model class
+    :param chunk_size: the number of objects per chunk
+    :param using: the database alias
+    :return: the number of objects indexed
+    """
+    fields = get_indexed_fields()[model]
+    content_type = ContentType.objects.db_manager(using).get_for_model(
+        model, for_concrete_model=False
+    )
+    SearchToken.objects.using(using).filter(content_type=content_type).delete()
+    queryset = model._default_manager.using(using).only("pk", *fields).order_by("pk")
+    count = 0
+    last_pk = None
+    while True:
+        chunk = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        objects = list(chunk[:chunk_size])
+        if not objects:
+            return count
+        write_tokens(model, {_.pk: _ for _ in objects}, using=using)
+        count += len(objects)
+        last_pk = objects[-1].pk
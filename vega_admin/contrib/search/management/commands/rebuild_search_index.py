@@ -0,0 +1,34 @@
+"""Management command that rebuilds the search index."""
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from vega_admin.contrib.search.index import get_indexed_fields, rebuild_model_index
+
+
+class Command(BaseCommand):
+    """Rebuild the search tokens of the models in VEGA_SEARCH_INDEX."""
+
+    help = "Rebuild the search index of the models in VEGA_SEARCH_INDEX."
+
+    def add_arguments(self, parser):
+        """Add arguments."""
+        parser.add_argument(
+            "--database",
+            default=DEFAULT_DB_ALIAS,
+            help="The database to rebuild the index in.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=settings.VEGA_SEARCH_INDEX_CHUNK_SIZE,
+            help="The number of objects to index at a time.",
+        )
+
+    def handle(self, *args, **options):
+        """Handle the command."""
+        for model in get_indexed_fields():
+            count = rebuild_model_index(
+                model, options["chunk_size"], using=options["database"]
+            )
+            self.stdout.write(f"Indexed {count} {model._meta.verbose_name_plural}.")
@@ -0,0 +1,59 @@
+# Generated by Django 3.0.7 on 2026-10-16 23:01
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ("contenttypes", "0002_remove_content_type_name"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SearchToken",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("object_id", models.BigIntegerField(verbose_name="Object ID")),
+                ("field", models.CharField(max_length=100, verbose_name="Field")),
+                ("token", models.CharField(max_length=100, verbose_name="Token")),
+                (
+                    "content_type",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="contenttypes.ContentType",
+                        verbose_name="Content Type",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Search Token",
+                "verbose_name_plural": "Search Tokens",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="searchtoken",
+            index=models.Index(
+                fields=["content_type", "field", "token", "object_id"],
+                name="vega_search_content_d68279_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="searchtoken",
+            index=models.Index(
+                fields=["content_type", "object_id"],
+                name="vega_search_content_0f9bcf_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,33 @@
+"""Models module for vega_admin.contrib.search"""
+from django.contrib.contenttypes.models import ContentType
+from django.db import models
+from django.utils.translation import ugettext_lazy as _
+
+TOKEN_MAX_LENGTH = 100
+
+
+class SearchToken(models.Model):
+    """A normalized token found in a search field of an object."""
+
+    content_type = models.ForeignKey(
+        ContentType, verbose_name=_("Content Type"), on_delete=models.CASCADE
+    )
+    object_id = models.BigIntegerField(_("Object ID"))
+    field = models.CharField(_("Field"), max_length=100)
+    token = models.CharField(_("Token"), max_length=TOKEN_MAX_LENGTH)
+
+    class Meta:
+        """Meta definition for SearchToken."""
+
+        verbose_name = _("Search Token")
+        verbose_name_plural = _("Search Tokens")
+        indexes = [
+            # used when searching
+            models.Index(fields=["content_type", "field", "token", "object_id"]),
+            # used when the tokens of objects are replaced
+            models.Index(fields=["content_type", "object_id"]),
+        ]
+
+    def __str__(self):
+        """Unicode representation of SearchToken."""
+        return self.token
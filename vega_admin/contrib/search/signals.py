@@ -0,0 +1,51 @@
+"""Signals module for vega_admin.contrib.search"""
+from django.db.models.signals import post_delete, post_save
+
+from vega_admin.signals import bulk_updated
+
+from .index import get_indexed_fields, update_object, update_objects
+
+
+def index_saved_object(sender, instance, raw=False, using=None, **kwargs):
+    """Update the search tokens of saved objects."""
+    # pylint: disable=unused-argument
+    if not raw:
+        update_object(instance, using=using)
+
+
+def index_deleted_object(sender, instance, using=None, **kwargs):
+    """Remove the search tokens of deleted objects."""
+    # pylint: disable=unused-argument
+    update_object(instance, using=using, deleted=True)
+
+
+def index_updated_objects(sender, pks, using=None, **kwargs):
+    """Update the search tokens of objects that were updated in bulk."""
+    # pylint: disable=unused-argument
+    update_objects(sender, pks, using=using)
+
+
+def connect_index_signals():
+    """
+    Keep the search index of the models in VEGA_SEARCH_INDEX up to date.
+
+    The receivers are only connected for these models, because post_delete
+    receivers stop Django from deleting objects without fetching them first.
+    """
+    for model in get_indexed_fields():
+        label = model._meta.label_lower
+        post_save.connect(
+            index_saved_object,
+            sender=model,
+            dispatch_uid=f"vega_search_post_save_{label}",
+        )
+        post_delete.connect(
+            index_deleted_object,
+            sender=model,
+            dispatch_uid=f"vega_search_post_delete_{label}",
+        )
+        bulk_updated.connect(
+            index_updated_objects,
+            sender=model,
+            dispatch_uid=f"vega_search_bulk_updated_{label}",
+        )
@@ -0,0 +1,204 @@
+"""vega-admin module for finding out what deleting objects affects."""
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Set, Tuple
+
+from django.db.models import CASCADE, PROTECT, Field, Model, QuerySet
+from django.db.models.deletion import get_candidate_relations_to_delete
+
+# the number of primary keys per query when objects have to be collected
+PK_BATCH_SIZE = 500
+
+
+@lru_cache(maxsize=None)
+def get_delete_relations(model: Model) -> Tuple[Tuple[Field, Model, object], ...]:
+    """
+    Get the relations that deleting objects of a model cascades to or is protected by.
+
+    :param model: the model class
+    :return: tuple of tuples of the foreign key, its model and its on_delete
+        handler (CASCADE or PROTECT)
+    """
+    relations = []
+    for relation in get_candidate_relations_to_delete(model._meta):
+        on_delete = relation.field.remote_field.on_delete
+        if on_delete in (CASCADE, PROTECT):
+            # e.g. SET_NULL and DO_NOTHING do not delete anything
+            relations.append((relation.field, relation.related_model, on_delete))
+    return tuple(relations)
+
+
+@lru_cache(maxsize=None)
+def cascades_reach_models_once(model: Model) -> bool:
+    """
+    Check whether deleting objects of a model cascades to each model only once.
+
+    This is not the case for self-referencing models, or models that are
+    reached through more than one chain of relations.
+
+    :param model: the model class
+    :return: True or False
+    """
+    reached = {model}
+    pending = [model]
+    while pending:
+        for _, related_model, on_delete in get_delete_relations(pending.pop()):
+            if on_delete is CASCADE:
+                if related_model in reached:
+                    return False
+                reached.add(related_model)
+                pending.append(related_model)
+    return True
+
+
+def get_related_queryset(
+    field: Field, related_model: Model, source: QuerySet
+) -> QuerySet:
+    """
+    Get the objects whose foreign key points to the objects of a queryset.
+
+    :param field: the foreign key
+    :param related_model: the model of the foreign key
+    :param source: the queryset of the objects that are pointed to
+    :return: a queryset that selects the objects using a subquery
+    """
+    return related_model._base_manager.using(source.db).filter(
+        **{f"{field.attname}__in": source.values(field.target_field.attname)}
+    )
+
+
+def iter_pk_chunks(pks: Iterable[Any]) -> Iterator[List[Any]]:
+    """Split primary keys into lists of at most PK_BATCH_SIZE."""
+    pks = sorted(pks)
+    for start in range(0, len(pks), PK_BATCH_SIZE):
+        end = start + PK_BATCH_SIZE
+        yield pks[start:end]
+
+
+def get_pk_querysets(
+    pks_by_model: Dict[Model, Set[Any]], using: str
+) -> Dict[Model, List[QuerySet]]:
+    """Get querysets that select the objects of collected primary keys."""
+    return {
+        model: [
+            model._base_manager.using(using).filter(pk__in=chunk)
+            for chunk in iter_pk_chunks(pks)
+        ]
+        for model, pks in pks_by_model.items()
+        if pks
+    }
+
+
+def get_delete_subqueries(
+    queryset: QuerySet,
+) -> Tuple[Dict[Model, List[QuerySet]], Dict[Model, List[QuerySet]]]:
+    """
+    Select what deleting a queryset affects using subqueries only.
+
+    Only correct when cascades_reach_models_once() is True for the model.
+    """
+    cascaded: Dict[Model, List[QuerySet]] = {}
+    protected: Dict[Model, List[QuerySet]] = {}
+    pending = [queryset]
+    while pending:
+        source = pending.pop(0)
+        for field, related_model, on_delete in get_delete_relations(source.model):
+            related = get_related_queryset(field, related_model, source)
+            if on_delete is CASCADE:
+                cascaded[related_model] = [related]
+                pending.append(related)
+            elif related_model in protected:
+                # the model protects more than one of the deleted models
+                protected[related_model] = [protected[related_model][0] | related]
+            else:
+                protected[related_model] = [related]
+    return cascaded, protected
+
+
+def collect_delete_pks(
+    queryset: QuerySet,
+) -> Tuple[Dict[Model, List[QuerySet]], Dict[Model, List[QuerySet]]]:
+    """
+    Select what deleting a queryset affects by collecting primary keys.
+
+    The objects are followed level by level until no new ones turn up, so
+    this works for any graph of relations.
+    """
+    using = queryset.db
+    origin = set(queryset.values_list("pk", flat=True))
+    cascaded: Dict[Model, Set[Any]] = {queryset.model: set(origin)}
+    protected: Dict[Model, Set[Any]] = {}
+    pending = [(queryset.model, origin)]
+    while pending:
+        source_model, source_pks = pending.pop(0)
+        for field, related_model, on_delete in get_delete_relations(source_model):
+            found = set()
+            for chunk in iter_pk_chunks(source_pks):
+                source = source_model._base_manager.using(using).filter(pk__in=chunk)
+                related = get_related_queryset(field, related_model, source)
+                found.update(related.values_list("pk", flat=True))
+            if on_delete is PROTECT:
+                protected.setdefault(related_model, set()).update(found)
+                continue
+            known = cascaded.setdefault(related_model, set())
+            new = found - known
+            if new:
+                known.update(new)
+                pending.append((related_model, new))
+    # the objects of the queryset itself are not cascaded to
+    cascaded[queryset.model] -= origin
+    return get_pk_querysets(cascaded, using), get_pk_querysets(protected, using)
+
+
+def get_delete_querysets(
+    queryset: QuerySet,
+) -> Tuple[Dict[Model, List[QuerySet]], Dict[Model, List[QuerySet]]]:
+    """
+    Select the objects that deleting a queryset would cascade to or that protect it.
+
+    Unlike django's delete collector no objects are loaded.  When each model
+    is reached only once the objects are selected using subqueries.
+    Otherwise, e.g. for trees of self-referencing objects, only their
+    primary keys are loaded.
+
+    :param queryset: the queryset of the objects to delete
+    :return: tuple of dicts of the models and lists of querysets that select
+        distinct objects, of the objects that would be deleted too and of
+        the objects that prevent the delete
+    """
+    if cascades_reach_models_once(queryset.model):
+        return get_delete_subqueries(queryset)
+    return collect_delete_pks(queryset)
+
+
+def has_protected_objects(queryset: QuerySet) -> bool:
+    """
+    Check whether deleting a queryset would raise ProtectedError.
+
+    :param queryset: the queryset of the objects to delete
+    :return: True or False
+    """
+    _, protected = get_delete_querysets(queryset)
+    return any(
+        related.exists() for querysets in protected.values() for related in querysets
+    )
+
+
+def get_delete_summary(
+    queryset: QuerySet,
+) -> Tuple[List[Tuple[Model, int]], List[Tuple[Model, int]]]:
+    """
+    Count the objects that deleting a queryset would cascade to or that protect it.
+
+    :param queryset: the queryset of the objects to delete
+    :return: tuple of the lists of models and counts of the objects that
+        would be deleted too, and of the objects that prevent the delete
+    """
+    summary = []
+    for querysets_by_model in get_delete_querysets(queryset):
+        counts = []
+        for model, querysets in querysets_by_model.items():
+            count = sum(_.count() for _ in querysets)
+            if count:
+                counts.append((model, count))
+        summary.append(counts)
+    return summary[0], summary[1]
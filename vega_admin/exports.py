@@ -0,0 +1,386 @@
+"""vega-admin module for streaming and background table exports."""
+import csv
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.db.models import QuerySet, prefetch_related_objects
+from django.utils.encoding import force_str
+from django.utils.translation import ugettext as _
+
+from django_tables2.export import TableExport
+from django_tables2.rows import BoundRow
+
+CSV_EXPORT = "csv"
+JSON_EXPORT = "json"
+
+# export job statuses
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+logger = logging.getLogger(__name__)  # pylint: disable=invalid-name
+
+_EXECUTOR = None
+_EXECUTOR_LOCK = threading.Lock()
+# the latest state of the unfinished jobs started by this process
+_JOBS: Dict[str, dict] = {}
+_JOBS_LOCK = threading.Lock()
+
+
+class Echo:  # pylint: disable=too-few-public-methods
+    """A file like object that returns what is written to it."""
+
+    def write(self, value):  # pylint: disable=no-self-use
+        """Return the value instead of storing it."""
+        return value
+
+
+def iter_records(data: Iterable, chunk_size: int) -> Iterator[Any]:
+    """
+    Iterate over table records without loading all of them at once.
+
+    Querysets are read in chunks using QuerySet.iterator() which uses server
+    side cursors on databases that support them.  Since iterator() ignores
+    prefetch_related, the prefetching is done separately for each chunk.
+
+    :param data: a queryset or any other iterable
+    :param chunk_size: the number of records to fetch at a time
+    :return: iterator of records
+    """
+    if not isinstance(data, QuerySet):
+        yield from data
+        return
+
+    # pylint: disable=protected-access
+    prefetch_lookups = data._prefetch_related_lookups
+    iterator = data.iterator(chunk_size=chunk_size)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        if prefetch_lookups:
+            prefetch_related_objects(chunk, *prefetch_lookups)
+        yield from chunk
+
+
+def iter_table_values(table, exclude_columns: Iterable[str] = ()) -> Iterator[List]:
+    """
+    Iterate over the values of a table, starting with the headers.
+
+    This works like Table.as_values() but does not hold on to the records.
+
+    :param table: the table instance
+    :param exclude_columns: names of the columns to leave out
+    :return: iterator of rows of values
+    """
+    columns = [
+        column
+        for column in table.columns.iterall()
+        if not (column.column.exclude_from_export or column.name in exclude_columns)
+    ]
+    yield [force_str(column.header, strings_only=True) for column in columns]
+
+    data = getattr(table.data, "data", table.data)
+    for record in iter_records(data, chunk_size=settings.VEGA_EXPORT_CHUNK_SIZE):
+        row = BoundRow(record, table=table)
+        yield [
+            force_str(row.get_cell_value(column.name), strings_only=True)
+            for column in columns
+        ]
+
+
+def stream_csv(values: Iterator[List]) -> Iterator[str]:
+    """
+    Stream table values as CSV.
+
+    :param values: iterator of rows of values, starting with the headers
+    :return: iterator of CSV lines
+    """
+    writer = csv.writer(Echo())
+    for row in values:
+        yield writer.writerow(row)
+
+
+def stream_json(values: Iterator[List]) -> Iterator[str]:
+    """
+    Stream table values as a JSON list of objects keyed by the headers.
+
+    :param values: iterator of rows of values, starting with the headers
+    :return: iterator of JSON fragments
+    """
+    headers = next(values)
+    yield "["
+    separator = ""
+    for row in values:
+        yield separator + json.dumps(dict(zip(headers, row)), cls=DjangoJSONEncoder)
+        separator = ", "
+    yield "]"
+
+
+STREAMS = {CSV_EXPORT: stream_csv, JSON_EXPORT: stream_json}
+
+
+def get_export_job_executor() -> ThreadPoolExecutor:
+    """Get the thread pool that runs export jobs."""
+    global _EXECUTOR  # pylint: disable=global-statement
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            _EXECUTOR = ThreadPoolExecutor(
+                max_workers=settings.VEGA_EXPORT_JOB_WORKERS,
+                thread_name_prefix="vega-export",
+            )
+            threading.Thread(
+                target=beat_export_jobs, name="vega-export-heartbeat", daemon=True
+            ).start()
+    return _EXECUTOR
+
+
+def get_export_job_path(job_id: str, name: str) -> str:
+    """
+    Get the storage path of an export job file.
+
+    :param job_id: the job id
+    :param name: the file name
+    :return: the path
+    """
+    return f"{settings.VEGA_EXPORT_JOB_DIR}/{job_id}/{name}"
+
+
+def replace_storage_file(path: str, content: bytes):
+    """
+    Write a file of the default storage, replacing the file that is there.
+
+    Local files are written to a temporary file that then replaces the old
+    one, so readers never find the file missing or half written.
+
+    :param path: the storage path
+    :param content: the content of the file
+    """
+    try:
+        local_path = default_storage.path(path)
+    except NotImplementedError:
+        # e.g. remote storages
+        if default_storage.get_available_name(path) != path:
+            # the storage does not overwrite files
+            default_storage.delete(path)
+        default_storage.save(path, ContentFile(content))
+        return
+
+    directory = os.path.dirname(local_path)
+    os.makedirs(directory, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=directory, delete=False) as temp_file:
+        temp_file.write(content)
+    if getattr(default_storage, "file_permissions_mode", None) is not None:
+        os.chmod(temp_file.name, default_storage.file_permissions_mode)
+    os.replace(temp_file.name, local_path)
+
+
+def _save_export_job(job: dict):
+    """Save the state of an export job, while holding _JOBS_LOCK."""
+    job["updated"] = time.time()
+    # readers in this process use _JOBS while the file is being replaced
+    _JOBS[job["id"]] = dict(job)
+    path = get_export_job_path(job["id"], "job.json")
+    replace_storage_file(path, json.dumps(job).encode("utf-8"))
+    if job["status"] in (JOB_DONE, JOB_FAILED):
+        _JOBS.pop(job["id"], None)
+
+
+def save_export_job(job: dict):
+    """
+    Save the state of an export job so that any process can read it.
+
+    :param job: the job
+    """
+    with _JOBS_LOCK:
+        _save_export_job(job)
+
+
+def save_unfinished_export_jobs():
+    """Save the unfinished jobs of this process, which shows that they are alive."""
+    with _JOBS_LOCK:
+        for job in list(_JOBS.values()):
+            _save_export_job(job)
+
+
+def beat_export_jobs():
+    """Save the unfinished jobs every VEGA_EXPORT_JOB_HEARTBEAT seconds."""
+    while True:
+        time.sleep(settings.VEGA_EXPORT_JOB_HEARTBEAT)
+        try:
+            save_unfinished_export_jobs()
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("Saving the export jobs failed")
+
+
+def is_stale_export_job(job: dict) -> bool:
+    """
+    Check whether an unfinished export job has stopped, e.g. with its process.
+
+    :param job: the job
+    :return: True if the job has not been saved for VEGA_EXPORT_JOB_STALE_AFTER
+    """
+    return (
+        job["status"] in (JOB_PENDING, JOB_RUNNING)
+        and time.time() - job.get("updated", 0) > settings.VEGA_EXPORT_JOB_STALE_AFTER
+    )
+
+
+def get_export_job(job_id: str) -> Optional[dict]:
+    """
+    Get the state of an export job.
+
+    :param job_id: the job id
+    :return: the job or None if it does not exist
+    """
+    try:
+        uuid.UUID(hex=job_id)
+    except (TypeError, ValueError):
+        return None
+
+    with _JOBS_LOCK:
+        if job_id in _JOBS:
+            return dict(_JOBS[job_id])
+
+    try:
+        with default_storage.open(get_export_job_path(job_id, "job.json")) as file:
+            job = json.loads(file.read().decode("utf-8"))
+    except (OSError, ValueError):
+        return None
+    if is_stale_export_job(job):
+        job["status"] = JOB_FAILED
+        job["error"] = _(settings.VEGA_EXPORT_JOB_STALE_TXT)
+    return job
+
+
+def write_export(job: dict, table, exclude_columns: Iterable[str], dataset_kwargs):
+    """
+    Write the export file of a job to the default storage.
+
+    :param job: the job
+    :param table: the table to export
+    :param exclude_columns: names of the columns to leave out
+    :param dataset_kwargs: kwargs for the tablib Dataset of non streaming formats
+    :return: the storage path of the export file
+    """
+    path = get_export_job_path(job["id"], job["filename"])
+    export_format = job["format"]
+
+    if export_format not in STREAMS:
+        exporter = TableExport(
+            export_format=export_format,
+            table=table,
+            exclude_columns=exclude_columns,
+            dataset_kwargs=dataset_kwargs,
+        )
+        content = exporter.export()
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        return default_storage.save(path, ContentFile(content))
+
+    def counted(values):
+        """Keep track of the progress while the values are consumed."""
+        yield next(values)
+        for index, row in enumerate(values, start=1):
+            yield row
+            if index % settings.VEGA_EXPORT_CHUNK_SIZE == 0:
+                job["rows"] = index
+                save_export_job(job)
+            job["rows"] = index
+
+    values = counted(iter_table_values(table, exclude_columns=exclude_columns))
+    with tempfile.TemporaryFile() as temp_file:
+        for chunk in STREAMS[export_format](values):
+            temp_file.write(chunk.encode("utf-8"))
+        temp_file.seek(0)
+        return default_storage.save(path, File(temp_file))
+
+
+def run_export_job(job: dict, table, exclude_columns: Iterable[str], dataset_kwargs):
+    """
+    Run an export job.
+
+    :param job: the job
+    :param table: the table to export
+    :param exclude_columns: names of the columns to leave out
+    :param dataset_kwargs: kwargs for the tablib Dataset of non streaming formats
+    """
+    job["status"] = JOB_RUNNING
+    data = getattr(table.data, "data", table.data)
+    if isinstance(data, QuerySet):
+        job["total"] = data.count()
+    save_export_job(job)
+    try:
+        job["path"] = write_export(job, table, exclude_columns, dataset_kwargs)
+    except Exception as exception:  # pylint: disable=broad-except
+        logger.exception("Export job %s failed", job["id"])
+        job["status"] = JOB_FAILED
+        job["error"] = str(exception)
+    else:
+        job["status"] = JOB_DONE
+    save_export_job(job)
+
+
+def _run_export_job_in_thread(*args):
+    """Run an export job and then close the database connections of the thread."""
+    try:
+        run_export_job(*args)
+    finally:
+        connections.close_all()
+
+
+def create_export_job(  # pylint: disable=bad-continuation
+    table,
+    export_format: str,
+    filename: str,
+    exclude_columns: Iterable[str] = (),
+    dataset_kwargs: Optional[dict] = None,
+    user_id: Any = None,
+) -> dict:
+    """
+    Create an export job and run it in the background.
+
+    Jobs run in a local thread pool of VEGA_EXPORT_JOB_WORKERS threads, or
+    in the current thread when VEGA_EXPORT_JOB_WORKERS is 0.
+
+    :param table: the table to export
+    :param export_format: any format supported by TableExport
+    :param filename: the name of the export file
+    :param exclude_columns: names of the columns to leave out
+    :param dataset_kwargs: kwargs for the tablib Dataset of non streaming formats
+    :param user_id: the id of the user that the job belongs to
+    :return: the job
+    """
+    job = {
+        "id": uuid.uuid4().hex,
+        "status": JOB_PENDING,
+        "format": export_format,
+        "filename": filename,
+        "user": user_id,
+        "rows": 0,
+        "total": None,
+        "path": None,
+        "error": None,
+    }
+    save_export_job(job)
+    args = (job, table, tuple(exclude_columns), dataset_kwargs)
+    if settings.VEGA_EXPORT_JOB_WORKERS:
+        get_export_job_executor().submit(_run_export_job_in_thread, *args)
+    else:
+        run_export_job(*args)
+    return get_export_job(job["id"])
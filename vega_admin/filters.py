@@ -0,0 +1,15 @@
+"""vega-admin filters module."""
+from django_filters import FilterSet
+
+from vega_admin.choices import use_remote_choices
+
+
+class VegaFilterSet(FilterSet):
+    """FilterSet whose choice filters of large tables search for their choices."""
+
+    @property
+    def form(self):
+        """Get the filter form."""
+        if not hasattr(self, "_form"):
+            use_remote_choices(super().form)
+        return self._form
@@ -0,0 +1,266 @@
+"""vega-admin module for model introspection helpers."""
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import (
+    DateField,
+    DateTimeField,
+    Field,
+    Model,
+    TimeField,
+    UniqueConstraint,
+)
+from django.db.models.constants import LOOKUP_SEP
+
+
+def get_multivalued_relation(model: Model, lookup: str) -> Optional[Tuple[str, Field]]:
+    """
+    Find the first reverse foreign key or many to many relation that a lookup crosses.
+
+    :param model: the model class
+    :param lookup: the lookup e.g. "song__name__icontains"
+    :return: tuple of the lookup up to the relation e.g. "song" and the
+        relation, or None if the lookup does not cross such a relation
+    """
+    opts = model._meta
+    path: List[str] = []
+    for part in lookup.split(LOOKUP_SEP):
+        try:
+            field = opts.pk if part == "pk" else opts.get_field(part)
+        except FieldDoesNotExist:
+            # this is a lookup or transform e.g. icontains
+            return None
+        if not field.is_relation:
+            return None
+        path.append(part)
+        if field.many_to_many or field.one_to_many:
+            return LOOKUP_SEP.join(path), field
+        if field.related_model is None:
+            # e.g. generic foreign keys
+            return None
+        opts = field.related_model._meta
+    return None
+
+
+def lookup_spans_multivalued_relation(model: Model, lookup: str) -> bool:
+    """
+    Check whether a lookup crosses a reverse foreign key or many to many relation.
+
+    Filtering across such relations joins more than one row per object, which
+    means that the results can contain duplicates.
+
+    :param model: the model class
+    :param lookup: the lookup e.g. "artist__name__icontains"
+    :return: True or False
+    """
+    return get_multivalued_relation(model, lookup) is not None
+
+
+@lru_cache(maxsize=None)
+def get_temporal_field_names(model: Model) -> Dict[str, Tuple[str, ...]]:
+    """
+    Get the names of the date, datetime and time fields of a model.
+
+    The fields are scanned once per model.
+
+    :param model: the model class
+    :return: dict with "date", "datetime" and "time" keys
+    """
+    result: Dict[str, List[str]] = {"date": [], "datetime": [], "time": []}
+    for field in model._meta.concrete_fields:
+        if isinstance(field, DateTimeField):
+            result["datetime"].append(field.name)
+        elif isinstance(field, DateField):
+            result["date"].append(field.name)
+        elif isinstance(field, TimeField):
+            result["time"].append(field.name)
+    return {key: tuple(value) for key, value in result.items()}
+
+
+@lru_cache(maxsize=None)
+def get_model_fields(model: Model, names: Tuple[str, ...]) -> Tuple[Field, ...]:
+    """
+    Get the fields of a model that have the provided names.
+
+    The result is cached so the field lookups are only done once.
+
+    :param model: the model class
+    :param names: tuple of field names, names that are not fields are skipped
+    :return: tuple of fields
+    """
+    result = []
+    for name in names:
+        try:
+            result.append(model._meta.get_field(name))
+        except FieldDoesNotExist:
+            pass
+    return tuple(result)
+
+
+@lru_cache(maxsize=None)
+def get_unique_field_names(model: Model) -> FrozenSet[str]:
+    """
+    Get the names of the fields whose values have to be unique.
+
+    This includes the fields that have to be unique together with others.
+
+    :param model: the model class
+    :return: frozenset of field names
+    """
+    opts = model._meta
+    names = {field.name for field in opts.concrete_fields if field.unique}
+    for fields in opts.unique_together:
+        names.update(fields)
+    for constraint in opts.constraints:
+        if isinstance(constraint, UniqueConstraint):
+            names.update(constraint.fields)
+    return frozenset(names)
+
+
+def _get_field(opts, name: str):
+    """Get a field by its name or, for reverse relations, accessor name."""
+    try:
+        return opts.get_field(name)
+    except FieldDoesNotExist:
+        for related_object in opts.related_objects:
+            if related_object.get_accessor_name() == name:
+                return related_object
+    return None
+
+
+def get_lookup_field(model: Model, lookup: str) -> Optional[Field]:
+    """
+    Get the field that a lookup ends at.
+
+    Lookups that end at a relation end at the primary key of the related
+    model, e.g. "artist" ends at the id of the artist.
+
+    :param model: the model class
+    :param lookup: the lookup e.g. "artist__name"
+    :return: the field or None if the lookup does not only consist of fields
+    """
+    opts = model._meta
+    field = None
+    for part in lookup.split(LOOKUP_SEP):
+        field = opts.pk if part == "pk" else _get_field(opts, part)
+        if field is None:
+            return None
+        if field.is_relation:
+            if field.related_model is None:
+                # e.g. generic foreign keys
+                return None
+            opts = field.related_model._meta
+            field = getattr(field, "target_field", opts.pk)
+    return field
+
+
+def get_relation_loading_plan(  # pylint: disable=bad-continuation
+    model: Model, accessors: Iterable[str]
+) -> Tuple[List[str], List[str]]:
+    """
+    Work out how to load the relations that are followed by some accessors.
+
+    Forward foreign keys and one to one relations are joined using
+    select_related while many to many and reverse foreign key relations
+    are loaded using prefetch_related.
+
+    :param model: the model class
+    :param accessors: the accessors e.g. ["name", "artist", "artist__name"]
+    :return: tuple of the select_related and the prefetch_related lookups
+    """
+    select_related: List[str] = []
+    prefetch_related: List[str] = []
+    for accessor in accessors:
+        opts = model._meta
+        path: List[str] = []
+        multivalued = False
+        for part in accessor.replace(".", LOOKUP_SEP).split(LOOKUP_SEP):
+            field = _get_field(opts, part)
+            if field is None or not field.is_relation or field.related_model is None:
+                break
+            if field.auto_created and not field.concrete:
+                # reverse relations are traversed using their accessor name
+                path.append(field.get_accessor_name())
+            else:
+                path.append(field.name)
+            multivalued = multivalued or field.many_to_many or field.one_to_many
+            opts = field.related_model._meta
+
+        if not path:
+            continue
+        lookup = LOOKUP_SEP.join(path)
+        lookups = prefetch_related if multivalued else select_related
+        if lookup not in lookups:
+            lookups.append(lookup)
+
+    return select_related, prefetch_related
+
+
+@lru_cache(maxsize=None)
+def get_table_relation_loading_plan(table_class) -> Tuple[Tuple[str, ...], ...]:
+    """
+    Work out how to load the relations that are displayed by a table.
+
+    :param table_class: the django_tables2 table class
+    :return: tuple of the select_related and the prefetch_related lookups
+    """
+    model = table_class._meta.model
+    if model is None:
+        return (), ()
+    accessors = [
+        column.accessor or name for name, column in table_class.base_columns.items()
+    ]
+    select_related, prefetch_related = get_relation_loading_plan(model, accessors)
+    return tuple(select_related), tuple(prefetch_related)
+
+
+def get_only_fields(  # pylint: disable=bad-continuation
+    model: Model,
+    accessors: Iterable[str],
+    select_related: Iterable[str] = (),
+    prefetch_related: Iterable[str] = (),
+) -> Optional[List[str]]:
+    """
+    Get the smallest set of fields to pass to QuerySet.only().
+
+    Related objects that are joined using select_related are loaded in full,
+    by listing all their concrete fields, so that their __str__ method keeps
+    working without extra queries.
+
+    :param model: the model class
+    :param accessors: the accessors and ordering fields in use
+    :param select_related: the select_related lookups in use
+    :param prefetch_related: the prefetch_related lookups in use
+    :return: list of field names or None if some accessor is not a field
+    """
+    opts = model._meta
+    result: List[str] = []
+
+    def add(name):
+        if name not in result:
+            result.append(name)
+
+    for accessor in list(accessors) + list(prefetch_related):
+        name = accessor.lstrip("-").replace(".", LOOKUP_SEP).split(LOOKUP_SEP)[0]
+        if name in ("pk", "?", "", "..."):
+            continue
+        field = _get_field(opts, name)
+        if field is None:
+            # a property or method, we cannot know which fields it needs
+            return None
+        if field.concrete and not field.many_to_many:
+            add(field.name)
+
+    for lookup in select_related:
+        path: List[str] = []
+        related_opts = opts
+        for part in lookup.split(LOOKUP_SEP):
+            if not path:
+                add(part)
+            path.append(part)
+            related_opts = related_opts.get_field(part).related_model._meta
+            for field in related_opts.concrete_fields:
+                add(LOOKUP_SEP.join(path + [field.name]))
+
+    return result
@@ -0,0 +1,70 @@
+"""Management command that creates the indexes used by the search backends."""
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from vega_admin.registry import get_crud_views
+from vega_admin.search import get_search_backend
+
+
+class Command(BaseCommand):
+    """Create the indexes used by the search backends of CRUD views."""
+
+    help = (
+        "Create the GIN indexes used by the full text and trigram search of "
+        "CRUD views."
+    )
+
+    def add_arguments(self, parser):
+        """Add arguments."""
+        parser.add_argument(
+            "--database",
+            default=DEFAULT_DB_ALIAS,
+            help="The database to create the indexes in.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Print the SQL instead of running it.",
+        )
+
+    def get_statements(self, using, concurrently=True):
+        """Get the SQL statements that create the indexes."""
+        statements = []
+        for crud_view in get_crud_views():
+            backend = get_search_backend(crud_view.get_search_backend())
+            search_fields = crud_view.get_search_fields() or []
+            if not backend.get_indexed_fields(crud_view.model, search_fields):
+                continue
+            crud_statements = backend.get_index_statements(
+                crud_view.model, search_fields, using=using, concurrently=concurrently
+            )
+            if not crud_statements:
+                self.stderr.write(
+                    f"Skipping {crud_view.crud_path}: its search fields cannot "
+                    "be indexed."
+                )
+            for sql in crud_statements:
+                if sql not in statements:
+                    statements.append(sql)
+        return statements
+
+    def handle(self, *args, **options):
+        """Handle the command."""
+        using = options["database"]
+        connection = connections[using]
+        if options["dry_run"]:
+            for sql in self.get_statements(using):
+                self.stdout.write(f"{sql};")
+            return
+
+        if connection.vendor != "postgresql":
+            self.stdout.write("Search indexes need PostgreSQL.")
+            return
+        statements = self.get_statements(
+            using, concurrently=not connection.in_atomic_block
+        )
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+                self.stdout.write(sql)
+        self.stdout.write(self.style.SUCCESS(f"{len(statements)} statements run."))
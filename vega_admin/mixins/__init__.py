@@ -0,0 +1,660 @@
+"""vega-admin mixins module."""
+from typing import Dict, List, Optional, Tuple, Union
+
+from django.conf import settings
+from django.contrib import messages
+from django.db import models
+from django.db.models import ProtectedError
+from django.http import JsonResponse
+from django.shortcuts import redirect
+from django.urls import reverse_lazy
+from django.utils.text import slugify
+from django.utils.translation import ugettext as _
+
+from django_filters.constants import EMPTY_VALUES
+
+from vega_admin.deletion import get_delete_summary, has_protected_objects
+from vega_admin.forms import ListViewSearchForm
+from vega_admin.introspection import (
+    get_model_fields,
+    get_table_relation_loading_plan,
+    lookup_spans_multivalued_relation,
+)
+from vega_admin.permissions import get_allowed_actions, get_permission_snapshot
+from vega_admin.search import (
+    filter_on_condition,
+    get_matches_condition,
+    get_search_backend,
+)
+
+
+class VegaFormKwargsMixin:  # pylint: disable=too-few-public-methods
+    """Adds form kwargs."""
+
+    def get_form_kwargs(self):
+        """Add kwargs to the form."""
+        kwargs = super().get_form_kwargs()
+        kwargs["request"] = self.request
+        return kwargs
+
+
+# pylint: disable=too-few-public-methods
+class VegaFormMixin(VegaFormKwargsMixin):
+    """Adds some nice stuff to formviews used in create/update/delete views."""
+
+
+class VegaOrderedQuerysetMixin:
+    """Optionally ensures querysets are ordered."""
+
+    order_by = None
+
+    def get_order_by(self):
+        """Get the field to use when ordering."""
+        return self.order_by or settings.VEGA_ORDERING_FIELD
+
+    def get_queryset(self):
+        """Get the queryset."""
+        queryset = super().get_queryset()
+        if not queryset.ordered and settings.VEGA_FORCE_ORDERING:
+            order_by = self.get_order_by()
+            queryset = queryset.order_by(*order_by)
+
+        return queryset
+
+
+class ListRelationsMixin:
+    """Loads the relations displayed by the table without N+1 queries."""
+
+    # None means work it out from the table columns
+    select_related: Union[None, List[str]] = None
+    prefetch_related: Union[None, List[str]] = None
+
+    def get_relation_loading_plan(self):
+        """Get the select_related and prefetch_related lookups."""
+        if self.select_related is not None and self.prefetch_related is not None:
+            return self.select_related, self.prefetch_related
+        select_related, prefetch_related = get_table_relation_loading_plan(
+            self.get_table_class()
+        )
+        if self.select_related is not None:
+            select_related = self.select_related
+        if self.prefetch_related is not None:
+            prefetch_related = self.prefetch_related
+        return select_related, prefetch_related
+
+    def get_queryset(self):
+        """Get the queryset."""
+        queryset = super().get_queryset()
+        select_related, prefetch_related = self.get_relation_loading_plan()
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+        return queryset
+
+
+class ListOnlyFieldsMixin:
+    """Only loads the fields that the list needs."""
+
+    # None means load every field
+    only_fields: Union[None, List[str]] = None
+
+    def get_only_fields(self):
+        """Get the fields to load."""
+        return self.only_fields
+
+    def get_queryset(self):
+        """Get the queryset."""
+        queryset = super().get_queryset()
+        only_fields = self.get_only_fields()
+        if only_fields:
+            queryset = queryset.only(*only_fields)
+        return queryset
+
+
+class AutocompleteMixin:
+    """
+    Suggests the objects that match a search query, as JSON.
+
+    Meant to be used together with ListViewSearchMixin.  The suggestions are
+    paginated without counting: one more object than fits on a page is
+    fetched to find out whether there are more.
+    """
+
+    http_method_names = ["get"]
+    autocomplete_limit: Optional[int] = None  # defaults to VEGA_AUTOCOMPLETE_LIMIT
+    # the fields that __str__ needs, None means load all of them.  Fields
+    # that are left out are loaded one object at a time.
+    autocomplete_fields: Union[None, List[str]] = None
+
+    def get_autocomplete_limit(self):
+        """Get the maximum number of suggestions per page."""
+        if self.autocomplete_limit is None:
+            return settings.VEGA_AUTOCOMPLETE_LIMIT
+        return self.autocomplete_limit
+
+    def get_autocomplete_fields(self):
+        """Get the fields to load, or None to load all of them."""
+        return self.autocomplete_fields
+
+    def get_autocomplete_page(self):
+        """Get the requested page number, starting at 1."""
+        try:
+            return max(1, int(self.request.GET.get("page", 1)))
+        except (TypeError, ValueError):
+            return 1
+
+    def get_autocomplete_queryset(self):
+        """Get the queryset of the suggestions of the requested page."""
+        queryset = self.get_queryset()
+        only_fields = self.get_autocomplete_fields()
+        if only_fields:
+            queryset = queryset.only(*only_fields)
+        limit = self.get_autocomplete_limit()
+        start = (self.get_autocomplete_page() - 1) * limit
+        # one more than fits on the page tells whether there are more pages
+        end = start + limit + 1
+        return queryset[start:end]
+
+    def get_autocomplete_result(self, obj):  # pylint: disable=no-self-use
+        """Get the suggestion for an object."""
+        return {"id": obj.pk, "text": str(obj)}
+
+    def get(self, request, *args, **kwargs):
+        """Get the suggestions for the search query."""
+        query = request.GET.get("q", "").strip()
+        objects = []
+        if self.search_fields and len(query) >= settings.VEGA_AUTOCOMPLETE_MIN_LENGTH:
+            objects = list(self.get_autocomplete_queryset())
+        limit = self.get_autocomplete_limit()
+        return JsonResponse(
+            {
+                "results": [self.get_autocomplete_result(_) for _ in objects[:limit]],
+                "more": len(objects) > limit,
+            }
+        )
+
+
+class ListViewSearchMixin:
+    """Adds search to listview."""
+
+    form_class = ListViewSearchForm
+    search_fields: List[str] = []
+    search_backend: Optional[str] = None  # defaults to VEGA_SEARCH_BACKEND
+    filter_class = None
+
+    def get_active_filter_lookups(self, the_filter):  # pylint: disable=no-self-use
+        """Get the field names of the filters that are in use."""
+        result = []
+        if not the_filter.is_valid():
+            return result
+        for name, value in the_filter.form.cleaned_data.items():
+            if value in EMPTY_VALUES or name not in the_filter.filters:
+                continue
+            result.append(the_filter.filters[name].field_name)
+        return result
+
+    def filter_spans_multivalued_relation(self, the_filter):
+        """Check whether any filter in use could produce duplicate rows."""
+        return any(
+            lookup_spans_multivalued_relation(the_filter.queryset.model, lookup)
+            for lookup in self.get_active_filter_lookups(the_filter)
+        )
+
+    def get_search_backend(self):
+        """Get the search backend."""
+        return get_search_backend(self.search_backend)
+
+    def order_search_results_by_rank(self):
+        """Whether search results are ordered by relevance, if ranked."""
+        # keyset pagination can only be based on an ordering by fields
+        is_keyset = getattr(self, "is_keyset_paginated", None)
+        return not (callable(is_keyset) and is_keyset())
+
+    def get_queryset(self):
+        """Get the queryset."""
+        queryset = super().get_queryset()
+
+        if self.filter_class:
+            # pylint: disable=not-callable
+            the_filter = self.filter_class(self.request.GET, queryset=queryset)
+            if self.filter_spans_multivalued_relation(the_filter):
+                # the joined rows would produce duplicates
+                condition = get_matches_condition(the_filter.qs)
+                queryset = filter_on_condition(queryset, condition)
+            else:
+                queryset = the_filter.qs
+
+        if self.request.GET.get("q"):
+            form = self.form_class(self.request.GET)
+            if form.is_valid() and self.search_fields:
+                queryset = self.get_search_backend().search(
+                    queryset,
+                    self.search_fields,
+                    form.cleaned_data["q"],
+                    order_by_rank=self.order_search_results_by_rank(),
+                )
+
+        return queryset
+
+    def get_search_form_values(self):
+        """Get search form values."""
+        fields = []
+        if self.filter_class:
+            for field in self.filter_class.Meta.fields:
+                fields.append(field)
+        if self.search_fields:
+            fields.append("q")
+        # build the form values dict
+        result = {}
+        for item in fields:
+            result[item] = self.request.GET.get(item)
+
+        return result
+
+    def get_context_data(self, **kwargs):
+        """Get context data."""
+        context = super().get_context_data(**kwargs)
+        if self.search_fields or self.filter_class:
+            initial_values = self.get_search_form_values()
+            form = self.form_class(initial=initial_values)
+            context["vega_listview_search_form"] = form
+
+        return context
+
+
+class VerboseNameMixin:
+    """Sets the Model verbose name in the context data."""
+
+    def get_context_data(self, **kwargs):
+        """Get context data."""
+        context = super().get_context_data(**kwargs)
+        context["vega_verbose_name"] = self.model._meta.verbose_name
+        context["vega_verbose_name_plural"] = self.model._meta.verbose_name_plural
+        return context
+
+
+class PageTitleMixin:
+    """Sets the page title in the context data."""
+
+    def get_context_data(self, **kwargs):
+        """Get context data."""
+        context = super().get_context_data(**kwargs)
+        context["vega_page_title"] = getattr(self, "page_title", None)
+        return context
+
+
+class PermissionSnapshotMixin:
+    """Checks the required permissions using the permission snapshot."""
+
+    def check_permissions(self, request):
+        """Check whether the user has the required permissions."""
+        if getattr(self, "object_level_permissions", False):
+            return super().check_permissions(request)
+        perms = self.get_permission_required(request)
+        snapshot = get_permission_snapshot(request)
+        if isinstance(perms, str):
+            return snapshot.has_perm(perms)
+        return snapshot.has_perms(perms)
+
+
+class ActionPermissionsMixin:
+    """Sets the actions that the user is allowed to perform in the context data."""
+
+    # action: (whether login is required, the permission required or None)
+    action_access: Dict[str, Tuple[bool, Optional[str]]] = {}
+
+    def get_allowed_actions(self) -> List[str]:
+        """Get the actions that the user of the request is allowed to perform."""
+        return get_allowed_actions(self.request, self.action_access)
+
+    def get_context_data(self, **kwargs):
+        """Get context data."""
+        context = super().get_context_data(**kwargs)
+        allowed = self.get_allowed_actions()
+        context["vega_allowed_actions"] = allowed
+        for action in settings.VEGA_DEFAULT_ACTIONS + settings.VEGA_OPTIONAL_ACTIONS:
+            context[f"vega_can_{action}"] = action in allowed
+        return context
+
+
+class CRUDURLsMixin:
+    """Mixin that adds some CRUD helper urls."""
+
+    cancel_url = "/"
+    cancel_url_name = None
+    delete_url = "/"
+    delete_url_name = None
+    read_url = "/"
+    read_url_name = None
+    list_url = "/"
+    list_url_name = None
+    create_url = "/"
+    create_url_name = None
+    update_url = "/"
+    update_url_name = None
+    export_url = None
+    export_url_name = None
+    autocomplete_url = None
+    autocomplete_url_name = None
+    bulk_delete_url = None
+    bulk_delete_url_name = None
+    bulk_update_url = None
+    bulk_update_url_name = None
+
+    def get_crud_url(  # pylint: disable=no-self-use,bad-continuation
+        self, url: str, url_name: str, url_kwargs: dict = None
+    ):
+        """
+        Return CRUD url.
+
+        Attempt to use reverse_lazy to get the url, otherwise return what we
+        hope are safe defaults
+
+        :param url: the url
+        :param url_name: the url name
+        :param url_kwargs: the url kwargs
+
+        :return: url
+        """
+        if url_name:
+            if url_kwargs:
+                return reverse_lazy(url_name, kwargs=url_kwargs)
+            return reverse_lazy(url_name)
+        return url
+
+    def get_create_url(self):
+        """
+        Get the create url for the object in question.
+
+        :return: url
+        """
+        return self.get_crud_url(url=self.create_url, url_name=self.create_url_name)
+
+    def get_list_url(self):
+        """
+        Get the cancel url for the object in question.
+
+        :return: url
+        """
+        return self.get_crud_url(url=self.list_url, url_name=self.list_url_name)
+
+    def get_update_url(self):
+        """
+        Get the update url for the object in question.
+
+        :return: url
+        """
+        return self.get_crud_url(
+            url=self.update_url,
+            url_name=self.update_url_name,
+            url_kwargs={"pk": self.object.pk},
+        )
+
+    def get_read_url(self):
+        """
+        Get the read url for the object in question.
+
+        :return: url
+        """
+        return self.get_crud_url(
+            url=self.read_url,
+            url_name=self.read_url_name,
+            url_kwargs={"pk": self.object.pk},
+        )
+
+    def get_delete_url(self):
+        """
+        Get the delete url for the object in question.
+
+        :return: url
+        """
+        return self.get_crud_url(
+            url=self.delete_url,
+            url_name=self.delete_url_name,
+            url_kwargs={"pk": self.object.pk},
+        )
+
+    def get_export_url(self):
+        """
+        Get the export url for the list in question.
+
+        :return: url
+        """
+        return self.get_crud_url(url=self.export_url, url_name=self.export_url_name)
+
+    def get_autocomplete_url(self):
+        """
+        Get the autocomplete url for the list in question.
+
+        :return: url
+        """
+        return self.get_crud_url(
+            url=self.autocomplete_url, url_name=self.autocomplete_url_name
+        )
+
+    def get_bulk_delete_url(self):
+        """
+        Get the bulk delete url for the list in question.
+
+        :return: url
+        """
+        return self.get_crud_url(
+            url=self.bulk_delete_url, url_name=self.bulk_delete_url_name
+        )
+
+    def get_bulk_update_url(self):
+        """
+        Get the bulk update url for the list in question.
+
+        :return: url
+        """
+        return self.get_crud_url(
+            url=self.bulk_update_url, url_name=self.bulk_update_url_name
+        )
+
+    def get_cancel_url(self):
+        """
+        Get the cancel url for the object in question.
+
+        :return: url
+        """
+        return self.get_crud_url(url=self.cancel_url, url_name=self.cancel_url_name)
+
+    def get_context_data(self, **kwargs):
+        """Get context data."""
+        context = super().get_context_data(**kwargs)
+        context["vega_create_url"] = self.get_create_url()
+        context["vega_list_url"] = self.get_list_url()
+        context["vega_cancel_url"] = self.get_cancel_url()
+        context["vega_export_url"] = self.get_export_url()
+        context["vega_autocomplete_url"] = self.get_autocomplete_url()
+        context["vega_bulk_delete_url"] = self.get_bulk_delete_url()
+        context["vega_bulk_update_url"] = self.get_bulk_update_url()
+        context["vega_bulk_selection_param"] = settings.VEGA_BULK_SELECTION_PARAM
+        context["vega_bulk_all_param"] = settings.VEGA_BULK_ALL_PARAM
+        context["vega_bulk_confirm_param"] = settings.VEGA_BULK_CONFIRM_PARAM
+        if hasattr(self, "object") and self.object is not None:
+            context["vega_read_url"] = self.get_read_url()
+            context["vega_delete_url"] = self.get_delete_url()
+            context["vega_update_url"] = self.get_update_url()
+        return context
+
+    def get_form_kwargs(self):
+        """Add kwargs to the form."""
+        kwargs = super().get_form_kwargs()
+        url_kwargs = {"cancel_url": self.get_list_url()}
+        kwargs[settings.VEGA_MODELFORM_KWARG] = url_kwargs
+        return kwargs
+
+
+class ObjectTitleMixin:
+    """Mixin for getting object title."""
+
+    def get_title(self):
+        """By default we just return the string representation of our object."""
+        return str(self.object)
+
+    def get_context_data(self, **kwargs):
+        """Get context data."""
+        context = super().get_context_data(**kwargs)
+        context["vega_object_title"] = self.get_title()
+        return context
+
+
+class DetailViewMixin:
+    """Mixin for detail views."""
+
+    fields = None
+
+    def get_fields(self):
+        """
+        Get fields.
+
+        We first default to using our 'fields' variable if available,
+        otherwise we figure it out from our object.
+        """
+        if self.fields and isinstance(self.fields, list):
+            return self.fields
+        return [_.name for _ in self.object._meta.fields]
+
+    def get_model_fields(self, model):
+        """Get the model fields to display."""
+        if self.fields and isinstance(self.fields, list):
+            names = self.fields
+        else:
+            names = [_.name for _ in model._meta.fields]
+        return get_model_fields(model, tuple(names))
+
+    def get_queryset(self):
+        """Get the queryset, joining the related objects that are displayed."""
+        queryset = super().get_queryset()
+        related_fields = [
+            _.name
+            for _ in self.get_model_fields(queryset.model)
+            if _.concrete and (_.many_to_one or _.one_to_one)
+        ]
+        if related_fields:
+            queryset = queryset.select_related(*related_fields)
+        return queryset
+
+    def get_field_value(self, field):
+        """Get the value of a field."""
+        if field.is_relation:
+            try:
+                return str(getattr(self.object, field.name))
+            except AttributeError:
+                return None
+        # pylint: disable=protected-access
+        return self.object._get_FIELD_display(field)
+
+    def get_object_data(self):
+        """Return a dict of the data in the object."""
+        result = {}
+        for field in self.get_model_fields(type(self.object)):
+            result[field.verbose_name] = self.get_field_value(field)
+
+        return result
+
+    def get_context_data(self, **kwargs):
+        """Get context data."""
+        context = super().get_context_data(**kwargs)
+        context["vega_read_fields"] = self.get_fields()
+        context["vega_object_data"] = self.get_object_data()
+        return context
+
+
+class DeleteViewMixin:
+    """Mixin for delete views that adds in missing elements."""
+
+    def get_delete_queryset(self):
+        """Get a queryset of the object that is to be deleted."""
+        return type(self.object)._base_manager.filter(pk=self.object.pk)
+
+    def get_delete_summary(self):
+        """
+        Get what deleting the object would also delete, and what prevents it.
+
+        The related objects are counted, not loaded, so this stays fast for
+        objects with many related objects.
+
+        :return: tuple of lists of verbose names and counts
+        """
+        summary = []
+        for counts in get_delete_summary(self.get_delete_queryset()):
+            summary.append(
+                [
+                    (
+                        model._meta.verbose_name
+                        if count == 1
+                        else model._meta.verbose_name_plural,
+                        count,
+                    )
+                    for model, count in counts
+                ]
+            )
+        return summary[0], summary[1]
+
+    def get_context_data(self, **kwargs):
+        """Get context data."""
+        context = super().get_context_data(**kwargs)
+        cascades, protected = self.get_delete_summary()
+        context["vega_delete_cascades"] = cascades
+        context["vega_delete_protected"] = protected
+        return context
+
+    def delete(self, request, *args, **kwargs):
+        """Delete method."""
+        # pylint: disable=attribute-defined-outside-init
+        self.object = self.get_object()
+        # find out about protected objects without loading the related objects
+        if not has_protected_objects(self.get_delete_queryset()):
+            # Handle cases where you get ProtectedError
+            try:
+                return super().delete(request, *args, **kwargs)
+            except ProtectedError:
+                # the related objects changed since they were checked
+                pass
+
+        info = _(settings.VEGA_DELETE_PROTECTED_ERROR_TXT)
+        messages.error(request, info, fail_silently=True)
+        return redirect(self.get_delete_url())
+
+
+class CRUDPathPatterMixin:
+    """Add method to get CRUD path URL pattern"""
+
+    @classmethod
+    def get_crud_path_pattern(cls, crud_path: str, action: str):
+        """Derive the CRUD path URL pattern."""
+        return f"{crud_path}/{slugify(action, allow_unicode=True)}"
+
+
+class SimpleURLPatternMixin(CRUDPathPatterMixin):
+    """Very simple implements the derive_url_pattern method."""
+
+    @classmethod
+    def derive_url_pattern(cls, crud_path: str, action: str):
+        """Derive the url pattern."""
+        return f"{cls.get_crud_path_pattern(crud_path, action)}/"
+
+
+class ObjectURLPatternMixin(CRUDPathPatterMixin):
+    """Implements the derive_url_pattern method for single object views."""
+
+    @classmethod
+    def derive_url_pattern(cls, crud_path: str, action: str):
+        """Derive the url pattern."""
+        return f"{cls.get_crud_path_pattern(crud_path, action)}/<int:pk>/"
+
+
+class TimeStampedModel(models.Model):
+    """Adds timestamps to a model class."""
+
+    created = models.DateTimeField(_("Created"), auto_now_add=True)
+    modified = models.DateTimeField(_("Modified"), auto_now=True)
+
+    class Meta:
+        """Meta class."""
+
+        abstract = True
@@ -0,0 +1,187 @@
+"""vega-admin mixins for acting on many objects at once."""
+from typing import Optional
+
+from django.conf import settings
+from django.contrib import messages
+from django.shortcuts import redirect
+from django.utils.translation import ugettext as _
+
+from vega_admin.bulk import (
+    PartialDeleteError,
+    delete_in_batches,
+    get_selected_pks,
+    update_in_batches,
+)
+from vega_admin.deletion import has_protected_objects
+
+
+class BulkActionMixin:
+    """
+    Acts on many objects at once.
+
+    Meant to be used together with ListViewSearchMixin.  The primary keys of
+    the selected objects are posted, or the all parameter to act on every
+    object that matches the filters and search in the query string.  The
+    first post renders a confirmation page, and the action is performed once
+    the confirm parameter is posted too.
+    """
+
+    http_method_names = ["post"]
+    bulk_batch_size: Optional[int] = None  # defaults to VEGA_BULK_BATCH_SIZE
+
+    def get_bulk_batch_size(self):
+        """Get the number of objects changed per transaction."""
+        if self.bulk_batch_size is None:
+            return settings.VEGA_BULK_BATCH_SIZE
+        return self.bulk_batch_size
+
+    def is_bulk_all(self):
+        """Whether to act on every object that matches the filters and search."""
+        return bool(self.request.POST.get(settings.VEGA_BULK_ALL_PARAM))
+
+    def is_bulk_confirmed(self):
+        """Whether the action has been confirmed."""
+        return bool(self.request.POST.get(settings.VEGA_BULK_CONFIRM_PARAM))
+
+    def get_selected_pks(self):
+        """Get the primary keys of the selected objects."""
+        values = self.request.POST.getlist(settings.VEGA_BULK_SELECTION_PARAM)
+        return get_selected_pks(self.model, values)
+
+    def get_bulk_queryset(self):
+        """Get the queryset of the objects to act on."""
+        queryset = self.get_queryset()
+        if self.is_bulk_all():
+            return queryset
+        return queryset.filter(pk__in=self.get_selected_pks())
+
+    def get_bulk_success_url(self):
+        """Get the url of the list that the action was started from."""
+        url = str(self.get_list_url())
+        query = self.request.GET.urlencode()
+        if query:
+            return f"{url}?{query}"
+        return url
+
+    def perform_bulk_action(self, queryset):  # pylint: disable=unused-argument
+        """
+        Perform the action on the objects of a queryset.
+
+        Override this to act on the objects.  The default does not change
+        them and returns to the list that the action was started from.
+
+        :param queryset: the queryset of the selected objects
+        :return: a response, or None to render the confirmation page again
+        """
+        return redirect(self.get_bulk_success_url())
+
+    def get_context_data(self, **kwargs):
+        """Get context data."""
+        context = super().get_context_data(**kwargs)
+        context["vega_bulk_count"] = self.object_list.count()
+        context["vega_bulk_all"] = self.is_bulk_all()
+        context["vega_bulk_pks"] = [] if self.is_bulk_all() else self.get_selected_pks()
+        return context
+
+    def post(self, request, *args, **kwargs):
+        """Confirm or perform the action."""
+        if not self.is_bulk_all() and not self.get_selected_pks():
+            info = _(settings.VEGA_BULK_NOTHING_SELECTED_TXT)
+            messages.error(request, info, fail_silently=True)
+            return redirect(self.get_bulk_success_url())
+
+        # pylint: disable=attribute-defined-outside-init
+        self.object_list = self.get_bulk_queryset()
+        if self.is_bulk_confirmed():
+            response = self.perform_bulk_action(self.object_list)
+            if response is not None:
+                return response
+        return self.render_to_response(self.get_context_data())
+
+
+class BulkDeleteMixin(BulkActionMixin):
+    """Deletes many objects at once, in batches."""
+
+    def perform_bulk_action(self, queryset):
+        """Delete the objects of a queryset."""
+        # check all the objects at once instead of failing half way through
+        protected = has_protected_objects(queryset)
+        deleted = 0
+        if not protected:
+            try:
+                deleted = delete_in_batches(queryset, self.get_bulk_batch_size())
+            except PartialDeleteError as error:
+                # the objects changed since they were checked
+                protected = True
+                deleted = error.deleted
+
+        if protected and deleted:
+            info = _(settings.VEGA_BULK_DELETE_PARTIAL_TXT) % {"count": deleted}
+            messages.error(self.request, info, fail_silently=True)
+        elif protected:
+            info = _(settings.VEGA_DELETE_PROTECTED_ERROR_TXT)
+            messages.error(self.request, info, fail_silently=True)
+        else:
+            info = _(settings.VEGA_BULK_DELETE_TXT) % {"count": deleted}
+            messages.success(self.request, info, fail_silently=True)
+        return super().perform_bulk_action(queryset)
+
+
+class BulkUpdateMixin(BulkActionMixin):
+    """Sets the fields of a form on many objects at once, in batches."""
+
+    bulk_form_class = None
+    bulk_update_signals: Optional[bool] = None  # defaults to VEGA_BULK_UPDATE_SIGNALS
+
+    def get_bulk_update_signals(self):
+        """Whether to send pre_save and post_save for the updated objects."""
+        if self.bulk_update_signals is None:
+            return settings.VEGA_BULK_UPDATE_SIGNALS
+        return self.bulk_update_signals
+
+    def get_bulk_form(self):
+        """Get the form of the new values, bound once the action is confirmed."""
+        if getattr(self, "_bulk_form", None) is None:
+            kwargs = {
+                "request": self.request,
+                settings.VEGA_MODELFORM_KWARG: {
+                    "cancel_url": self.get_bulk_success_url()
+                },
+            }
+            if self.is_bulk_confirmed():
+                kwargs["data"] = self.request.POST
+                kwargs["files"] = self.request.FILES
+            # pylint: disable=attribute-defined-outside-init,not-callable
+            self._bulk_form = self.bulk_form_class(**kwargs)
+            helper = getattr(self._bulk_form, "helper", None)
+            if helper is not None:
+                # the template's form also posts the selection
+                helper.form_tag = False
+        return self._bulk_form
+
+    def get_bulk_values(self, form):  # pylint: disable=no-self-use
+        """Get the new values of the model fields of a valid form."""
+        names = [_.name for _ in form._meta.model._meta.concrete_fields]
+        return {_: form.cleaned_data[_] for _ in form.fields if _ in names}
+
+    def perform_bulk_action(self, queryset):
+        """Update the objects of a queryset."""
+        form = self.get_bulk_form()
+        if not form.is_valid():
+            return None
+
+        updated = update_in_batches(
+            queryset,
+            self.get_bulk_values(form),
+            self.get_bulk_batch_size(),
+            send_signals=self.get_bulk_update_signals(),
+        )
+        info = _(settings.VEGA_BULK_UPDATE_TXT) % {"count": updated}
+        messages.success(self.request, info, fail_silently=True)
+        return super().perform_bulk_action(queryset)
+
+    def get_context_data(self, **kwargs):
+        """Get context data."""
+        context = super().get_context_data(**kwargs)
+        context["form"] = self.get_bulk_form()
+        return context
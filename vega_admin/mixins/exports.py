@@ -0,0 +1,185 @@
+"""vega-admin mixins for streaming and background table exports."""
+from typing import List, Optional, Union
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpResponseBadRequest,
+    JsonResponse,
+    StreamingHttpResponse,
+)
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.utils.http import urlencode
+
+from django_tables2 import RequestConfig
+
+from vega_admin.exports import (
+    JOB_DONE,
+    JOB_FAILED,
+    STREAMS,
+    create_export_job,
+    get_export_job,
+    iter_table_values,
+)
+
+
+class StreamingExportMixin:
+    """Streams table exports instead of building them in memory."""
+
+    streaming_export_formats: Union[None, List[str]] = None
+
+    def get_streaming_export_formats(self):
+        """Get the export formats that are streamed."""
+        if self.streaming_export_formats is None:
+            return settings.VEGA_STREAMING_EXPORT_FORMATS
+        return self.streaming_export_formats
+
+    def get_export_table(self):
+        """Get an unpaginated table to export."""
+        table_class = self.get_table_class()
+        table = table_class(data=self.get_table_data(), **self.get_table_kwargs())
+        RequestConfig(self.request, paginate=False).configure(table)
+        return table
+
+    def is_streaming_export(self, export_format):
+        """Check whether an export format is streamed."""
+        return export_format in STREAMS and (
+            export_format in self.get_streaming_export_formats()
+        )
+
+    def get(self, request, *args, **kwargs):
+        """Stream exports without paginating or counting the list first."""
+        export_format = request.GET.get(self.export_trigger_param)
+        if self.is_streaming_export(export_format):
+            self.object_list = self.get_queryset()  # pylint: disable=W0201
+            return self.create_export(export_format)
+        return super().get(request, *args, **kwargs)
+
+    def create_export(self, export_format):
+        """Create the export response."""
+        if not self.is_streaming_export(export_format):
+            return super().create_export(export_format)
+
+        values = iter_table_values(
+            self.get_export_table(), exclude_columns=self.exclude_columns
+        )
+        response = StreamingHttpResponse(
+            STREAMS[export_format](values),
+            content_type=self.export_class.FORMATS[export_format],
+        )
+        filename = self.get_export_filename(export_format)
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+
+class ExportJobMixin:
+    """Runs table exports as background jobs."""
+
+    http_method_names = ["get", "post"]
+    export_job_template_name: Optional[str] = None
+
+    def get_export_job_template_names(self):
+        """Get the templates of the page that shows an export job."""
+        return [self.export_job_template_name]
+
+    def is_export_job_page(self):
+        """Whether a browser asked for the page instead of the JSON data."""
+        return "text/html" in self.request.META.get("HTTP_ACCEPT", "")
+
+    def get_export_job_user_id(self):
+        """Get the id of the user that export jobs belong to."""
+        user = getattr(self.request, "user", None)
+        if user is None or not user.is_authenticated:
+            return None
+        return user.pk
+
+    def get_export_job(self):
+        """Get the requested export job, if it belongs to the current user."""
+        job = get_export_job(self.request.GET.get(settings.VEGA_EXPORT_JOB_PARAM))
+        if job is None or job["user"] != self.get_export_job_user_id():
+            raise Http404
+        return job
+
+    def get_export_job_url(self, job, download=False):
+        """Get the status or download url of an export job."""
+        query = {settings.VEGA_EXPORT_JOB_PARAM: job["id"]}
+        if download:
+            query[settings.VEGA_EXPORT_DOWNLOAD_PARAM] = 1
+        return f"{self.request.path}?{urlencode(query)}"
+
+    def get_export_job_data(self, job):
+        """Get the export job status that is sent to the client."""
+        progress = None
+        if job["status"] == JOB_DONE:
+            progress = 100
+        elif job["total"]:
+            progress = min(100, int(job["rows"] * 100 / job["total"]))
+        download_url = None
+        if job["status"] == JOB_DONE:
+            download_url = self.get_export_job_url(job, download=True)
+        return {
+            "id": job["id"],
+            "status": job["status"],
+            "format": job["format"],
+            "rows": job["rows"],
+            "total": job["total"],
+            "progress": progress,
+            "error": job["error"],
+            "status_url": self.get_export_job_url(job),
+            "download_url": download_url,
+        }
+
+    def render_export_job(self, job):
+        """Render the page that shows an export job until its file is ready."""
+        context = {
+            "view": self,
+            "vega_export_job": self.get_export_job_data(job),
+            "vega_export_job_done": JOB_DONE,
+            "vega_export_job_failed": JOB_FAILED,
+            "vega_list_url": self.get_list_url(),
+            "vega_verbose_name": self.model._meta.verbose_name,
+            "vega_verbose_name_plural": self.model._meta.verbose_name_plural,
+        }
+        return TemplateResponse(
+            self.request, self.get_export_job_template_names(), context
+        )
+
+    def get(self, request, *args, **kwargs):
+        """Get the status of an export job or download its file."""
+        job = self.get_export_job()
+        if not request.GET.get(settings.VEGA_EXPORT_DOWNLOAD_PARAM):
+            if self.is_export_job_page():
+                return self.render_export_job(job)
+            return JsonResponse(self.get_export_job_data(job))
+        if job["status"] != JOB_DONE:
+            raise Http404
+        return FileResponse(
+            default_storage.open(job["path"], "rb"),
+            as_attachment=True,
+            filename=job["filename"],
+            content_type=self.export_class.FORMATS[job["format"]],
+        )
+
+    def post(self, request, *args, **kwargs):
+        """Start an export job for the current search and filters."""
+        export_format = request.POST.get(
+            self.export_trigger_param, request.GET.get(self.export_trigger_param)
+        )
+        if not self.export_class.is_valid_format(export_format):
+            return HttpResponseBadRequest()
+
+        self.object_list = self.get_queryset()  # pylint: disable=W0201
+        job = create_export_job(
+            self.get_export_table(),
+            export_format=export_format,
+            filename=self.get_export_filename(export_format),
+            exclude_columns=self.exclude_columns,
+            dataset_kwargs=self.get_dataset_kwargs(),
+            user_id=self.get_export_job_user_id(),
+        )
+        if self.is_export_job_page():
+            return redirect(self.get_export_job_url(job))
+        return JsonResponse(self.get_export_job_data(job), status=202)
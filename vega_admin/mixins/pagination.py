@@ -0,0 +1,134 @@
+"""vega-admin mixins for paginating list views."""
+from django.conf import settings
+from django.core.paginator import Paginator
+
+from vega_admin.pagination import KeysetPaginator, get_count_paginator_class
+
+
+class KeysetPaginationMixin:
+    """
+    Optionally paginates list views using keyset (seek) pagination.
+
+    Meant to be used together with VegaOrderedQuerysetMixin and django_tables2's
+    SingleTableMixin and ExportMixin.
+    """
+
+    pagination_mode = None
+    keyset_page = None
+
+    def get_pagination_mode(self):
+        """Get the pagination mode."""
+        return self.pagination_mode or settings.VEGA_PAGINATION_MODE
+
+    def is_keyset_paginated(self):
+        """Return True if we are using keyset pagination."""
+        return self.get_pagination_mode() == settings.VEGA_KEYSET_PAGINATION
+
+    def get_keyset_ordering(self, queryset):
+        """Get the ordering that keyset pagination is based on."""
+        if queryset.query.order_by:
+            return list(queryset.query.order_by)
+        if queryset.query.default_ordering and queryset.model._meta.ordering:
+            return list(queryset.model._meta.ordering)
+        return list(self.get_order_by())
+
+    def paginate_queryset(self, queryset, page_size):
+        """Paginate the queryset."""
+        if not self.is_keyset_paginated():
+            return super().paginate_queryset(queryset, page_size)
+
+        paginator = KeysetPaginator(
+            queryset=queryset,
+            per_page=page_size,
+            ordering=self.get_keyset_ordering(queryset),
+        )
+        self.keyset_page = paginator.page(
+            self.request.GET.get(settings.VEGA_KEYSET_CURSOR_PARAM)
+        )
+        return (
+            None,
+            self.keyset_page,
+            self.keyset_page.object_list,
+            self.keyset_page.has_other_pages(),
+        )
+
+    def get_table_data(self):
+        """Get the table data."""
+        export_format = self.request.GET.get(self.export_trigger_param)
+        if self.keyset_page is not None and not self.export_class.is_valid_format(
+            export_format
+        ):
+            return self.keyset_page.object_list
+        return super().get_table_data()
+
+    def get_table_pagination(self, table):
+        """Get the table pagination options."""
+        if self.is_keyset_paginated():
+            return False
+        return super().get_table_pagination(table)
+
+    def get_table_kwargs(self):
+        """Get the table kwargs."""
+        kwargs = super().get_table_kwargs()
+        if self.is_keyset_paginated():
+            # the ordering is fixed because that is what the cursors are based on
+            kwargs["orderable"] = False
+        return kwargs
+
+    def get_context_data(self, **kwargs):
+        """Get context data."""
+        context = super().get_context_data(**kwargs)
+        context["vega_keyset_page"] = self.keyset_page
+        context["vega_keyset_cursor_param"] = settings.VEGA_KEYSET_CURSOR_PARAM
+        return context
+
+
+class PaginationCountMixin:
+    """
+    Controls how list views count rows for pagination.
+
+    The list view and its table share a single count, computed using the
+    selected count strategy (exact, capped or estimated).
+    """
+
+    count_strategy = None
+    count_paginator = None
+
+    def get_count_strategy(self):
+        """Get the count strategy."""
+        return self.count_strategy or settings.VEGA_COUNT_STRATEGY
+
+    def get_count_paginator_class(self):
+        """Get the paginator class, respecting any custom paginator_class."""
+        if self.paginator_class is not Paginator:
+            return self.paginator_class
+        return get_count_paginator_class(self.get_count_strategy())
+
+    def get_paginator(  # pylint: disable=bad-continuation
+        self, queryset, per_page, orphans=0, allow_empty_first_page=True, **kwargs
+    ):
+        """Get the paginator for the list view."""
+        self.count_paginator = self.get_count_paginator_class()(
+            queryset,
+            per_page,
+            orphans=orphans,
+            allow_empty_first_page=allow_empty_first_page,
+            **kwargs,
+        )
+        return self.count_paginator
+
+    def get_table_pagination(self, table):
+        """Get the table pagination options."""
+        paginate = super().get_table_pagination(table)
+        if paginate is False or self.paginator_class is not Paginator:
+            return paginate
+        if paginate is True:
+            paginate = {}
+
+        paginate["paginator_class"] = self.get_count_paginator_class()
+        if self.count_paginator is not None:
+            # reuse the count from the list view's paginator
+            paginate["count"] = self.count_paginator.count
+            paginate["count_is_exact"] = self.count_paginator.count_is_exact
+
+        return paginate
@@ -0,0 +1,507 @@
+"""vega-admin pagination module."""
+import json
+from typing import Any, List, Optional
+
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import (
+    FieldDoesNotExist,
+    ImproperlyConfigured,
+    ValidationError,
+)
+from django.core.paginator import Paginator
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DatabaseError, connections
+from django.db.models import Model, Q, QuerySet
+from django.utils.formats import number_format
+from django.utils.functional import cached_property
+from django.utils.translation import ugettext as _
+
+KEYSET_NEXT = "n"
+KEYSET_PREVIOUS = "p"
+KEYSET_CURSOR_SALT = "vega_admin.pagination.keyset"
+
+
+class KeysetCursorSerializer:
+    """Serialize keyset cursors to JSON, including dates, decimals and UUIDs."""
+
+    def dumps(self, obj):  # pylint: disable=no-self-use
+        """Serialize the cursor payload."""
+        return json.dumps(obj, separators=(",", ":"), cls=DjangoJSONEncoder).encode(
+            "latin-1"
+        )
+
+    def loads(self, data):  # pylint: disable=no-self-use
+        """Deserialize the cursor payload."""
+        return json.loads(data.decode("latin-1"))
+
+
+def encode_cursor(values: List[Any], direction: str) -> str:
+    """
+    Get an opaque cursor for the provided ordering values.
+
+    The cursor is signed so that the values it carries can safely be fed back
+    into a queryset filter.
+
+    :param values: the values of the ordering fields of the boundary row
+    :param direction: one of KEYSET_NEXT or KEYSET_PREVIOUS
+    :return: the cursor string
+    """
+    return signing.dumps(
+        {"d": direction, "v": values},
+        salt=KEYSET_CURSOR_SALT,
+        serializer=KeysetCursorSerializer,
+        compress=True,
+    )
+
+
+def decode_cursor(cursor: str, size: int):
+    """
+    Get the direction and values from an opaque cursor.
+
+    :param cursor: the cursor string
+    :param size: the expected number of values
+    :return: tuple of (direction, values) or None if the cursor is invalid
+    """
+    try:
+        payload = signing.loads(
+            cursor, salt=KEYSET_CURSOR_SALT, serializer=KeysetCursorSerializer
+        )
+    except (signing.BadSignature, ValueError):
+        return None
+
+    if not isinstance(payload, dict):
+        return None
+    direction = payload.get("d")
+    values = payload.get("v")
+    if direction not in (KEYSET_NEXT, KEYSET_PREVIOUS):
+        return None
+    if not isinstance(values, list) or len(values) != size:
+        return None
+
+    return direction, values
+
+
+def get_keyset_ordering(model: Model, ordering: List[str]) -> List[str]:
+    """
+    Get a keyset friendly version of the provided ordering.
+
+    Relations are replaced with the column holding the related key so that
+    rows are compared on the values actually stored in the table, and the
+    primary key is appended as a tie-breaker to make the ordering stable.
+
+    :param model: the model class
+    :param ordering: list of ordering field names e.g. ["-name"]
+    :return: list of ordering field names
+    """
+    result = []
+    has_pk = False
+    for item in ordering:
+        error = ImproperlyConfigured(
+            f"Keyset pagination cannot order {model.__name__} by {item!r}"
+        )
+        if not isinstance(item, str) or item == "?":
+            raise error
+        descending = item.startswith("-")
+        parts = item.lstrip("-+").split("__")
+        opts = model._meta
+        field = None
+        for index, part in enumerate(parts):
+            try:
+                field = opts.pk if part == "pk" else opts.get_field(part)
+            except FieldDoesNotExist:
+                raise error
+            if index < len(parts) - 1:
+                if not field.is_relation or field.many_to_many or field.one_to_many:
+                    raise error
+                opts = field.related_model._meta
+        if field.is_relation:
+            if not field.concrete or field.many_to_many:
+                raise error
+            parts[-1] = field.attname
+        if len(parts) == 1 and field == model._meta.pk:
+            has_pk = True
+        result.append(f"{'-' if descending else ''}{'__'.join(parts)}")
+
+    if not has_pk:
+        result.append("pk")
+
+    return result
+
+
+def get_ordering_value(obj: Model, name: str) -> Any:
+    """
+    Get the value of an ordering field name from a model instance.
+
+    :param obj: the model instance
+    :param name: the ordering field name e.g. "-artist__name"
+    :return: the value
+    """
+    value = obj
+    for part in name.lstrip("-+").split("__"):
+        if value is None:
+            break
+        value = getattr(value, part)
+    return value
+
+
+def get_keyset_filter(ordering: List[str], values: List[Any], reverse: bool) -> Q:
+    """
+    Get the filter that selects the rows that come after the provided values.
+
+    For an ordering of (a, b, pk) this builds:
+
+        a > x OR (a = x AND b > y) OR (a = x AND b = y AND pk > z)
+
+    with the comparisons flipped for descending fields.  Ordering fields are
+    expected to be NOT NULL; a NULL boundary value only matches rows that are
+    also NULL on that field.
+
+    :param ordering: the keyset ordering
+    :param values: the values of the boundary row
+    :param reverse: whether we are looking for rows before the boundary row
+    :return: Q object
+    """
+    query = Q()
+    equal = Q()
+    for index, item in enumerate(ordering):
+        name = item.lstrip("-+")
+        value = values[index]
+        if value is not None:
+            lookup = "lt" if item.startswith("-") != reverse else "gt"
+            query |= equal & Q(**{f"{name}__{lookup}": value})
+            equal &= Q(**{name: value})
+        else:
+            equal &= Q(**{f"{name}__isnull": True})
+    return query
+
+
+def reverse_ordering(ordering: List[str]) -> List[str]:
+    """Get the reverse of the provided ordering."""
+    return [_[1:] if _.startswith("-") else f"-{_}" for _ in ordering]
+
+
+class KeysetPage:
+    """A page of results obtained through keyset pagination."""
+
+    def __init__(  # pylint: disable=bad-continuation
+        self,
+        object_list: List[Model],
+        ordering: List[str],
+        has_next: bool,
+        has_previous: bool,
+    ):
+        """Initialize!."""
+        self.object_list = object_list
+        self.ordering = ordering
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __len__(self):
+        """Get the number of objects in the page."""
+        return len(self.object_list)
+
+    def __iter__(self):
+        """Iterate over the objects in the page."""
+        return iter(self.object_list)
+
+    def has_next(self):
+        """Return True if there is a next page."""
+        return self._has_next
+
+    def has_previous(self):
+        """Return True if there is a previous page."""
+        return self._has_previous
+
+    def has_other_pages(self):
+        """Return True if there are pages before or after this one."""
+        return self.has_next() or self.has_previous()
+
+    def get_cursor(self, obj: Model, direction: str):
+        """Get the cursor that starts paginating from the provided object."""
+        values = [get_ordering_value(obj, name) for name in self.ordering]
+        return encode_cursor(values, direction)
+
+    @property
+    def next_cursor(self):
+        """Get the cursor for the next page."""
+        if not self.has_next():
+            return None
+        return self.get_cursor(self.object_list[-1], KEYSET_NEXT)
+
+    @property
+    def previous_cursor(self):
+        """Get the cursor for the previous page."""
+        if not self.has_previous():
+            return None
+        return self.get_cursor(self.object_list[0], KEYSET_PREVIOUS)
+
+
+class KeysetPaginator:
+    """
+    Paginate a queryset using keyset (seek) pagination.
+
+    Instead of using OFFSET, each page is fetched by filtering for the rows
+    that come after (or before) the boundary row of the page the user was
+    looking at, which means that every page costs the same regardless of how
+    deep into the results it is.
+    """
+
+    def __init__(self, queryset: QuerySet, per_page: int, ordering: List[str]):
+        """Initialize!."""
+        self.ordering = get_keyset_ordering(queryset.model, ordering)
+        self.queryset = queryset.order_by(*self.ordering)
+        self.per_page = int(per_page)
+
+    def page(self, cursor: Optional[str] = None) -> KeysetPage:
+        """
+        Get the page that starts at the provided cursor.
+
+        Invalid cursors are ignored and the first page is returned.
+
+        :param cursor: the cursor string
+        :return: the page
+        """
+        decoded = None
+        if cursor:
+            decoded = decode_cursor(cursor, size=len(self.ordering))
+
+        if decoded is None:
+            object_list = list(self.queryset[: self.per_page + 1])
+            return KeysetPage(
+                object_list=object_list[: self.per_page],
+                ordering=self.ordering,
+                has_next=len(object_list) > self.per_page,
+                has_previous=False,
+            )
+
+        direction, values = decoded
+        backwards = direction == KEYSET_PREVIOUS
+        queryset = self.queryset
+        if backwards:
+            queryset = queryset.order_by(*reverse_ordering(self.ordering))
+        try:
+            queryset = queryset.filter(
+                get_keyset_filter(self.ordering, values, reverse=backwards)
+            )
+            object_list = list(queryset[: self.per_page + 1])
+        except (ValueError, TypeError, ValidationError):
+            # the cursor holds values that do not fit the ordering fields
+            return self.page(cursor=None)
+
+        has_more = len(object_list) > self.per_page
+        object_list = object_list[: self.per_page]
+        if backwards:
+            object_list.reverse()
+            return KeysetPage(
+                object_list=object_list,
+                ordering=self.ordering,
+                has_next=True,
+                has_previous=has_more,
+            )
+
+        return KeysetPage(
+            object_list=object_list,
+            ordering=self.ordering,
+            has_next=has_more,
+            has_previous=True,
+        )
+
+
+def get_object_list_queryset(object_list) -> Optional[QuerySet]:
+    """
+    Get the queryset behind the object list of a paginator.
+
+    django_tables2 paginates the rows of the table rather than the queryset
+    itself, so we look for the queryset inside the table data as well.
+
+    :param object_list: the object list
+    :return: queryset or None
+    """
+    if isinstance(object_list, QuerySet):
+        return object_list
+    data = getattr(getattr(object_list, "data", None), "data", None)
+    if isinstance(data, QuerySet):
+        return data
+    return None
+
+
+def get_estimated_count(queryset: QuerySet) -> Optional[int]:
+    """
+    Get an estimate of the number of rows in a queryset from the planner.
+
+    Unfiltered querysets use the PostgreSQL pg_class.reltuples statistic while
+    filtered ones use the row estimate of the query plan.  Only PostgreSQL is
+    supported; None is returned for other databases or when no usable estimate
+    is available.
+
+    :param queryset: the queryset
+    :return: the estimated number of rows or None
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+
+    query = queryset.query
+    try:
+        if not query.where and not query.distinct and not query.combinator:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                    [connection.ops.quote_name(queryset.model._meta.db_table)],
+                )
+                row = cursor.fetchone()
+            estimate = row[0] if row else None
+        else:
+            # QuerySet.explain() formats the plan as a python repr, not JSON
+            sql, params = query.get_compiler(using=queryset.db).as_sql()
+            with connection.cursor() as cursor:
+                cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+                row = cursor.fetchone()
+            plan = row[0] if row else None
+            if isinstance(plan, str):
+                # the driver did not decode the json
+                plan = json.loads(plan)
+            estimate = plan[0]["Plan"]["Plan Rows"]
+    except (DatabaseError, KeyError, IndexError, TypeError, ValueError):
+        return None
+
+    if estimate is None or estimate < 0:
+        # tables that have never been analyzed report -1
+        return None
+    return int(estimate)
+
+
+class ExactCountPaginator(Paginator):
+    """
+    Paginator that counts all the rows.
+
+    A count that was already computed for the same rows (e.g. by the list
+    view's own paginator) can be handed over using the `count` argument so
+    that we do not run the same COUNT query twice.
+    """
+
+    def __init__(  # pylint: disable=bad-continuation,too-many-arguments
+        self,
+        object_list,
+        per_page,
+        orphans=0,
+        allow_empty_first_page=True,
+        count=None,
+        count_is_exact=True,
+    ):
+        """Initialize!."""
+        super().__init__(
+            object_list,
+            per_page,
+            orphans=orphans,
+            allow_empty_first_page=allow_empty_first_page,
+        )
+        if count is not None:
+            self.__dict__["count_result"] = (count, count_is_exact)
+
+    def get_count(self):
+        """Return a tuple of the number of rows and whether it is exact."""
+        queryset = get_object_list_queryset(self.object_list)
+        if queryset is None:
+            return len(self.object_list), True
+        return queryset.count(), True
+
+    @cached_property
+    def count_result(self):
+        """Return a tuple of the number of rows and whether it is exact."""
+        return self.get_count()
+
+    @property
+    def count(self):
+        """Return the number of rows."""
+        return self.count_result[0]
+
+    @property
+    def count_is_exact(self):
+        """Return True if the number of rows is exact."""
+        return self.count_result[1]
+
+    @property
+    def count_display(self):
+        """Return the number of rows, formatted for display."""
+        return number_format(self.count, force_grouping=True)
+
+    def page(self, number):
+        """Return a Page object for the given 1-based page number."""
+        if self.count_is_exact:
+            return super().page(number)
+        # the count is not the real number of rows, so we should not use it to
+        # cut short the last page
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        top = bottom + self.per_page
+        return self._get_page(self.object_list[bottom:top], number, self)
+
+
+class CappedCountPaginator(ExactCountPaginator):
+    """Paginator that stops counting rows once VEGA_COUNT_CAP is exceeded."""
+
+    def get_count(self):
+        """Return a tuple of the number of rows and whether it is exact."""
+        cap = settings.VEGA_COUNT_CAP
+        queryset = get_object_list_queryset(self.object_list)
+        if queryset is None:
+            count = len(self.object_list)
+        else:
+            count = queryset[: cap + 1].count()
+        return min(count, cap + 1), count <= cap
+
+    @property
+    def count_display(self):
+        """Return the number of rows, formatted for display."""
+        if self.count_is_exact:
+            return super().count_display
+        cap = number_format(settings.VEGA_COUNT_CAP, force_grouping=True)
+        return f"{cap}+"
+
+
+class EstimatedCountPaginator(ExactCountPaginator):
+    """
+    Paginator that uses the database statistics to estimate the row count.
+
+    Estimates below VEGA_COUNT_ESTIMATE_THRESHOLD, or when no estimate is
+    available, fall back to an exact count.
+    """
+
+    def get_count(self):
+        """Return a tuple of the number of rows and whether it is exact."""
+        queryset = get_object_list_queryset(self.object_list)
+        if queryset is not None:
+            estimate = get_estimated_count(queryset)
+            if (
+                estimate is not None
+                and estimate >= settings.VEGA_COUNT_ESTIMATE_THRESHOLD
+            ):
+                return estimate, False
+        return super().get_count()
+
+    @property
+    def count_display(self):
+        """Return the number of rows, formatted for display."""
+        if self.count_is_exact:
+            return super().count_display
+        return f"{_(settings.VEGA_ESTIMATED_COUNT_TXT)} {super().count_display}"
+
+
+def get_count_paginator_class(count_strategy: str):
+    """
+    Get the paginator class for a count strategy.
+
+    :param count_strategy: one of the VEGA_*_COUNT settings
+    :return: paginator class
+    """
+    paginator_classes = {
+        settings.VEGA_EXACT_COUNT: ExactCountPaginator,
+        settings.VEGA_CAPPED_COUNT: CappedCountPaginator,
+        settings.VEGA_ESTIMATED_COUNT: EstimatedCountPaginator,
+    }
+    try:
+        return paginator_classes[count_strategy]
+    except KeyError:
+        raise ImproperlyConfigured(f"Invalid count strategy: {count_strategy}")
@@ -0,0 +1,233 @@
+"""vega-admin module for checking permissions without querying per check."""
+import hashlib
+import uuid
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.models import Group, Permission
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.utils.module_loading import import_string
+
+from vega_admin.registry import get_crud_views
+
+CACHE_VERSION_KEY = "vega_admin.permissions.version"
+
+
+class PermissionSnapshot:
+    """
+    The permissions that a user has for the models of the CRUD views.
+
+    The permissions are loaded in one query and then checked in memory.
+    Permissions of other apps are checked using user.has_perm().
+    """
+
+    def __init__(self, user, app_labels: Iterable[str], permissions: Iterable[str]):
+        self.user = user
+        self.app_labels = frozenset(app_labels)
+        self.permissions = frozenset(permissions)
+
+    def has_perm(self, perm: str) -> bool:
+        """
+        Check whether the user has a permission.
+
+        :param perm: the permission e.g. "artist_app.list_artist"
+        :return: True or False
+        """
+        if perm.partition(".")[0] not in self.app_labels:
+            return self.user.has_perm(perm)
+        if not self.user.is_active:
+            return False
+        return self.user.is_superuser or perm in self.permissions
+
+    def has_perms(self, perms: Iterable[str]) -> bool:
+        """
+        Check whether the user has all of some permissions.
+
+        :param perms: the permissions
+        :return: True or False
+        """
+        return all(self.has_perm(_) for _ in perms)
+
+
+@lru_cache(maxsize=None)
+def snapshots_are_supported(backends: tuple) -> bool:
+    """
+    Check whether snapshots give the same answers as the auth backends.
+
+    :param backends: the dotted paths of the auth backends
+    :return: True if every backend works like ModelBackend with the user model
+    """
+    user_model = get_user_model()
+    return (
+        hasattr(user_model, "user_permissions")
+        and hasattr(user_model, "groups")
+        and all(issubclass(import_string(_), ModelBackend) for _ in backends)
+    )
+
+
+def get_crud_app_labels() -> FrozenSet[str]:
+    """Get the app labels of the models of the CRUD views."""
+    return frozenset(_.model._meta.app_label for _ in get_crud_views(load_urls=False))
+
+
+def load_permissions(user, app_labels: Iterable[str]) -> FrozenSet[str]:
+    """
+    Load the permissions that a user has, directly or through groups.
+
+    :param user: the user
+    :param app_labels: only the permissions of these apps are loaded
+    :return: the permissions e.g. {"artist_app.list_artist"}
+    """
+    if not user.is_active or user.is_anonymous or user.is_superuser:
+        # these permissions do not depend on the database
+        return frozenset()
+    # subqueries so that the two relations do not multiply the rows
+    user_permissions = Permission.objects.filter(user=user).values("pk")
+    group_permissions = Permission.objects.filter(group__user=user).values("pk")
+    rows = Permission.objects.filter(
+        Q(pk__in=user_permissions) | Q(pk__in=group_permissions),
+        content_type__app_label__in=list(app_labels),
+    ).values_list("content_type__app_label", "codename")
+    return frozenset(f"{app_label}.{codename}" for app_label, codename in rows)
+
+
+def get_permission_cache():
+    """Get the cache that permissions are kept in, or None."""
+    if settings.VEGA_PERMISSION_CACHE is None:
+        return None
+    return caches[settings.VEGA_PERMISSION_CACHE]
+
+
+def get_cache_version(cache) -> str:
+    """
+    Get the version of the cached permissions.
+
+    A new version is made whenever the version is missing, e.g. because the
+    cache evicted it, so that entries cached before are never trusted again.
+
+    :param cache: the permission cache
+    :return: the version
+    """
+    version = cache.get(CACHE_VERSION_KEY)
+    if version is None:
+        # another process might add a version at the same time
+        cache.add(CACHE_VERSION_KEY, uuid.uuid4().hex, None)
+        version = cache.get(CACHE_VERSION_KEY)
+    return version
+
+
+def get_cached_permissions(user, app_labels: FrozenSet[str]) -> FrozenSet[str]:
+    """
+    Get the permissions of a user from the cache, loading them if needed.
+
+    :param user: the user
+    :param app_labels: only the permissions of these apps are loaded
+    :return: the permissions
+    """
+    cache = get_permission_cache()
+    if cache is None or user.is_anonymous:
+        return load_permissions(user, app_labels)
+    labels = hashlib.md5(",".join(sorted(app_labels)).encode("utf-8")).hexdigest()
+    version = get_cache_version(cache)
+    key = f"vega_admin.permissions.{version}.{user.pk}.{labels}"
+    permissions = cache.get(key)
+    if permissions is None:
+        permissions = load_permissions(user, app_labels)
+        cache.set(key, permissions, settings.VEGA_PERMISSION_CACHE_TIMEOUT)
+    return permissions
+
+
+def get_permission_snapshot(request) -> PermissionSnapshot:
+    """
+    Get the permission snapshot of the user of a request.
+
+    The snapshot is made once per request.
+
+    :param request: the request
+    :return: the permission snapshot
+    """
+    snapshot = getattr(request, "vega_permission_snapshot", None)
+    if snapshot is None or snapshot.user is not request.user:
+        user = request.user
+        app_labels: FrozenSet[str] = frozenset()
+        if snapshots_are_supported(tuple(settings.AUTHENTICATION_BACKENDS)):
+            app_labels = get_crud_app_labels()
+        snapshot = PermissionSnapshot(
+            user, app_labels, get_cached_permissions(user, app_labels)
+        )
+        request.vega_permission_snapshot = snapshot
+    return snapshot
+
+
+def get_allowed_actions(
+    request, action_access: Dict[str, Tuple[bool, Optional[str]]]
+) -> List[str]:
+    """
+    Get the actions that the user of a request is allowed to perform.
+
+    :param request: the request
+    :param action_access: dict of actions and tuples of whether login is
+        required and the permission required or None
+    :return: the allowed actions
+    """
+    user = getattr(request, "user", None)
+    allowed = []
+    for action, (login_required, permission) in action_access.items():
+        if login_required and not (user and user.is_authenticated):
+            continue
+        if permission and not (
+            user and get_permission_snapshot(request).has_perm(permission)
+        ):
+            continue
+        allowed.append(action)
+    return allowed
+
+
+def clear_permission_cache():
+    """Make the cached permissions of every user out of date."""
+    cache = get_permission_cache()
+    if cache is None:
+        return
+    cache.set(CACHE_VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def clear_permission_cache_handler(**kwargs):  # pylint: disable=W0613
+    """Clear the permission cache now and once the transaction commits."""
+    clear_permission_cache()
+    # requests that ran in the meantime might have cached the old permissions
+    transaction.on_commit(clear_permission_cache)
+
+
+def clear_permission_cache_on_create(created, **kwargs):  # pylint: disable=W0613
+    """Clear the permission cache when a user is created."""
+    if created:
+        # a new user can get the primary key of a deleted one
+        clear_permission_cache_handler()
+
+
+def connect_permission_signals():
+    """Clear the permission cache when permissions or group memberships change."""
+    user_model = get_user_model()
+    senders = [Group.permissions.through]
+    for name in ("user_permissions", "groups"):
+        if hasattr(user_model, name):
+            senders.append(getattr(user_model, name).through)
+    for sender in senders:
+        m2m_changed.connect(
+            clear_permission_cache_handler, sender=sender, dispatch_uid=str(sender)
+        )
+    for sender in (Group, Permission, user_model):
+        post_delete.connect(
+            clear_permission_cache_handler, sender=sender, dispatch_uid=str(sender)
+        )
+    post_save.connect(
+        clear_permission_cache_on_create,
+        sender=user_model,
+        dispatch_uid=str(user_model),
+    )
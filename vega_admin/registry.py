@@ -0,0 +1,34 @@
+"""vega-admin module that keeps track of the CRUD views in use."""
+from typing import Dict, List
+
+from django.conf import settings
+from django.urls import get_resolver
+
+_CRUD_VIEWS: Dict[str, object] = {}
+
+
+def register_crud_view(crud_view):
+    """
+    Register a CRUD view.
+
+    CRUD views register themselves when their url patterns are built.
+
+    :param crud_view: the VegaCRUDView instance
+    """
+    _CRUD_VIEWS[crud_view.crud_path] = crud_view
+
+
+def get_crud_views(urlconf: str = None, load_urls: bool = True) -> List:
+    """
+    Get the registered CRUD views.
+
+    The url patterns are loaded first so that every CRUD view that is in use
+    has registered itself.
+
+    :param urlconf: the urlconf to load, defaults to ROOT_URLCONF
+    :param load_urls: whether to load the url patterns first
+    :return: list of VegaCRUDView instances
+    """
+    if load_urls and (urlconf is not None or hasattr(settings, "ROOT_URLCONF")):
+        get_resolver(urlconf).url_patterns  # pylint: disable=expression-not-assigned
+    return list(_CRUD_VIEWS.values())
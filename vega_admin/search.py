@@ -0,0 +1,693 @@
+"""vega-admin module for list view search backends."""
+import re
+import uuid
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal, InvalidOperation
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    TrigramSimilarity,
+)
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.backends.utils import names_digest, truncate_name
+from django.db.models import (
+    AutoField,
+    BooleanField,
+    CharField,
+    DateField,
+    DateTimeField,
+    DecimalField,
+    Exists,
+    FloatField,
+    Func,
+    IntegerField,
+    Model,
+    OuterRef,
+    Q,
+    QuerySet,
+    TextField,
+    TimeField,
+    UUIDField,
+    Value,
+)
+from django.db.models.constants import LOOKUP_SEP
+from django.db.models.fields.reverse_related import ForeignObjectRel
+from django.db.models.functions import Cast, Greatest, Upper
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_time
+from django.utils.module_loading import import_string
+from django.utils.text import smart_split, unescape_string_literal
+
+from vega_admin.introspection import (
+    get_lookup_field,
+    get_multivalued_relation,
+    lookup_spans_multivalued_relation,
+)
+
+SEARCH_RANK_ANNOTATION = "vega_search_rank"
+SIMILARITY_ANNOTATION = "vega_search_similarity"
+CONDITION_ANNOTATION = "vega_search_condition"
+# search field prefixes that pick the lookup of text fields
+SEARCH_PREFIX_LOOKUPS = {"^": "istartswith", "=": "iexact"}
+# the range of the integers that databases can compare against
+MAX_INTEGER = 2**63 - 1
+INTEGER_RE = re.compile(r"^-?\d+$")
+
+
+@lru_cache(maxsize=None)
+def get_search_backend(backend_path: Optional[str] = None):
+    """
+    Get a search backend instance.
+
+    :param backend_path: dotted path to the backend class, defaults to
+        VEGA_SEARCH_BACKEND
+    :return: the search backend
+    """
+    return import_string(backend_path or settings.VEGA_SEARCH_BACKEND)()
+
+
+def get_search_terms(query: str) -> List[str]:
+    """
+    Split a search query into terms.
+
+    Quoted phrases are kept together e.g. 'bob "the builder"' gives
+    ["bob", "the builder"].
+
+    :param query: the search query
+    :return: list of terms
+    """
+    terms = []
+    for term in smart_split(query):
+        if term[0] in "\"'" and term[0] == term[-1] and len(term) > 1:
+            term = unescape_string_literal(term)
+        if term:
+            terms.append(term)
+    return terms
+
+
+def parse_search_field(search_field: str) -> Tuple[str, Optional[str]]:
+    """
+    Split a search field into its lookup and its prefix lookup.
+
+    Search fields of text can be prefixed with "^" for istartswith, which can
+    use a text_pattern_ops (varchar_pattern_ops) index, or with "=" for iexact.
+
+    :param search_field: the search field e.g. "^name"
+    :return: tuple of the lookup and the prefix lookup or None
+    """
+    prefix_lookup = SEARCH_PREFIX_LOOKUPS.get(search_field[:1])
+    if prefix_lookup:
+        return search_field[1:], prefix_lookup
+    return search_field, None
+
+
+def get_day_start(value: date) -> datetime:
+    """
+    Get the start of a day, in the current time zone when time zones are used.
+
+    :param value: the day
+    :return: the datetime of midnight
+    """
+    start = datetime.combine(value, time.min)
+    if settings.USE_TZ:
+        # is_dst=False so that midnights that DST skips or repeats still work
+        start = timezone.make_aware(start, is_dst=False)
+    return start
+
+
+def get_search_lookups(  # pylint: disable=bad-continuation,too-many-return-statements
+    model: Model, search_field: str, term: str
+) -> Optional[Dict[str, Any]]:
+    """
+    Get the lookups that find a search term in a search field.
+
+    The lookups depend on the type of the field so that indexes can be used:
+    numbers, UUIDs and dates are matched exactly when the term can be one,
+    and skipped when it cannot.  Datetimes are matched by the range of the
+    day instead of casting the column to a date.  Text is matched with
+    icontains unless the search field is prefixed.
+
+    :param model: the model class
+    :param search_field: the search field e.g. "^name"
+    :param term: the search term
+    :return: dict of the lookups and values or None if the term cannot match
+    """
+    lookup, prefix_lookup = parse_search_field(search_field)
+    field = get_lookup_field(model, lookup)
+
+    if isinstance(field, BooleanField):
+        return None
+    if isinstance(field, (AutoField, IntegerField)):
+        if not INTEGER_RE.match(term) or abs(int(term)) > MAX_INTEGER:
+            return None
+        return {f"{lookup}__exact": int(term)}
+    if isinstance(field, (DecimalField, FloatField)):
+        try:
+            value = Decimal(term)
+        except InvalidOperation:
+            return None
+        if not value.is_finite():
+            return None
+        return {f"{lookup}__exact": value}
+    if isinstance(field, UUIDField):
+        try:
+            return {f"{lookup}__exact": uuid.UUID(term)}
+        except ValueError:
+            return None
+    if isinstance(field, (DateField, TimeField)):
+        try:
+            if isinstance(field, DateField):
+                value = parse_date(term)
+            else:
+                value = parse_time(term)
+        except ValueError:
+            return None
+        if value is None:
+            return None
+        if isinstance(field, DateTimeField):
+            try:
+                next_day = value + timedelta(days=1)
+            except OverflowError:
+                return None
+            return {
+                f"{lookup}__gte": get_day_start(value),
+                f"{lookup}__lt": get_day_start(next_day),
+            }
+        return {f"{lookup}__exact": value}
+
+    return {f"{lookup}__{prefix_lookup or 'icontains'}": term}
+
+
+def annotate_condition(condition: Q, annotations: Dict[str, Any], prefix: str) -> Q:
+    """
+    Replace the boolean expressions of a condition with annotation lookups.
+
+    :param condition: the condition
+    :param annotations: dict that the expressions are added to
+    :param prefix: the prefix of the annotation names
+    :return: the condition that looks up the annotations instead
+    """
+    result = Q()
+    result.connector = condition.connector
+    result.negated = condition.negated
+    for child in condition.children:
+        if isinstance(child, Q):
+            child = annotate_condition(child, annotations, prefix)
+        elif hasattr(child, "resolve_expression"):
+            name = f"{prefix}_{len(annotations)}"
+            annotations[name] = child
+            child = (name, True)
+        result.children.append(child)
+    return result
+
+
+def filter_on_condition(queryset: QuerySet, condition: Q) -> QuerySet:
+    """
+    Filter a queryset on a condition that can contain boolean expressions.
+
+    Django 2.2 cannot filter on expressions such as Exists directly, so each
+    expression is annotated and the condition looks up the annotation.
+
+    :param queryset: the queryset
+    :param condition: the condition
+    :return: the filtered queryset
+    """
+    annotations: Dict[str, Any] = {}
+    prefix = f"{CONDITION_ANNOTATION}_{len(queryset.query.annotations)}"
+    condition = annotate_condition(condition, annotations, prefix)
+    return queryset.annotate(**annotations).filter(condition)
+
+
+def get_matches_condition(matches: QuerySet) -> Q:
+    """
+    Get the condition that finds the objects of a queryset of the same model.
+
+    The matches are looked up in a correlated EXISTS subquery, so objects
+    that join more than one related row are found once, without DISTINCT.
+
+    :param matches: the queryset of the matching objects
+    :return: the condition
+    """
+    return Q(Exists(matches.filter(pk=OuterRef("pk"))))
+
+
+def get_lookups_condition(model: Model, lookups: Dict[str, Any]) -> Q:
+    """
+    Get the condition of lookups that start with the same field.
+
+    Lookups that cross a reverse foreign key or many to many relation are
+    done in a correlated EXISTS subquery on the related table.
+
+    :param model: the model class
+    :param lookups: the lookups e.g. {"song__name__icontains": "mosh"}
+    :return: the condition
+    """
+    relation = get_multivalued_relation(model, next(iter(lookups)))
+    if relation is None:
+        return Q(**lookups)
+    path, field = relation
+    outer_path = path.rpartition(LOOKUP_SEP)[0]
+    if isinstance(field, ForeignObjectRel) and not field.many_to_many:
+        # the reverse side of a foreign key
+        remote_name = field.field.attname
+        outer_name = field.field.target_field.attname
+    elif field.many_to_many:
+        remote_name = field.remote_field.name
+        outer_name = "pk"
+    else:
+        # e.g. generic relations
+        return get_matches_condition(model._default_manager.filter(**lookups))
+    outer_name = LOOKUP_SEP.join(filter(None, [outer_path, outer_name]))
+    start = len(path) + len(LOOKUP_SEP)
+    related = field.related_model._base_manager.filter(
+        **{remote_name: OuterRef(outer_name)},
+        **{key[start:]: value for key, value in lookups.items()},
+    )
+    return Q(Exists(related))
+
+
+def get_search_condition(  # pylint: disable=bad-continuation
+    model: Model, search_fields: List[str], query: str
+) -> Optional[Q]:
+    """
+    Get the condition that finds a search query in some search fields.
+
+    Every term of the query has to be found in at least one of the fields.
+
+    :param model: the model class
+    :param search_fields: the search fields
+    :param query: the search query
+    :return: the condition or None if nothing can match
+    """
+    condition = Q()
+    for term in get_search_terms(query):
+        term_condition = Q()
+        for search_field in search_fields:
+            lookups = get_search_lookups(model, search_field, term)
+            if lookups is not None:
+                term_condition |= get_lookups_condition(model, lookups)
+        if not term_condition:
+            # no field can contain this term
+            return None
+        condition &= term_condition
+    return condition
+
+
+def get_text_search_fields(model: Model, search_fields: List[str]) -> List[str]:
+    """
+    Get the search fields of text that do not have a prefix.
+
+    :param model: the model class
+    :param search_fields: the search fields
+    :return: list of search fields
+    """
+    return [
+        search_field
+        for search_field in search_fields
+        if parse_search_field(search_field)[1] is None
+        and isinstance(get_lookup_field(model, search_field), (CharField, TextField))
+    ]
+
+
+def get_ordering(queryset: QuerySet) -> List[str]:
+    """Get the ordering of a queryset, to break ties between ranked results."""
+    if queryset.query.order_by:
+        return list(queryset.query.order_by)
+    if queryset.query.default_ordering:
+        return list(queryset.model._meta.ordering)
+    return []
+
+
+def search_spans_multivalued_relation(model: Model, search_fields: List[str]) -> bool:
+    """Check whether any search field could produce duplicate rows."""
+    return any(
+        lookup_spans_multivalued_relation(model, parse_search_field(_)[0])
+        for _ in search_fields
+    )
+
+
+class SearchMatch(Func):  # pylint: disable=abstract-method
+    """Matches a search vector against a search query."""
+
+    template = "(%(expressions)s)"
+    arg_joiner = " @@ "
+    output_field = BooleanField()
+
+
+class TrigramMatch(Func):  # pylint: disable=abstract-method
+    """Checks whether text is similar to a value, using the pg_trgm % operator."""
+
+    template = "(%(expressions)s)"
+    arg_joiner = " %% "
+    output_field = BooleanField()
+
+
+class ContainsSearchBackend:  # pylint: disable=no-self-use,unused-argument
+    """
+    Searches using lookups that suit the type of each search field.
+
+    See get_search_lookups for the lookups that are used.
+    """
+
+    def search(  # pylint: disable=bad-continuation
+        self,
+        queryset: QuerySet,
+        search_fields: List[str],
+        query: str,
+        order_by_rank: bool = True,
+    ) -> QuerySet:
+        """
+        Search a queryset.
+
+        :param queryset: the queryset
+        :param search_fields: the fields to search
+        :param query: the search query
+        :param order_by_rank: whether to order the results by relevance,
+            for backends that rank results
+        :return: the filtered queryset
+        """
+        condition = get_search_condition(queryset.model, search_fields, query)
+        if condition is None:
+            return queryset.none()
+        return filter_on_condition(queryset, condition)
+
+    def get_indexed_fields(  # pylint: disable=bad-continuation
+        self, model: Model, search_fields: List[str]
+    ) -> List[str]:
+        """
+        Get the search fields that the search indexes are made for.
+
+        :param model: the model class
+        :param search_fields: the search fields
+        :return: list of search fields
+        """
+        return []
+
+    def get_index_statements(  # pylint: disable=bad-continuation
+        self,
+        model: Model,
+        search_fields: List[str],
+        using: str = DEFAULT_DB_ALIAS,
+        concurrently: bool = True,
+    ) -> List[str]:
+        """
+        Get the SQL statements that create the search indexes.
+
+        :param model: the model class
+        :param search_fields: the search fields
+        :param using: the database alias
+        :param concurrently: whether to create the indexes without locking out
+            writes, which cannot be done inside a transaction
+        :return: list of SQL statements
+        """
+        return []
+
+
+class PostgresSearchBackend(ContainsSearchBackend):
+    """
+    Searches using PostgreSQL full text search.
+
+    Results are ordered by their SearchRank.  Other databases fall back to
+    ContainsSearchBackend.  Run the create_search_indexes management command
+    to create GIN indexes that match the search vectors.
+    """
+
+    config: Optional[str] = None  # defaults to VEGA_SEARCH_CONFIG
+
+    def get_config(self) -> str:
+        """Get the text search configuration."""
+        return self.config or settings.VEGA_SEARCH_CONFIG
+
+    def is_supported(self, queryset: QuerySet) -> bool:  # pylint: disable=no-self-use
+        """Check whether the database of a queryset supports full text search."""
+        return connections[queryset.db].vendor == "postgresql"
+
+    def get_search_vector(self, search_fields: List[str]) -> SearchVector:
+        """Get the search vector for the search fields."""
+        return SearchVector(*search_fields, config=self.get_config())
+
+    def get_vector_fields(  # pylint: disable=no-self-use,bad-continuation
+        self, model: Model, search_fields: List[str]
+    ) -> List[str]:
+        """
+        Get the search fields that are part of the search vector.
+
+        These are the text fields without a prefix, the other search fields
+        are searched like ContainsSearchBackend does.
+
+        :param model: the model class
+        :param search_fields: the search fields
+        :return: list of search fields
+        """
+        return get_text_search_fields(model, search_fields)
+
+    def get_indexed_fields(  # pylint: disable=bad-continuation
+        self, model: Model, search_fields: List[str]
+    ) -> List[str]:
+        """Get the search fields that the search indexes are made for."""
+        return self.get_vector_fields(model, search_fields)
+
+    def get_index_statements(  # pylint: disable=bad-continuation
+        self,
+        model: Model,
+        search_fields: List[str],
+        using: str = DEFAULT_DB_ALIAS,
+        concurrently: bool = True,
+    ) -> List[str]:
+        """Get the SQL statements that create the search indexes."""
+        sql = self.get_index_sql(model, search_fields, using, concurrently)
+        return [sql] if sql else []
+
+    def get_index_sql(  # pylint: disable=bad-continuation
+        self,
+        model: Model,
+        search_fields: List[str],
+        using: str = DEFAULT_DB_ALIAS,
+        concurrently: bool = True,
+    ) -> Optional[str]:
+        """
+        Get the SQL that creates a GIN index that matches the search vector.
+
+        The index expression is compiled from the same search vector that is
+        used when searching so that PostgreSQL can use the index.
+
+        :param model: the model class
+        :param search_fields: the search fields
+        :param using: the database alias
+        :param concurrently: whether to create the index without locking out
+            writes, which cannot be done inside a transaction
+        :return: the SQL or None if some field of the search vector is not a
+            column of the model's table
+        """
+        search_fields = self.get_vector_fields(model, search_fields)
+        if not search_fields or any(LOOKUP_SEP in _ for _ in search_fields):
+            return None
+
+        connection = connections[using]
+        query = model._default_manager.using(using).all().query
+        compiler = query.get_compiler(using=using)
+        vector = self.get_search_vector(search_fields).resolve_expression(query)
+        sql, params = compiler.compile(vector)
+        quote_value = connection.schema_editor().quote_value
+        expression = sql % tuple(quote_value(_) for _ in params)
+
+        table = model._meta.db_table
+        digest = names_digest(table, *search_fields, self.get_config(), length=8)
+        name = truncate_name(
+            f"{table}_vega_search_{digest}", connection.ops.max_name_length()
+        )
+        quote_name = connection.ops.quote_name
+        return (
+            f"CREATE INDEX {'CONCURRENTLY ' if concurrently else ''}IF NOT EXISTS "
+            f"{quote_name(name)} ON {quote_name(table)} USING gin (({expression}))"
+        )
+
+    def search(  # pylint: disable=bad-continuation
+        self,
+        queryset: QuerySet,
+        search_fields: List[str],
+        query: str,
+        order_by_rank: bool = True,
+    ) -> QuerySet:
+        """
+        Search a queryset.
+
+        :param queryset: the queryset
+        :param search_fields: the fields to search
+        :param query: the search query
+        :param order_by_rank: whether to order the results by relevance
+        :return: the filtered queryset
+        """
+        model = queryset.model
+        vector_fields = self.get_vector_fields(model, search_fields)
+        if not self.is_supported(queryset) or not vector_fields:
+            return super().search(queryset, search_fields, query, order_by_rank)
+
+        vector = self.get_search_vector(vector_fields)
+        search_query = SearchQuery(query, config=self.get_config())
+        condition = Q(SearchMatch(vector, search_query))
+        other_fields = [_ for _ in search_fields if _ not in vector_fields]
+        other_condition = get_search_condition(model, other_fields, query)
+        if other_fields and other_condition is not None:
+            condition |= other_condition
+
+        if search_spans_multivalued_relation(model, vector_fields):
+            # the joined rows cannot be ranked without producing duplicates
+            matches = filter_on_condition(model._default_manager.all(), condition)
+            return filter_on_condition(queryset, get_matches_condition(matches))
+
+        queryset = filter_on_condition(queryset, condition)
+        if order_by_rank:
+            ordering = get_ordering(queryset)
+            queryset = queryset.annotate(
+                **{SEARCH_RANK_ANNOTATION: SearchRank(vector, search_query)}
+            ).order_by(f"-{SEARCH_RANK_ANNOTATION}", *ordering)
+        return queryset
+
+
+class TrigramSearchBackend(ContainsSearchBackend):
+    """
+    Searches using PostgreSQL trigram similarity, which tolerates typos.
+
+    Rows that contain the query, or whose text fields are similar enough to
+    it, are ordered by their TrigramSimilarity.  Other databases fall back to
+    ContainsSearchBackend.  This needs the pg_trgm extension, which the
+    create_search_indexes management command creates along with GIN trigram
+    indexes.  The indexes also speed up icontains and istartswith lookups.
+
+    The similarity is first checked with the % operator, which uses the
+    pg_trgm.similarity_threshold setting of the database session (0.3 by
+    default) so that the indexes can be used.  The threshold can therefore
+    only be stricter than that setting.  To find less similar rows, lower
+    the setting too, e.g. with "-c pg_trgm.similarity_threshold=0.2" in the
+    options of the database connection.
+    """
+
+    # defaults to VEGA_TRIGRAM_THRESHOLD, lower values are capped by the
+    # pg_trgm.similarity_threshold setting
+    threshold: Optional[float] = None
+
+    def get_threshold(self) -> float:
+        """Get the similarity that rows need to be found by similarity alone."""
+        if self.threshold is None:
+            return settings.VEGA_TRIGRAM_THRESHOLD
+        return self.threshold
+
+    def is_supported(self, queryset: QuerySet) -> bool:  # pylint: disable=no-self-use
+        """Check whether the database of a queryset supports trigrams."""
+        return connections[queryset.db].vendor == "postgresql"
+
+    def get_text(self, search_field: str):  # pylint: disable=no-self-use
+        """
+        Get the text of a search field the way icontains lookups compare it.
+
+        Trigrams ignore case, so comparing UPPER(field::text) lets a single
+        trigram index serve both the similarity and the icontains lookups.
+        """
+        return Upper(Cast(search_field, TextField()))
+
+    def get_similarity(self, search_fields: List[str], query: str):
+        """Get the expression of the best similarity of the search fields."""
+        similarities = [
+            TrigramSimilarity(self.get_text(_), query) for _ in search_fields
+        ]
+        if len(similarities) == 1:
+            return similarities[0]
+        return Greatest(*similarities)
+
+    def get_indexed_fields(  # pylint: disable=bad-continuation
+        self, model: Model, search_fields: List[str]
+    ) -> List[str]:
+        """Get the search fields that the search indexes are made for."""
+        # trigram indexes also serve the istartswith lookups of "^" fields
+        return get_text_search_fields(
+            model, [_[1:] if _.startswith("^") else _ for _ in search_fields]
+        )
+
+    def get_index_statements(  # pylint: disable=bad-continuation
+        self,
+        model: Model,
+        search_fields: List[str],
+        using: str = DEFAULT_DB_ALIAS,
+        concurrently: bool = True,
+    ) -> List[str]:
+        """
+        Get the SQL statements that create the trigram indexes.
+
+        Fields of related models are indexed in the table of the related model.
+
+        :param model: the model class
+        :param search_fields: the search fields
+        :param using: the database alias
+        :param concurrently: whether to create the indexes without locking out
+            writes, which cannot be done inside a transaction
+        :return: list of SQL statements
+        """
+        connection = connections[using]
+        quote_name = connection.ops.quote_name
+        statements = ["CREATE EXTENSION IF NOT EXISTS pg_trgm"]
+        for search_field in self.get_indexed_fields(model, search_fields):
+            field = get_lookup_field(model, search_field)
+            table = field.model._meta.db_table
+            digest = names_digest(table, field.column, length=8)
+            name = truncate_name(
+                f"{table}_{field.column}_vega_trgm_{digest}",
+                connection.ops.max_name_length(),
+            )
+            statements.append(
+                f"CREATE INDEX {'CONCURRENTLY ' if concurrently else ''}"
+                f"IF NOT EXISTS {quote_name(name)} ON {quote_name(table)} "
+                f"USING gin ((UPPER({quote_name(field.column)}::text)) gin_trgm_ops)"
+            )
+        return statements if len(statements) > 1 else []
+
+    def search(  # pylint: disable=bad-continuation
+        self,
+        queryset: QuerySet,
+        search_fields: List[str],
+        query: str,
+        order_by_rank: bool = True,
+    ) -> QuerySet:
+        """
+        Search a queryset.
+
+        :param queryset: the queryset
+        :param search_fields: the fields to search
+        :param query: the search query
+        :param order_by_rank: whether to order the results by similarity
+        :return: the filtered queryset
+        """
+        model = queryset.model
+        text_fields = get_text_search_fields(model, search_fields)
+        if not self.is_supported(queryset) or not text_fields:
+            return super().search(queryset, search_fields, query, order_by_rank)
+
+        # the % operator finds similar rows using the trigram indexes, and
+        # then the rows that are not similar enough are left out
+        similar = Q()
+        for search_field in text_fields:
+            similar |= Q(TrigramMatch(self.get_text(search_field), Value(query)))
+        similar &= Q(**{f"{SIMILARITY_ANNOTATION}__gte": self.get_threshold()})
+        condition = get_search_condition(model, search_fields, query)
+        condition = similar if condition is None else condition | similar
+
+        similarity = self.get_similarity(text_fields, query)
+        if search_spans_multivalued_relation(model, text_fields):
+            # the joined rows cannot be ordered without producing duplicates
+            matches = model._default_manager.annotate(
+                **{SIMILARITY_ANNOTATION: similarity}
+            )
+            matches = filter_on_condition(matches, condition)
+            return filter_on_condition(queryset, get_matches_condition(matches))
+
+        queryset = queryset.annotate(**{SIMILARITY_ANNOTATION: similarity})
+        queryset = filter_on_condition(queryset, condition)
+        if order_by_rank:
+            ordering = get_ordering(queryset)
+            queryset = queryset.order_by(f"-{SIMILARITY_ANNOTATION}", *ordering)
+        return queryset
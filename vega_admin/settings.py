@@ -1,6 +1,8 @@
 """
 vega-admin settings module
 """
+from typing import Dict, List
+
 from django.conf import settings
 
 # general
@@ -16,13 +18,102 @@ VEGA_DEFAULT_ACTIONS = [
     VEGA_LIST_ACTION,
     VEGA_DELETE_ACTION,
 ]
+# built in actions that CRUD views only have when asked for
+VEGA_EXPORT_ACTION = "export"
+VEGA_AUTOCOMPLETE_ACTION = "autocomplete"
+VEGA_BULK_DELETE_ACTION = "bulk_delete"
+VEGA_BULK_UPDATE_ACTION = "bulk_update"
+VEGA_OPTIONAL_ACTIONS = [
+    VEGA_EXPORT_ACTION,
+    VEGA_AUTOCOMPLETE_ACTION,
+    VEGA_BULK_DELETE_ACTION,
+    VEGA_BULK_UPDATE_ACTION,
+]
 VEGA_TEMPLATE = "basic"
+# build the views of CRUD views when they are first requested
+VEGA_LAZY_VIEWS = False
+# group the url patterns of CRUD views under one include() per crud_path
+VEGA_INCLUDE_URL_PATTERNS = False
 # ensures that listview queries are ordered
 VEGA_FORCE_ORDERING = True
 VEGA_ORDERING_FIELD = ["-pk"]
 
+# pagination
+VEGA_OFFSET_PAGINATION = "offset"
+VEGA_KEYSET_PAGINATION = "keyset"
+VEGA_PAGINATION_MODE = VEGA_OFFSET_PAGINATION
+VEGA_KEYSET_CURSOR_PARAM = "cursor"
+VEGA_EXACT_COUNT = "exact"
+VEGA_CAPPED_COUNT = "capped"
+VEGA_ESTIMATED_COUNT = "estimated"
+VEGA_COUNT_STRATEGY = VEGA_EXACT_COUNT
+# the capped count strategy stops counting after this many rows
+VEGA_COUNT_CAP = 10000
+# the estimated count strategy counts exactly when estimates are this small
+VEGA_COUNT_ESTIMATE_THRESHOLD = 1000
+
+# search
+# the dotted path of the search backend of list views
+VEGA_SEARCH_BACKEND = "vega_admin.search.ContainsSearchBackend"
+# the text search configuration of PostgresSearchBackend
+VEGA_SEARCH_CONFIG = "english"
+# the similarity that TrigramSearchBackend needs to find rows by similarity alone.
+# It cannot be lower than the pg_trgm.similarity_threshold of the database.
+VEGA_TRIGRAM_THRESHOLD = 0.3
+# vega_admin.contrib.search keeps the tokens of these text fields of these
+# models, e.g. {"artist_app.Song": ["name"]}
+VEGA_SEARCH_INDEX: Dict[str, List[str]] = {}
+# vega_admin.contrib.search writes this many tokens per INSERT
+VEGA_SEARCH_INDEX_BATCH_SIZE = 1000
+# rebuild_search_index reads this many objects at a time
+VEGA_SEARCH_INDEX_CHUNK_SIZE = 1000
+# the autocomplete action suggests at most this many objects
+VEGA_AUTOCOMPLETE_LIMIT = 10
+# the autocomplete action only searches for queries of at least this length
+VEGA_AUTOCOMPLETE_MIN_LENGTH = 2
+
+# exports
+# these export formats are streamed instead of being built in memory
+VEGA_STREAMING_EXPORT_FORMATS = ["csv", "json"]
+# the number of rows fetched at a time when streaming exports
+VEGA_EXPORT_CHUNK_SIZE = 2000
+# background export jobs run in a thread pool of this size, 0 runs them inline
+VEGA_EXPORT_JOB_WORKERS = 2
+# export jobs are saved in this directory of the default storage
+VEGA_EXPORT_JOB_DIR = "vega_admin/exports"
+# unfinished export jobs are saved this often, in seconds, to show they are alive
+VEGA_EXPORT_JOB_HEARTBEAT = 30
+# unfinished export jobs that have not been saved for this long, in seconds,
+# are reported as failed e.g. because their process stopped
+VEGA_EXPORT_JOB_STALE_AFTER = 300
+VEGA_EXPORT_JOB_PARAM = "job"
+VEGA_EXPORT_DOWNLOAD_PARAM = "download"
+
+# bulk actions
+# the number of objects changed per transaction
+VEGA_BULK_BATCH_SIZE = 500
+# the name of the checkbox column of list tables and of its inputs
+VEGA_BULK_SELECTION_PARAM = "selection"
+# acts on all the objects that match the filters and search instead
+VEGA_BULK_ALL_PARAM = "all"
+VEGA_BULK_CONFIRM_PARAM = "confirm"
+# send pre_save and post_save for every object that a bulk update changes
+VEGA_BULK_UPDATE_SIGNALS = False
+
+# permissions
+# the cache that the permissions of users are kept in, None keeps them per request
+# it has to be shared by every process e.g. not a local-memory cache, otherwise
+# the other processes keep using permissions that were taken away
+VEGA_PERMISSION_CACHE = None
+VEGA_PERMISSION_CACHE_TIMEOUT = 300
+
 # model forms
 VEGA_MODELFORM_KWARG = "vega_extra_kwargs"
+# choice fields of related tables with more rows than this search for their
+# choices using the autocomplete action, None turns this off
+VEGA_REMOTE_CHOICES_THRESHOLD = 1000
+# the number of rows of related tables is checked this often, in seconds
+VEGA_REMOTE_CHOICES_CACHE_TIMEOUT = 300
 
 # crispy forms
 VEGA_CRISPY_TEMPLATE_PACK = getattr(settings, "CRISPY_TEMPLATE_PACK", "bootstrap3")
@@ -35,6 +126,14 @@ VEGA_FORM_INVALID_TXT = "Please correct the errors on the form."
 VEGA_DELETE_PROTECTED_ERROR_TXT = (
     "You cannot delete this item, it is referenced by other items."
 )
+VEGA_EXPORT_JOB_STALE_TXT = "The export stopped before it was done."
+VEGA_BULK_DELETE_TXT = "%(count)s deleted successfully!"
+VEGA_BULK_DELETE_PARTIAL_TXT = (
+    "%(count)s deleted, the others cannot be deleted, they are referenced by "
+    "other items."
+)
+VEGA_BULK_UPDATE_TXT = "%(count)s updated successfully!"
+VEGA_BULK_NOTHING_SELECTED_TXT = "Please select the items first."
 VEGA_PERMREQUIRED_NOT_SET_TXT = "PermissionRequiredMixin not set for"
 VEGA_LISTVIEW_SEARCH_TXT = "Search"
 VEGA_LISTVIEW_SEARCH_QUERY_TXT = "Search Query"
@@ -50,6 +149,7 @@ VEGA_ACTION_COLUMN_NAME = ""
 VEGA_ACTION_COLUMN_ACCESSOR_FIELD = "pk"
 VEGA_ACTION_LINK_SEPARATOR = " | "
 VEGA_CHANGE_PASSWORD_LABEL = "change password"
+VEGA_ESTIMATED_COUNT_TXT = "about"
 
 # exceptions
 VEGA_INVALID_ACTION = "Invalid Action"
@@ -0,0 +1,6 @@
+"""vega-admin module for signals."""
+from django.dispatch import Signal
+
+# sent after QuerySet.update() changed a batch of objects without sending
+# post_save for them, with the arguments pks, update_fields and using
+bulk_updated = Signal()  # pylint: disable=invalid-name
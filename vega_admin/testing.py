@@ -0,0 +1,43 @@
+"""vega-admin testing helpers."""
+from contextlib import ExitStack, contextmanager
+
+from django.db import connections
+
+
+class DatabaseAccessError(AssertionError):
+    """Raised when the database is used where it should not be."""
+
+
+@contextmanager
+def no_database_access():
+    """
+    Fail any database query that is made inside this context manager.
+
+    Usage:
+
+        with no_database_access():
+            urlpatterns = MyCRUD().url_patterns()
+    """
+
+    def blocker(execute, sql, params, many, context):  # pylint: disable=W0613
+        raise DatabaseAccessError(f"Unexpected database query: {sql}")
+
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(blocker))
+        yield
+
+
+def get_url_patterns_without_queries(crud_view, actions: list = None):
+    """
+    Get the URL patterns of a CRUD view, failing if that queries the database.
+
+    URL patterns are loaded when a process starts so they should never need
+    the database.  Use this in your tests to make sure that stays true.
+
+    :param crud_view: the VegaCRUDView instance
+    :param actions: the actions, defaults to all the actions of the CRUD view
+    :return: the url patterns
+    """
+    with no_database_access():
+        return crud_view.url_patterns(actions=actions)
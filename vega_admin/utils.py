@@ -1,21 +1,33 @@
 """vega-admin forms module."""
-from typing import Any, Dict, List, Optional, Tuple, Union
+import inspect
+from functools import lru_cache, wraps
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
 
 from django import forms
 from django.conf import settings
-from django.core.exceptions import ObjectDoesNotExist
-from django.db.models import DateField, DateTimeField, Model, TimeField
-from django.urls import reverse
+from django.core.signals import setting_changed
+from django.db.models import Model
+from django.dispatch import receiver
+from django.urls import get_script_prefix, get_urlconf, reverse
 from django.urls.exceptions import NoReverseMatch
 from django.utils.html import format_html
 from django.utils.module_loading import import_string
 from django.utils.translation import ugettext as _
 
 import django_tables2 as tables
-from django_filters import FilterSet
 
+from vega_admin.choices import use_remote_choices
 from vega_admin.crispy_utils import get_default_formhelper, get_layout
+from vega_admin.filters import VegaFilterSet
+from vega_admin.introspection import get_temporal_field_names
 from vega_admin.mixins import VegaFormMixin
+from vega_admin.permissions import get_allowed_actions
+
+# an unlikely pk used to find where the pk goes in action urls
+ACTION_URL_PK_PLACEHOLDER = 918273645
+
+# classes generated by the get_* functions, keyed by their arguments
+GENERATED_CLASSES: Dict[Tuple, Any] = {}
 
 
 def get_datefields(model: Model) -> List[str]:
@@ -25,11 +37,7 @@ def get_datefields(model: Model) -> List[str]:
     :param model: the model class
     :return: list of datefield names
     """
-    return [
-        _.name
-        for _ in model._meta.concrete_fields
-        if isinstance(_, DateField) and not isinstance(_, DateTimeField)
-    ]
+    return list(get_temporal_field_names(model)["date"])
 
 
 def get_datetimefields(model: Model) -> List[str]:
@@ -39,7 +47,7 @@ def get_datetimefields(model: Model) -> List[str]:
     :param model: the model class
     :return: list of datetimefield names
     """
-    return [_.name for _ in model._meta.concrete_fields if isinstance(_, DateTimeField)]
+    return list(get_temporal_field_names(model)["datetime"])
 
 
 def get_timefields(model: Model) -> List[str]:
@@ -49,9 +57,76 @@ def get_timefields(model: Model) -> List[str]:
     :param model: the model class
     :return: list of timefield names
     """
-    return [_.name for _ in model._meta.concrete_fields if isinstance(_, TimeField)]
+    return list(get_temporal_field_names(model)["time"])
+
+
+@lru_cache(maxsize=None)
+def import_widget(path: str):
+    """
+    Import a widget class, once.
+
+    :param path: the dotted path to the widget class
+    :return: the widget class
+    """
+    return import_string(path)
+
+
+def _freeze(value):
+    """Turn the arguments of a class factory into something hashable."""
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(_) for _ in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(val)) for key, val in value.items()))
+    if value is None or isinstance(value, (str, int, type)):
+        return value
+    if inspect.isfunction(value):
+        # e.g. the per-object predicates of table actions
+        return value
+    raise TypeError(f"{value!r} cannot be part of a cache key")
+
+
+def memoize_generated_class(factory):
+    """
+    Reuse the classes generated by a factory for identical arguments.
+
+    Arguments that are not made up of strings, numbers, classes, functions,
+    lists, tuples and dicts (e.g. form field instances) skip the cache.
+
+    :param factory: the class factory function
+    :return: the memoized class factory function
+    """
+    signature = inspect.signature(factory)
+
+    @wraps(factory)
+    def wrapper(*args, **kwargs):
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        try:
+            key = (factory.__qualname__, _freeze(dict(bound.arguments)))
+        except TypeError:
+            return factory(*args, **kwargs)
+        try:
+            return GENERATED_CLASSES[key]
+        except KeyError:
+            result = GENERATED_CLASSES[key] = factory(*args, **kwargs)
+            return result
+
+    return wrapper
+
+
+def clear_generated_classes():
+    """Clear the cache of generated classes."""
+    GENERATED_CLASSES.clear()
+
 
+@receiver(setting_changed)
+def clear_generated_classes_handler(setting, **kwargs):  # pylint: disable=W0613
+    """Clear the cache of generated classes when vega-admin settings change."""
+    if setting.startswith("VEGA_"):
+        clear_generated_classes()
 
+
+@memoize_generated_class
 def get_modelform(model: Model, fields: list = None, extra_fields: list = None):
     """
     Get the ModelForm for the provided model.
@@ -72,6 +147,7 @@ def get_modelform(model: Model, fields: list = None, extra_fields: list = None):
         self.request = kwargs.pop("request", None)
         self.vega_extra_kwargs = kwargs.pop(settings.VEGA_MODELFORM_KWARG, dict())
         super(modelform_class, self).__init__(*args, **kwargs)
+        use_remote_choices(self)
         # add crispy forms FormHelper
         self.helper = get_default_formhelper()
         self.helper.form_id = f"{self.model._meta.model_name}-form"
@@ -87,15 +163,15 @@ def get_modelform(model: Model, fields: list = None, extra_fields: list = None):
     widgets = {}
     # set the widgets for all date input fields
     for datefield in get_datefields(model):
-        widgets[datefield] = import_string(settings.VEGA_DATE_WIDGET)
+        widgets[datefield] = import_widget(settings.VEGA_DATE_WIDGET)
 
     # set the widgets for all datetime input fields
     for datetimefield in get_datetimefields(model):
-        widgets[datetimefield] = import_string(settings.VEGA_DATETIME_WIDGET)
+        widgets[datetimefield] = import_widget(settings.VEGA_DATETIME_WIDGET)
 
     # set the widgets for all time input fields
     for timefield in get_timefields(model):
-        widgets[timefield] = import_string(settings.VEGA_TIME_WIDGET)
+        widgets[timefield] = import_widget(settings.VEGA_TIME_WIDGET)
 
     meta_class_options = {"model": model, "fields": fields}
 
@@ -123,6 +199,7 @@ def get_modelform(model: Model, fields: list = None, extra_fields: list = None):
     return modelform_class
 
 
+@memoize_generated_class
 def get_listview_form(model: Model, fields: List[str], include_search: bool = True):
     """
     Get a search and filter form for use in ListViews.
@@ -149,11 +226,117 @@ def get_listview_form(model: Model, fields: List[str], include_search: bool = Tr
     return get_modelform(model=model, fields=fields, extra_fields=extra_fields)
 
 
-def get_table(  # pylint: disable=bad-continuation
+def compile_action_url(url_name: str) -> Tuple[bool, Optional[List[str]]]:
+    """
+    Reverse an action URL once, leaving a placeholder for the object pk.
+
+    :param url_name: the action url name
+    :return: tuple of whether the url needs a pk and the url template
+
+    The url template is a list of the parts of the url that go before and after
+    the pk. It is None when the url cannot be reversed with an integer pk, in
+    which case the url needs to be reversed for each object.
+    """
+    try:
+        return False, [reverse(url_name)]
+    except NoReverseMatch:
+        pass
+
+    try:
+        url = reverse(url_name, args=[ACTION_URL_PK_PLACEHOLDER])
+    except NoReverseMatch:
+        return True, None
+
+    parts = url.split(str(ACTION_URL_PK_PLACEHOLDER))
+    if len(parts) != 2:
+        return True, None
+    return True, parts
+
+
+def get_action_urls(table_class, pk) -> List[Tuple[str, str]]:
+    """
+    Get the action names and urls of a table class for an object.
+
+    The url templates are compiled the first time that they are needed for the
+    current urlconf and script prefix, and then reused for every row.
+
+    :param table_class: the table class
+    :param pk: the primary key of the object
+    :return: list of tuples of action names and urls
+    """
+    # subclasses may have their own actions_list so each class has its own cache
+    cache = vars(table_class).get("actions_url_templates")
+    if cache is None:
+        cache = table_class.actions_url_templates = {}
+
+    key = (get_urlconf(), get_script_prefix())
+    url_templates = cache.get(key)
+    if url_templates is None:
+        url_templates = [
+            (name, url_name) + compile_action_url(url_name)
+            for name, url_name in table_class.actions_list
+        ]
+        cache[key] = url_templates
+
+    result = []
+    for name, url_name, needs_pk, template in url_templates:
+        if not needs_pk:
+            url = template[0]
+        elif template is not None and isinstance(pk, int):
+            url = f"{template[0]}{pk}{template[1]}"
+        else:
+            url = reverse(url_name, args=[pk])
+        result.append((name, url))
+    return result
+
+
+def get_table_allowed_actions(table) -> Dict[str, Optional[Set[Any]]]:
+    """
+    Get the actions that the user may perform on the current page of a table.
+
+    The permissions are checked and the per-object predicates are run once
+    per table instance, so rendering each row does not query the database.
+
+    :param table: the table instance
+    :return: dict of allowed actions and the primary keys of the objects that
+        they are allowed for, or None if they are allowed for every object
+    """
+    allowed_actions = getattr(table, "_vega_allowed_actions", None)
+    if allowed_actions is not None:
+        return allowed_actions
+
+    request = getattr(table, "request", None)
+    actions = [name for name, _ in table.actions_list]
+    if request is not None and table.actions_access:
+        # actions that are not protected are always allowed
+        access = {_: table.actions_access.get(_, (False, None)) for _ in actions}
+        actions = get_allowed_actions(request, access)
+
+    allowed_actions = {}
+    predicates = {_: table.actions_predicates.get(_) for _ in actions}
+    records = None
+    for action, predicate in predicates.items():
+        if predicate is None:
+            allowed_actions[action] = None
+            continue
+        if records is None:
+            rows = table.page.object_list if hasattr(table, "page") else table.rows
+            records = [_.record for _ in rows]
+        allowed_actions[action] = set(predicate(request, records))
+
+    table._vega_allowed_actions = allowed_actions  # pylint: disable=W0212
+    return allowed_actions
+
+
+@memoize_generated_class
+def get_table(  # pylint: disable=bad-continuation,too-many-arguments
     model: Model,
     fields: Optional[List[str]] = None,
     actions: Optional[List[str]] = None,
     attrs: Optional[dict] = None,
+    actions_access: Optional[Dict[str, Tuple[bool, Optional[str]]]] = None,
+    actions_predicates: Optional[Dict[str, Callable]] = None,
+    selection: Optional[List[str]] = None,
 ):
     """
     Get the Table Class for the provided model.
@@ -162,6 +345,14 @@ def get_table(  # pylint: disable=bad-continuation
     :param fields: list of the fields that you want included in the table
     :param actions: list of tuples representing actions and action url names
     :param options: dict representing kwargs/options to pass to the table
+    :param actions_access: dict of actions and tuples of whether login is
+        required and the permission required, used to hide actions that the
+        user cannot perform
+    :param actions_predicates: dict of actions and functions that take the
+        request and the objects of the current page, and return the primary
+        keys of the objects that the action is allowed for
+    :param selection: the bulk actions to add a checkbox column for, the
+        column is hidden when the user can perform none of them
     :return: table
     """
     # the Meta class
@@ -171,12 +362,16 @@ def get_table(  # pylint: disable=bad-continuation
         all_fields = [_.name for _ in model._meta.concrete_fields]
         exclude_fields = [_ for _ in all_fields if _ not in fields]
         # get sequence
-        sequence_list = fields
+        sequence_list = list(fields)
         if "..." not in sequence_list:
             sequence_list.append("...")
+        if selection:
+            sequence_list.insert(0, settings.VEGA_BULK_SELECTION_PARAM)
         # set meta options
         meta_options["exclude"] = exclude_fields
         meta_options["sequence"] = tuple(sequence_list)
+    elif selection:
+        meta_options["sequence"] = (settings.VEGA_BULK_SELECTION_PARAM, "...")
 
     if attrs:
         meta_options["attrs"] = attrs
@@ -184,32 +379,60 @@ def get_table(  # pylint: disable=bad-continuation
     meta_class = type("Meta", (), meta_options)
 
     # the attributes of our new table class
-    options: Dict[Any, Any] = {"Meta": meta_class}
+    options: Dict[Any, Any] = {
+        "Meta": meta_class,
+        "actions_access": actions_access or {},
+    }
 
     if isinstance(actions, list):
         # pylint: disable=unused-argument
         def render_actions_fn(self, *args, **kwargs):
             """Render the actions column."""
             record = kwargs["record"]
+            allowed_actions = get_table_allowed_actions(self)
             actions_links = []
-            for item in self.actions_list:
-                try:
-                    url = reverse(item[1])
-                except NoReverseMatch:
-                    url = reverse(item[1], args=[record.pk])
-                name = item[0]
+            for name, url in get_action_urls(type(self), record.pk):
+                if name not in allowed_actions:
+                    continue
+                pks = allowed_actions[name]
+                if pks is not None and record.pk not in pks:
+                    continue
                 actions_links.append(f"<a href='{url}' class='vega-action'>{name}</a>")
             actions_links_html = settings.VEGA_ACTION_LINK_SEPARATOR.join(actions_links)
             return format_html(actions_links_html)
 
         options["actions_list"] = actions
+        options["actions_url_templates"] = {}
+        options["actions_predicates"] = actions_predicates or {}
         options["action"] = tables.Column(
             verbose_name=_(settings.VEGA_ACTION_COLUMN_NAME),
             accessor=settings.VEGA_ACTION_COLUMN_ACCESSOR_FIELD,
             orderable=False,
+            exclude_from_export=True,
         )
         options["render_action"] = render_actions_fn
 
+    if selection:
+
+        def before_render_fn(self, request):
+            """Hide the checkbox column if the user cannot use the bulk actions."""
+            if request is None or not self.actions_access:
+                return
+            access = {_: self.actions_access.get(_, (False, None)) for _ in selection}
+            if not get_allowed_actions(request, access):
+                self.columns.hide(settings.VEGA_BULK_SELECTION_PARAM)
+
+        options["before_render"] = before_render_fn
+        # the checkboxes belong to the form of the bulk actions
+        options[settings.VEGA_BULK_SELECTION_PARAM] = tables.CheckBoxColumn(
+            accessor="pk",
+            attrs={
+                "th__input": {"class": "vega-select-all"},
+                "td__input": {"form": "vega-bulk-form", "class": "vega-select"},
+            },
+            exclude_from_export=True,
+        )
+
     # create the table dynamically using type
     table_class = type(
         f"{model.__name__.title()}{settings.VEGA_TABLE_LABEL}", (tables.Table,), options
@@ -218,6 +441,7 @@ def get_table(  # pylint: disable=bad-continuation
     return table_class
 
 
+@memoize_generated_class
 def get_filterclass(model: Model, fields: list = None):
     """
     Get the Filter Class for the provided model.
@@ -235,12 +459,40 @@ def get_filterclass(model: Model, fields: list = None):
 
     # create the filter_class dynamically using type
     filter_class = type(
-        f"{model.__name__.title()}{settings.VEGA_FILTER_LABEL}", (FilterSet,), options
+        f"{model.__name__.title()}{settings.VEGA_FILTER_LABEL}",
+        (VegaFilterSet,),
+        options,
     )
 
     return filter_class
 
 
+def form_accepts_kwarg(form_class: Union[forms.Form, forms.ModelForm], name: str):
+    """
+    Check whether a form class handles a custom keyword argument.
+
+    This inspects the signature of the first __init__ in the MRO of the form
+    class instead of instantiating the form, which might query the database.
+    An __init__ that takes **kwargs is assumed to handle the keyword argument.
+
+    :param form_class: the form class
+    :param name: the keyword argument name
+    :return: True or False
+    """
+    for klass in form_class.__mro__:
+        init = klass.__dict__.get("__init__")
+        if init is None:
+            continue
+        init = inspect.unwrap(init)
+        module = getattr(init, "__module__", None) or ""
+        if klass is object or module.startswith("django."):
+            # django's forms do not know about our keyword arguments
+            return False
+        parameters = inspect.signature(init).parameters.values()
+        return any(_.name == name or _.kind == _.VAR_KEYWORD for _ in parameters)
+    return False
+
+
 def customize_modelform(form_class: Union[forms.Form, forms.ModelForm]):
     """
     Add custom keyword arguments to a provided form class.
@@ -255,16 +507,7 @@ def customize_modelform(form_class: Union[forms.Form, forms.ModelForm]):
         {Union[Form, ModelForm]} -- the customized form class
 
     """
-    # the try here would fail with a TypeError if settings.VEGA_MODELFORM_KWARG
-    # is not a valid kwarg
-    try:
-        form_class(**{settings.VEGA_MODELFORM_KWARG: dict()})
-    except ObjectDoesNotExist:
-        # we don't care about these exceptions right now because forms that have
-        # an instance are likely to end up here as we are not supplying that
-        # instance in the try statements
-        pass
-    except TypeError:
+    if not form_accepts_kwarg(form_class, settings.VEGA_MODELFORM_KWARG):
         # pylint: disable=missing-class-docstring,too-few-public-methods,inherit-non-class
         class VegaCustomFormClass(form_class):  # type: ignore
             def __init__(self, *args, **kwargs):
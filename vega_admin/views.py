@@ -1,15 +1,17 @@
 """Views module."""
-from typing import Any, Dict, List, Tuple, Union, cast
+import threading
+from functools import update_wrapper
+from typing import Any, Callable, Dict, List, Tuple, Union, cast
 
 from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured
 from django.forms import Form, ModelForm
-from django.urls import path, reverse_lazy
+from django.urls import include, path, reverse_lazy
 from django.utils.translation import ugettext as _
-from django.views.generic.base import View
+from django.views.generic.base import TemplateResponseMixin, View
 from django.views.generic.detail import DetailView
 from django.views.generic.edit import CreateView, DeleteView, UpdateView
-from django.views.generic.list import ListView
+from django.views.generic.list import ListView, MultipleObjectMixin
 
 from braces.views import FormMessagesMixin, LoginRequiredMixin, PermissionRequiredMixin
 from django_filters import FilterSet
@@ -17,19 +19,33 @@ from django_tables2 import SingleTableView, Table
 from django_tables2.export.views import ExportMixin
 
 from vega_admin.forms import ListViewSearchForm
+from vega_admin.introspection import (
+    get_only_fields,
+    get_table_relation_loading_plan,
+    get_unique_field_names,
+)
 from vega_admin.mixins import (
+    ActionPermissionsMixin,
+    AutocompleteMixin,
     CRUDURLsMixin,
     DeleteViewMixin,
     DetailViewMixin,
+    ListOnlyFieldsMixin,
+    ListRelationsMixin,
     ListViewSearchMixin,
     ObjectTitleMixin,
     ObjectURLPatternMixin,
     PageTitleMixin,
+    PermissionSnapshotMixin,
     SimpleURLPatternMixin,
     VegaFormMixin,
     VegaOrderedQuerysetMixin,
     VerboseNameMixin,
 )
+from vega_admin.mixins.bulk import BulkDeleteMixin, BulkUpdateMixin
+from vega_admin.mixins.exports import ExportJobMixin, StreamingExportMixin
+from vega_admin.mixins.pagination import KeysetPaginationMixin, PaginationCountMixin
+from vega_admin.registry import register_crud_view
 from vega_admin.utils import (
     customize_modelform,
     get_filterclass,
@@ -42,9 +58,15 @@ from vega_admin.utils import (
 # pylint: disable=too-many-ancestors,bad-continuation
 class VegaListView(
     VerboseNameMixin,
+    ListRelationsMixin,
+    ListOnlyFieldsMixin,
     ListViewSearchMixin,
     PageTitleMixin,
+    ActionPermissionsMixin,
     CRUDURLsMixin,
+    KeysetPaginationMixin,
+    PaginationCountMixin,
+    StreamingExportMixin,
     ExportMixin,
     SingleTableView,
     SimpleURLPatternMixin,
@@ -56,11 +78,65 @@ class VegaListView(
     template_name = f"vega_admin/{settings.VEGA_TEMPLATE}/list.html"
 
 
+class VegaExportView(ExportJobMixin, VegaListView):
+    """vega-admin Generic Export View that runs exports in the background."""
+
+    export_job_template_name = f"vega_admin/{settings.VEGA_TEMPLATE}/export_job.html"
+
+
+class VegaAutocompleteView(
+    AutocompleteMixin,
+    ListViewSearchMixin,
+    SimpleURLPatternMixin,
+    VegaOrderedQuerysetMixin,
+    MultipleObjectMixin,
+    View,
+):
+    """vega-admin Generic Autocomplete View that suggests matching objects."""
+
+
+class VegaBulkDeleteView(
+    BulkDeleteMixin,
+    ListViewSearchMixin,
+    PageTitleMixin,
+    VerboseNameMixin,
+    ActionPermissionsMixin,
+    CRUDURLsMixin,
+    SimpleURLPatternMixin,
+    VegaOrderedQuerysetMixin,
+    MultipleObjectMixin,
+    TemplateResponseMixin,
+    View,
+):
+    """vega-admin Generic Bulk Delete View that deletes the selected objects."""
+
+    template_name = f"vega_admin/{settings.VEGA_TEMPLATE}/bulk_delete.html"
+
+
+class VegaBulkUpdateView(
+    BulkUpdateMixin,
+    ListViewSearchMixin,
+    PageTitleMixin,
+    VerboseNameMixin,
+    ActionPermissionsMixin,
+    CRUDURLsMixin,
+    SimpleURLPatternMixin,
+    VegaOrderedQuerysetMixin,
+    MultipleObjectMixin,
+    TemplateResponseMixin,
+    View,
+):
+    """vega-admin Generic Bulk Update View that updates the selected objects."""
+
+    template_name = f"vega_admin/{settings.VEGA_TEMPLATE}/bulk_update.html"
+
+
 class VegaCreateView(
     FormMessagesMixin,
     PageTitleMixin,
     VerboseNameMixin,
     VegaFormMixin,
+    ActionPermissionsMixin,
     CRUDURLsMixin,
     SimpleURLPatternMixin,
     CreateView,
@@ -75,6 +151,7 @@ class VegaCreateView(
 class VegaDetailView(
     PageTitleMixin,
     VerboseNameMixin,
+    ActionPermissionsMixin,
     CRUDURLsMixin,
     ObjectURLPatternMixin,
     ObjectTitleMixin,
@@ -91,6 +168,7 @@ class VegaUpdateView(
     PageTitleMixin,
     VerboseNameMixin,
     VegaFormMixin,
+    ActionPermissionsMixin,
     CRUDURLsMixin,
     ObjectURLPatternMixin,
     ObjectTitleMixin,
@@ -108,6 +186,7 @@ class VegaDeleteView(
     PageTitleMixin,
     VerboseNameMixin,
     DeleteViewMixin,
+    ActionPermissionsMixin,
     CRUDURLsMixin,
     ObjectURLPatternMixin,
     ObjectTitleMixin,
@@ -134,8 +213,14 @@ class VegaCRUDView:  # pylint: disable=too-many-public-methods
     permissions_actions: Union[None, List[str]] = actions
     view_classes: Dict[str, View] = {}
     list_fields: Union[None, List[str]] = None
+    # None means work it out from the list_fields
+    list_select_related: Union[None, List[str]] = None
+    list_prefetch_related: Union[None, List[str]] = None
+    # fields loaded for the list on top of list_fields e.g. for custom columns
+    list_extra_fields: Union[None, List[str]] = None
     read_fields: Union[None, List[str]] = None
     search_fields: Union[None, List[str]] = None
+    search_backend: Union[None, str] = None  # defaults to VEGA_SEARCH_BACKEND
     filter_fields: Union[None, List[str]] = None
     filter_class: Union[None, FilterSet] = None
     search_form_class: Union[None, Form, ModelForm] = ListViewSearchForm
@@ -148,13 +233,28 @@ class VegaCRUDView:  # pylint: disable=too-many-public-methods
         settings.VEGA_UPDATE_ACTION,
         settings.VEGA_DELETE_ACTION,
     ]
+    # action: function(request, objects) returning the pks the action is shown for
+    table_action_predicates: Union[None, Dict[str, Callable]] = None
     form_class: Union[None, Form, ModelForm] = None
     create_form_class: Union[None, Form, ModelForm] = None
     update_form_class: Union[None, Form, ModelForm] = None
     table_class: Union[None, Table] = None
     paginate_by = 25
+    pagination_mode: Union[None, str] = None  # defaults to VEGA_PAGINATION_MODE
+    count_strategy: Union[None, str] = None  # defaults to VEGA_COUNT_STRATEGY
     crud_path: Union[None, str] = None
     order_by: Union[None, List[str], str] = None
+    lazy_views: Union[None, bool] = None  # defaults to VEGA_LAZY_VIEWS
+    # defaults to VEGA_INCLUDE_URL_PATTERNS
+    include_url_patterns: Union[None, bool] = None
+    autocomplete_limit: Union[None, int] = None  # defaults to VEGA_AUTOCOMPLETE_LIMIT
+    # the fields that __str__ needs, None means work it out from search_fields
+    autocomplete_fields: Union[None, List[str]] = None
+    bulk_batch_size: Union[None, int] = None  # defaults to VEGA_BULK_BATCH_SIZE
+    # the fields that the bulk update action sets, required by that action
+    bulk_update_fields: Union[None, List[str]] = None
+    # defaults to VEGA_BULK_UPDATE_SIGNALS
+    bulk_update_signals: Union[None, bool] = None
 
     def __init__(self, model=None):
         """Initialize!."""
@@ -179,24 +279,59 @@ class VegaCRUDView:  # pylint: disable=too-many-public-methods
     def get_protected_actions(self):
         """Get list of actions that have login protection."""
         if isinstance(self.protected_actions, list):
-            return self.protected_actions
+            return self.with_derived_actions(self.protected_actions)
         return []
 
+    def get_bulk_actions(self):  # pylint: disable=no-self-use
+        """Get dict of bulk actions and the actions that they act like."""
+        return {
+            settings.VEGA_BULK_DELETE_ACTION: settings.VEGA_DELETE_ACTION,
+            settings.VEGA_BULK_UPDATE_ACTION: settings.VEGA_UPDATE_ACTION,
+        }
+
+    def get_derived_actions(self):
+        """Get dict of actions and the actions whose protection they share."""
+        derived_actions = {
+            # exports and suggestions show what the list shows
+            settings.VEGA_EXPORT_ACTION: settings.VEGA_LIST_ACTION,
+            settings.VEGA_AUTOCOMPLETE_ACTION: settings.VEGA_LIST_ACTION,
+        }
+        derived_actions.update(self.get_bulk_actions())
+        return derived_actions
+
+    def with_derived_actions(self, actions: List[str]):
+        """Add the derived actions of the given actions, so they are protected too."""
+        derived_actions = [
+            derived_action
+            for derived_action, action in self.get_derived_actions().items()
+            if action in actions
+            and derived_action not in actions
+            and derived_action in self.get_actions()
+        ]
+        if derived_actions:
+            return actions + derived_actions
+        return actions
+
     def get_permissions_actions(self):
         """Get list of actions that have permissions protection."""
         if isinstance(self.permissions_actions, list):
-            return self.permissions_actions
+            return self.with_derived_actions(self.permissions_actions)
         return []
 
     def get_permissions(self):
         """Get list of permission names associated with this CRUD view."""
         actions = self.get_actions()
-        return [self.get_permission_for_action(action) for action in actions]
+        permissions = [self.get_permission_for_action(action) for action in actions]
+        return list(dict.fromkeys(permissions))
 
     def get_search_fields(self):
         """Get search fields for list view."""
         return self.search_fields
 
+    def get_search_backend(self):
+        """Get the dotted path of the search backend."""
+        return self.search_backend
+
     def get_read_fields(self):
         """Get read fields for read view."""
         return self.read_fields
@@ -265,6 +400,36 @@ class VegaCRUDView:  # pylint: disable=too-many-public-methods
 
         return get_modelform(model=self.model, fields=self.get_updateform_fields())
 
+    def get_bulk_update_fields(self):
+        """
+        Get the fields that the bulk update action sets.
+
+        These have to be listed explicitly since every object gets the same
+        values.  Unique fields and many to many fields cannot be set.
+        """
+        name = type(self).__name__
+        if not self.bulk_update_fields:
+            raise ImproperlyConfigured(
+                f"{name} has to set bulk_update_fields for the bulk update action"
+            )
+        unique_fields = get_unique_field_names(self.model)
+        for field_name in self.bulk_update_fields:
+            field = self.model._meta.get_field(field_name)
+            if (
+                not field.concrete
+                or not field.editable
+                or field.many_to_many
+                or field.name in unique_fields
+            ):
+                raise ImproperlyConfigured(
+                    f"{name} cannot set {field_name!r} with the bulk update action"
+                )
+        return self.bulk_update_fields
+
+    def get_bulk_updateform_class(self):
+        """Get form class for bulk update view."""
+        return get_modelform(model=self.model, fields=self.get_bulk_update_fields())
+
     def get_list_fields(self):
         """Get the list_fields."""
         return self.list_fields
@@ -282,7 +447,8 @@ class VegaCRUDView:  # pylint: disable=too-many-public-methods
         if self.table_class:
             return self.table_class
 
-        tables_kwargs = {"model": self.model}
+        tables_kwargs: Dict[str, Any] = {"model": self.model}
+        action_access = self.get_action_access()
         if isinstance(self.get_list_fields(), list):
             tables_kwargs["fields"] = self.get_list_fields()
         if isinstance(self.get_table_actions(), list):
@@ -290,11 +456,57 @@ class VegaCRUDView:  # pylint: disable=too-many-public-methods
                 _ for _ in self.get_table_actions() if _ in self.get_actions()
             ]
             tables_kwargs["actions"] = self.get_action_urlnames(actions=table_actions)
+            tables_kwargs["actions_access"] = {
+                _: action_access[_] for _ in table_actions
+            }
+            if self.table_action_predicates:
+                tables_kwargs["actions_predicates"] = self.table_action_predicates
         if isinstance(self.get_table_attrs(), dict):
             tables_kwargs["attrs"] = self.get_table_attrs()
+        bulk_actions = [_ for _ in self.get_bulk_actions() if _ in self.get_actions()]
+        if bulk_actions:
+            tables_kwargs["selection"] = bulk_actions
+            tables_kwargs.setdefault("actions_access", {}).update(
+                {_: action_access[_] for _ in bulk_actions}
+            )
 
         return get_table(**tables_kwargs)
 
+    def get_list_relation_loading_plan(self, table_class: Table):
+        """Get the select_related and prefetch_related lookups for the list."""
+        select_related, prefetch_related = get_table_relation_loading_plan(table_class)
+        if self.list_select_related is not None:
+            select_related = self.list_select_related
+        if self.list_prefetch_related is not None:
+            prefetch_related = self.list_prefetch_related
+        return list(select_related), list(prefetch_related)
+
+    def get_list_only_fields(  # pylint: disable=bad-continuation
+        self, select_related: List[str], prefetch_related: List[str]
+    ):
+        """Get the fields to load for the list, or None to load all of them."""
+        list_fields = self.get_list_fields()
+        if self.table_class or not isinstance(list_fields, list):
+            # we cannot tell which fields custom tables need
+            return None
+
+        order_by = self.order_by or settings.VEGA_ORDERING_FIELD
+        if isinstance(order_by, str):
+            order_by = [order_by]
+        accessors = (
+            list_fields
+            + [settings.VEGA_ACTION_COLUMN_ACCESSOR_FIELD]
+            + [_ for _ in order_by if isinstance(_, str)]
+            + [_ for _ in self.model._meta.ordering if isinstance(_, str)]
+            + (self.list_extra_fields or [])
+        )
+        return get_only_fields(
+            self.model,
+            accessors,
+            select_related=select_related,
+            prefetch_related=prefetch_related,
+        )
+
     def get_filter_class(self):
         """Get the filter class."""
         if self.filter_class:
@@ -327,6 +539,22 @@ class VegaCRUDView:  # pylint: disable=too-many-public-methods
         """Get view class for delete action."""
         return VegaDeleteView
 
+    def get_export_view_class(self):  # pylint: disable=no-self-use
+        """Get view class for export action."""
+        return VegaExportView
+
+    def get_autocomplete_view_class(self):  # pylint: disable=no-self-use
+        """Get view class for autocomplete action."""
+        return VegaAutocompleteView
+
+    def get_bulk_delete_view_class(self):  # pylint: disable=no-self-use
+        """Get view class for bulk delete action."""
+        return VegaBulkDeleteView
+
+    def get_bulk_update_view_class(self):  # pylint: disable=no-self-use
+        """Get view class for bulk update action."""
+        return VegaBulkUpdateView
+
     def get_success_url(self):  # pylint: disable=no-self-use
         """Get success_url."""
         return reverse_lazy(self.get_url_name_for_action(settings.VEGA_LIST_ACTION))
@@ -347,7 +575,12 @@ class VegaCRUDView:  # pylint: disable=too-many-public-methods
             # add LoginRequiredMixin and PermissionRequiredMixin
             return type(
                 f"{view_class.__name__}{settings.VEGA_PROTECTED_LABEL}",
-                (LoginRequiredMixin, PermissionRequiredMixin, view_class),
+                (
+                    LoginRequiredMixin,
+                    PermissionSnapshotMixin,
+                    PermissionRequiredMixin,
+                    view_class,
+                ),
                 options,
             )
 
@@ -395,48 +628,51 @@ class VegaCRUDView:  # pylint: disable=too-many-public-methods
             return self.get_update_view_class()
         if action == settings.VEGA_DELETE_ACTION:
             return self.get_delete_view_class()
+        if action == settings.VEGA_EXPORT_ACTION:
+            return self.get_export_view_class()
+        if action == settings.VEGA_AUTOCOMPLETE_ACTION:
+            return self.get_autocomplete_view_class()
+        if action == settings.VEGA_BULK_DELETE_ACTION:
+            return self.get_bulk_delete_view_class()
+        if action == settings.VEGA_BULK_UPDATE_ACTION:
+            return self.get_bulk_update_view_class()
 
         # this action is set as a default action but has no defined view class
         raise Exception(settings.VEGA_INVALID_ACTION)
 
-    def get_view_class_for_action(  # pylint: disable=too-many-branches
-        self, action: str
-    ):
-        """Get the view for an action."""
+    def get_base_view_class_for_action(self, action: str):
+        """Get the view class that the view for an action is built from."""
         view_classes = self.get_view_classes()
-        try:
-            # return the view class if found
-            view_class = view_classes[action]
-        except KeyError:
-            if action not in settings.VEGA_DEFAULT_ACTIONS:
-                # this action is not supported
-                raise Exception(settings.VEGA_INVALID_ACTION)
-
-            # lets get the view class for the default actions
-            view_class = self.get_default_action_view_classes(action)
-        else:
-            if action in self.get_permissions_actions():
-                return self.enforce_permission_protection(view_class, action)
-
-            if action in self.get_protected_actions():
-                return self.enforce_login_protection(view_class)
-
-            return view_class
-
-        # lets go on and create the view class(es)
-        options = {"model": self.model}
-        # add some common useful CRUD urls
+        if action in view_classes:
+            return view_classes[action]
+        if action not in settings.VEGA_DEFAULT_ACTIONS + settings.VEGA_OPTIONAL_ACTIONS:
+            # this action is not supported
+            raise Exception(settings.VEGA_INVALID_ACTION)
+        return self.get_default_action_view_classes(action)
+
+    def get_crud_url_options(self) -> Dict[str, Any]:
+        """Get the urls of the other actions, which every view links to."""
+        url_options = {
+            settings.VEGA_LIST_ACTION: "list_url",
+            settings.VEGA_CREATE_ACTION: "create_url",
+            settings.VEGA_EXPORT_ACTION: "export_url",
+            settings.VEGA_AUTOCOMPLETE_ACTION: "autocomplete_url",
+            settings.VEGA_BULK_DELETE_ACTION: "bulk_delete_url",
+            settings.VEGA_BULK_UPDATE_ACTION: "bulk_update_url",
+        }
+        options: Dict[str, Any] = {}
+        for action, name in url_options.items():
+            if action in self.get_actions():
+                options[name] = reverse_lazy(self.get_url_name_for_action(action))
         if settings.VEGA_LIST_ACTION in self.get_actions():
-            options["list_url"] = reverse_lazy(
-                self.get_url_name_for_action(settings.VEGA_LIST_ACTION)
-            )
             options["order_by"] = self.order_by
-        if settings.VEGA_CREATE_ACTION in self.get_actions():
-            options["create_url"] = reverse_lazy(
-                self.get_url_name_for_action(settings.VEGA_CREATE_ACTION)
-            )
         options["cancel_url"] = self.get_cancel_url()
+        options["action_access"] = self.get_action_access()
+        return options
 
+    def get_object_view_options(self, action: str) -> Dict[str, Any]:
+        """Get the options of the views of one object."""
+        options: Dict[str, Any] = {}
         # add the success url
         if action in [
             settings.VEGA_CREATE_ACTION,
@@ -468,34 +704,104 @@ class VegaCRUDView:  # pylint: disable=too-many-public-methods
             options["delete_url_name"] = self.get_url_name_for_action(
                 settings.VEGA_DELETE_ACTION
             )
+        return options
+
+    def get_search_view_options(self) -> Dict[str, Any]:
+        """Get the options of the views that search the objects."""
+        return {
+            "order_by": self.order_by,
+            "search_fields": self.get_search_fields(),
+            "search_backend": self.get_search_backend(),
+        }
+
+    def get_list_view_options(self) -> Dict[str, Any]:
+        """Get the options of the views that show the table of objects."""
+        options = self.get_search_view_options()
+        options["table_class"] = self.get_table_class()
+        select_related, prefetch_related = self.get_list_relation_loading_plan(
+            options["table_class"]
+        )
+        options["select_related"] = select_related
+        options["prefetch_related"] = prefetch_related
+        options["only_fields"] = self.get_list_only_fields(
+            select_related, prefetch_related
+        )
+        options["form_class"] = self.get_search_form_class()
+        options["paginate_by"] = self.paginate_by
+        options["pagination_mode"] = self.pagination_mode
+        options["count_strategy"] = self.count_strategy
+        options["filter_class"] = self.get_filter_class()
+        return options
+
+    def get_autocomplete_view_options(self) -> Dict[str, Any]:
+        """Get the options of the view that suggests objects."""
+        options = self.get_search_view_options()
+        options["autocomplete_limit"] = self.autocomplete_limit
+        options["autocomplete_fields"] = self.autocomplete_fields
+        return options
+
+    def get_bulk_view_options(self, action: str) -> Dict[str, Any]:
+        """Get the options of the views that act on many objects at once."""
+        # the bulk actions act on what the list shows
+        options = self.get_search_view_options()
+        options["form_class"] = self.get_search_form_class()
+        options["filter_class"] = self.get_filter_class()
+        options["bulk_batch_size"] = self.bulk_batch_size
+
+        # add the form of the new values
+        if action == settings.VEGA_BULK_UPDATE_ACTION:
+            options["bulk_form_class"] = self.get_bulk_updateform_class()
+            options["bulk_update_signals"] = self.bulk_update_signals
+        return options
+
+    def get_view_options(self, action: str) -> Dict[str, Any]:
+        """Get the class attributes of the view that is created for an action."""
+        options = {"model": self.model}
+        options.update(self.get_crud_url_options())
+        options.update(self.get_object_view_options(action))
+        if action in [settings.VEGA_LIST_ACTION, settings.VEGA_EXPORT_ACTION]:
+            options.update(self.get_list_view_options())
+        if action == settings.VEGA_AUTOCOMPLETE_ACTION:
+            options.update(self.get_autocomplete_view_options())
+        if action in self.get_bulk_actions():
+            options.update(self.get_bulk_view_options(action))
+        if action in self.get_permissions_actions():
+            options["permission_required"] = self.get_permission_for_action(action)
+        return options
 
-        # add the table class
-        if action == settings.VEGA_LIST_ACTION:
-            options["table_class"] = self.get_table_class()
-            options["search_fields"] = self.get_search_fields()
-            options["form_class"] = self.get_search_form_class()
-            options["paginate_by"] = self.paginate_by
-            options["filter_class"] = self.get_filter_class()
-
-        inherited_classes: Tuple[Any, ...] = (view_class,)
-
+    def get_view_bases(self, view_class: View, action: str) -> Tuple[Any, ...]:
+        """Get the classes that the view created for an action inherits."""
         # permissions and login protection
         if action in self.get_permissions_actions():
-            inherited_classes = (
+            return (
                 LoginRequiredMixin,
+                PermissionSnapshotMixin,
                 PermissionRequiredMixin,
                 view_class,
             )
-            options["permission_required"] = self.get_permission_for_action(action)
-        elif action in self.get_protected_actions():
-            inherited_classes = (LoginRequiredMixin, view_class)
+        if action in self.get_protected_actions():
+            return (LoginRequiredMixin, view_class)
+        return (view_class,)
+
+    def get_view_class_for_action(self, action: str):
+        """Get the view for an action."""
+        view_class = self.get_base_view_class_for_action(action)
+        if action in self.get_view_classes():
+            # return the custom view class
+            if action in self.get_permissions_actions():
+                return self.enforce_permission_protection(view_class, action)
+
+            if action in self.get_protected_actions():
+                return self.enforce_login_protection(view_class)
+
+            return view_class
 
         # create and return the View class
         view_label = settings.VEGA_VIEW_LABEL
         return type(
             f"{self.model_name.title()}{action.title()}{view_label}",
-            inherited_classes,  # the classes that we should inherit
-            options,
+            self.get_view_bases(view_class, action),
+            self.get_view_options(action),
         )
 
     # pylint: disable=no-self-use
@@ -503,8 +809,19 @@ class VegaCRUDView:  # pylint: disable=too-many-public-methods
         """Return the url name for the action."""
         return f"{self.crud_path}-{action}"
 
+    def get_action_access(self) -> Dict[str, Tuple[bool, Union[None, str]]]:
+        """Get whether each action requires login, and the permission it requires."""
+        access = {}
+        for action in self.get_actions():
+            if action in self.get_permissions_actions():
+                access[action] = (True, self.get_permission_for_action(action))
+            else:
+                access[action] = (action in self.get_protected_actions(), None)
+        return access
+
     def get_permission_for_action(self, action: str):
         """Get permission for action."""
+        action = self.get_derived_actions().get(action, action)
         return f"{self.app_label}.{action}_{self.model_name}"
 
     def get_action_urlname(self, action: str):
@@ -526,15 +843,93 @@ class VegaCRUDView:  # pylint: disable=too-many-public-methods
             # we are forced to try something and hope it works :(
             return f"{view_class.get_crud_path_pattern(self.crud_path, action)}/"
 
+    def get_lazy_views(self):
+        """Whether view classes are only built when they are first requested."""
+        if self.lazy_views is None:
+            return settings.VEGA_LAZY_VIEWS
+        return self.lazy_views
+
+    def get_lazy_view_for_action(self, action: str) -> Callable:
+        """
+        Get a view function that builds the view for an action when first called.
+
+        The generated table, filter and form classes of the action are only
+        created once the action is actually requested.
+
+        :param action: the action
+        :return: the view function
+        """
+        base_view_class = self.get_base_view_class_for_action(action)
+        lock = threading.Lock()
+        views: List[Callable] = []
+
+        def view(request, *args, **kwargs):
+            if not views:
+                with lock:
+                    if not views:
+                        view_class = self.get_view_class_for_action(action=action)
+                        views.append(view_class.as_view())
+            return views[0](request, *args, **kwargs)
+
+        # take on attributes such as csrf_exempt, like View.as_view() does
+        update_wrapper(view, base_view_class.dispatch, assigned=())
+        return view
+
+    def get_include_url_patterns(self):
+        """Whether the url patterns are grouped under one crud_path prefix."""
+        if self.include_url_patterns is None:
+            return settings.VEGA_INCLUDE_URL_PATTERNS
+        return self.include_url_patterns
+
+    def get_included_url_patterns(self, urls: list):
+        """
+        Group url patterns under a crud_path prefix and then an action prefix.
+
+        The resolver only tries the patterns of a CRUD view once its crud_path
+        matches, and then only the patterns of the requested action.  The url
+        names are not namespaced so they keep reversing as before.
+
+        :param urls: the url patterns
+        :return: list of url patterns
+        """
+        prefix = f"{self.crud_path}/"
+        actions: Dict[str, list] = {}
+        others = []
+        for url in urls:
+            route = str(url.pattern)
+            action_path, _, rest = route.replace(prefix, "", 1).partition("/")
+            if not route.startswith(prefix) or not action_path or "<" in action_path:
+                # e.g. a custom view that derives some other url pattern
+                others.append(url)
+                continue
+            actions.setdefault(f"{action_path}/", []).append(
+                path(rest, url.callback, name=url.name)
+            )
+
+        if not actions:
+            return others
+        action_urls = [path(key, include(value)) for key, value in actions.items()]
+        return others + [path(prefix, include(action_urls))]
+
     def url_patterns(self, actions: list = None):
         """Return the URL patters for the selected actions in this CRUD view."""
         if actions is None:
             actions = self.get_actions()
+        register_crud_view(self)
+        lazy = self.get_lazy_views()
         urls = []
         for action in actions:
-            view_class = self.get_view_class_for_action(action=action)
-            pattern = self.get_url_pattern_for_action(view_class, action)
             url_name = self.get_url_name_for_action(action=action)
-            urls.append(path(pattern, view_class.as_view(), name=url_name))
+            if lazy:
+                # the url pattern is derived from the view class it is built from
+                view_class = self.get_base_view_class_for_action(action)
+                view = self.get_lazy_view_for_action(action)
+            else:
+                view_class = self.get_view_class_for_action(action=action)
+                view = view_class.as_view()
+            pattern = self.get_url_pattern_for_action(view_class, action)
+            urls.append(path(pattern, view, name=url_name))
 
+        if self.get_include_url_patterns():
+            return self.get_included_url_patterns(urls)
         return urls
@@ -1,5 +1,7 @@
 """Widgets module for django-vega-admin"""
-from django.forms import DateInput, DateTimeInput, TimeInput
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.forms import DateInput, DateTimeInput, Select, SelectMultiple, TimeInput
 
 
 class VegaDateWidget(DateInput):
@@ -18,3 +20,59 @@ class VegaDateTimeWidget(DateTimeInput):
     """HTML5 Time input widget class"""
 
     input_type = "datetime-local"
+
+
+class RemoteChoicesMixin:
+    """
+    Only renders the selected choices of a model choice field.
+
+    The other choices are searched for using the autocomplete action at url.
+    """
+
+    template_name = "vega_admin/widgets/remote_select.html"
+
+    def __init__(self, url: str, attrs=None, choices=()):
+        super().__init__(attrs=attrs, choices=choices)
+        self.url = url
+
+    def get_context(self, name, value, attrs):
+        """Get the context of the widget template."""
+        context = super().get_context(name, value, attrs)
+        context["widget"]["attrs"]["data-vega-remote-url"] = self.url
+        context["widget"]["min_length"] = settings.VEGA_AUTOCOMPLETE_MIN_LENGTH
+        return context
+
+    def get_selected_objects(self, value):
+        """Get the objects of the selected values."""
+        values = [_ for _ in value if _ not in ("", None)]
+        queryset = getattr(self.choices, "queryset", None)
+        if not values or queryset is None:
+            return []
+        try:
+            return list(queryset.filter(pk__in=values))
+        except (TypeError, ValueError, ValidationError):
+            # the values are not valid primary keys
+            return []
+
+    def optgroups(self, name, value, attrs=None):
+        """Build the options of the selected values only."""
+        choices = []
+        field = getattr(self.choices, "field", None)
+        if not self.allow_multiple_selected and field and field.empty_label is not None:
+            choices.append(("", field.empty_label))
+        choices += [self.choices.choice(_) for _ in self.get_selected_objects(value)]
+
+        groups = []
+        for index, (option_value, label) in enumerate(choices):
+            selected = str(option_value) in value
+            option = self.create_option(name, option_value, label, selected, index)
+            groups.append((None, [option], index))
+        return groups
+
+
+class VegaRemoteSelect(RemoteChoicesMixin, Select):
+    """Select widget that searches for its choices."""
+
+
+class VegaRemoteSelectMultiple(RemoteChoicesMixin, SelectMultiple):
+    """Select multiple widget that searches for its choices."""